@@ -18,6 +18,30 @@ const {
 } = require('../middleware/auth');
 const { sanitizeText } = require('../utils/security');
 
+const VALID_CATEGORIES = ['pre-wedding', 'brides-dinner', 'morning-wedding', 'grooms-dinner', 'rom'];
+
+// Categories guests are browsing right now; optimize-images.py thumbnails these first
+const CATEGORY_VIEWS_FILE = path.join(__dirname, '../../uploads/.category-views.json');
+const CATEGORY_VIEWS_WRITE_INTERVAL_MS = 10 * 1000;
+const categoryViews = {};
+let categoryViewsWrittenAt = 0;
+
+function recordCategoryView(category) {
+  if (!VALID_CATEGORIES.includes(category)) {
+    return;
+  }
+  const now = Date.now();
+  categoryViews[category] = now / 1000;
+  if (now - categoryViewsWrittenAt < CATEGORY_VIEWS_WRITE_INTERVAL_MS) {
+    return;
+  }
+  categoryViewsWrittenAt = now;
+  const tmpPath = `${CATEGORY_VIEWS_FILE}.${process.pid}.tmp`;
+  fs.writeFile(tmpPath, JSON.stringify(categoryViews))
+    .then(() => fs.rename(tmpPath, CATEGORY_VIEWS_FILE))
+    .catch(() => {});
+}
+
 function serializePhoto(photo) {
   const { user_phone, ...publicPhoto } = photo;
   return publicPhoto;
@@ -211,6 +235,10 @@ router.get('/photographer', async (req, res) => {
     const limit = parseInt(req.query.limit) || 1000;
     const offset = (page - 1) * limit;
     const category = req.query.category; // Optional category filter
+    const sortByTakenAt = req.query.sort === 'taken_at'; // Shooting order (EXIF), uses idx_category_taken_at
+    if (category) {
+      recordCategoryView(category);
+    }
 
     const safeLimit = Math.max(1, Math.min(parseInt(limit) || 1000, 1000));
     const safeOffset = Math.max(0, parseInt(offset) || 0);
@@ -222,6 +250,8 @@ router.get('/photographer', async (req, res) => {
         thumbnail_url,
         category,
         photographer_email,
+        taken_at,
+        camera,
         created_at
       FROM photographer_photo`;
     
@@ -231,7 +261,8 @@ router.get('/photographer', async (req, res) => {
       params.push(category);
     }
     
-    query += ` ORDER BY created_at DESC
+    query += sortByTakenAt ? ' ORDER BY taken_at DESC, id DESC' : ' ORDER BY created_at DESC';
+    query += `
       LIMIT ${safeLimit} OFFSET ${safeOffset}`;
 
     const [photos] = await pool.query(query, params);
@@ -245,6 +276,8 @@ router.get('/photographer', async (req, res) => {
       photographer_email: photo.photographer_email, // Include for filtering in manage photos
       caption: null,
       created_at: photo.created_at,
+      taken_at: photo.taken_at,
+      camera: photo.camera,
       category: photo.category,
       tags: [{ id: 0, name: photo.category }], // Add category as tag for gallery filtering
       likes_count: 0,
@@ -370,8 +403,7 @@ router.post('/upload', authenticateGuestOrAdmin, upload.single('photo'), async (
       return res.status(400).json({ success: false, message: 'Category is required' });
     }
 
-    const validCategories = ['pre-wedding', 'brides-dinner', 'morning-wedding', 'grooms-dinner', 'rom'];
-    if (!validCategories.includes(category)) {
+    if (!VALID_CATEGORIES.includes(category)) {
       return res.status(400).json({ success: false, message: 'Invalid category. Must be one of: pre-wedding, brides-dinner, morning-wedding, grooms-dinner, rom' });
     }
 
@@ -422,8 +454,7 @@ router.post('/upload-zip', authenticateAdminOrPhotographer, uploadZip.single('zi
       return res.status(400).json({ success: false, message: 'Category is required' });
     }
 
-    const validCategories = ['pre-wedding', 'brides-dinner', 'morning-wedding', 'grooms-dinner', 'rom'];
-    if (!validCategories.includes(category)) {
+    if (!VALID_CATEGORIES.includes(category)) {
       // Clean up uploaded ZIP file
       await fs.unlink(zipFilePath).catch(() => {});
       return res.status(400).json({ 
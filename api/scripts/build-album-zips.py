@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Album ZIP Builder
+Builds one downloadable ZIP of the original photos per category in
+uploads/albums/, served at /uploads/albums/<category>-<version>.zip
+
+Usage:
+    python scripts/build-album-zips.py [--category CATEGORY] [--force] [--keep-hours N]
+
+Photos are already compressed, so entries are STORED (no recompression) and
+each original is streamed into the archive in 1 MB chunks: memory use does
+not depend on photo or album size. Every album has a content version (a
+hash of its rows and of the size and mtime of their files); a category
+whose version has not changed is skipped. When photos were only added, the
+previous archive is copied and the new photos are appended instead of
+re-reading every original. uploads/albums/index.json lists the current
+archive of each category; the per-category manifests the builder keeps for
+itself live in uploads/.album-manifests/, outside the served tree. A
+replaced archive stays downloadable for --keep-hours and is removed by a
+later run.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import argparse
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+from media_tools import load_env, get_connection, PHOTOS_DIR, UPLOADS_DIR
+from media_tools.storage import url_to_relpath
+
+ALBUMS_DIR = UPLOADS_DIR / 'albums'
+ALBUMS_URL_PREFIX = '/uploads/albums/'
+INDEX_FILE = ALBUMS_DIR / 'index.json'
+# Not under uploads/albums, so the server never hands them out
+MANIFESTS_DIR = UPLOADS_DIR / '.album-manifests'
+
+# Same list as VALID_CATEGORIES in api/routes/photos.js
+ALBUM_CATEGORIES = ['pre-wedding', 'brides-dinner', 'morning-wedding', 'grooms-dinner', 'rom']
+
+# Hours a replaced archive stays downloadable (pages loaded before the
+# rebuild still link to it) before a later run removes it
+KEEP_HOURS = 24
+
+# Bytes copied per read while streaming an original into the archive
+CHUNK_SIZE = 1024 * 1024
+
+# Characters of the content version used in the archive name
+VERSION_LENGTH = 12
+
+
+def album_entries(conn, category: str) -> list:
+    """
+    [id, image_url, size, mtime_ns] for each photo of a category whose file
+    exists, in id order (new photos come last, so they can be appended)
+    """
+    cursor = conn.cursor()
+    entries = []
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(
+                'SELECT id, image_url FROM photographer_photo '
+                'WHERE category = %s AND id > %s ORDER BY id ASC LIMIT 5000',
+                (category, last_id)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for photo_id, image_url in rows:
+                relpath = url_to_relpath(image_url)
+                if relpath is None:
+                    continue
+                try:
+                    stat = (PHOTOS_DIR / relpath).stat()
+                except FileNotFoundError:
+                    continue
+                entries.append([photo_id, image_url, stat.st_size, stat.st_mtime_ns])
+    finally:
+        cursor.close()
+    return entries
+
+
+def content_version(entries: list) -> str:
+    """Hash of an album's entries; changes whenever a photo is added, removed or replaced"""
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(json.dumps(entry).encode('utf-8'))
+    return digest.hexdigest()[:VERSION_LENGTH]
+
+
+def archive_name(category: str, photo_id: int, image_url: str) -> str:
+    """Name inside the ZIP, e.g. morning-wedding/000123.jpg (sorts in upload order)"""
+    return f'{category}/{photo_id:06d}{PurePosixPath(image_url).suffix.lower()}'
+
+
+def add_photo(archive: zipfile.ZipFile, category: str, entry: list):
+    """Stream one original into the archive as a STORED entry"""
+    photo_id, image_url, size, mtime_ns = entry
+    modified = datetime.fromtimestamp(mtime_ns / 1e9)
+    info = zipfile.ZipInfo(archive_name(category, photo_id, image_url),
+                           date_time=max(modified.timetuple()[:6], (1980, 1, 1, 0, 0, 0)))
+    info.compress_type = zipfile.ZIP_STORED
+    info.file_size = size  # lets zipfile choose ZIP64 headers for files over 2 GB up front
+    with open(PHOTOS_DIR / url_to_relpath(image_url), 'rb') as source, archive.open(info, 'w') as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+
+def manifest_path(category: str):
+    return MANIFESTS_DIR / f'{category}.json'
+
+
+def load_manifest(category: str):
+    try:
+        return json.loads(manifest_path(category).read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_json_atomic(path, data):
+    tmp_path = path.with_name(f'.{path.name}.tmp-{os.getpid()}')
+    tmp_path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def prune_retired(retired: list, current_file, keep_hours: float) -> tuple:
+    """
+    Delete replaced archives older than keep_hours.
+
+    Returns (archives still kept, number removed). An archive that is the
+    current one again (a rebuild can return to an earlier version) is
+    dropped from the list without touching the file.
+    """
+    cutoff = datetime.now() - timedelta(hours=keep_hours)
+    kept, removed = [], 0
+    for archive in retired:
+        if archive['file'] == current_file:
+            continue
+        if datetime.fromisoformat(archive['retired_at']) > cutoff:
+            kept.append(archive)
+            continue
+        (ALBUMS_DIR / archive['file']).unlink(missing_ok=True)
+        removed += 1
+    return kept, removed
+
+
+def build_album(conn, category: str, force=False, keep_hours=KEEP_HOURS) -> dict:
+    """
+    Bring one category's archive up to date.
+
+    Returns {'action': 'unchanged'|'appended'|'rebuilt'|'empty', 'pruned': N, ...}.
+    The new archive is written under a temporary name and renamed into
+    place. The previous one is listed as retired in the manifest and deleted
+    by the first run after keep_hours, so downloads in progress and pages
+    still showing the old index are not cut short.
+    """
+    entries = album_entries(conn, category)
+    version = content_version(entries)
+    manifest = load_manifest(category)
+    current_file = manifest['file'] if manifest else None
+    old_path = ALBUMS_DIR / current_file if current_file else None
+    retired, pruned = prune_retired(manifest.get('retired', []) if manifest else [], current_file, keep_hours)
+    now = datetime.now().isoformat(timespec='seconds')
+
+    if not entries:
+        if old_path is not None:
+            retired.append({'file': current_file, 'retired_at': now})
+        if retired:
+            # Kept (without an archive, so the index leaves it out) until the last one is pruned
+            write_json_atomic(manifest_path(category), {
+                'category': category, 'version': None, 'file': None, 'bytes': 0,
+                'built_at': manifest['built_at'], 'entries': [], 'retired': retired,
+            })
+        elif manifest:
+            manifest_path(category).unlink(missing_ok=True)
+        return {'action': 'empty', 'photos': 0, 'pruned': pruned}
+    if manifest and manifest['version'] == version and old_path.is_file() and not force:
+        if pruned:
+            write_json_atomic(manifest_path(category), {**manifest, 'retired': retired})
+        return {'action': 'unchanged', 'photos': len(entries), 'file': manifest['file'],
+                'bytes': manifest['bytes'], 'pruned': pruned}
+
+    file_name = f'{category}-{version}.zip'
+    path = ALBUMS_DIR / file_name
+    tmp_path = ALBUMS_DIR / f'.{file_name}.tmp-{os.getpid()}'
+    old_entries = manifest['entries'] if manifest else []
+    # Only additions since the last build: keep the existing entries and append
+    can_append = (not force and old_path is not None and old_path.is_file()
+                  and 0 < len(old_entries) <= len(entries) and entries[:len(old_entries)] == old_entries)
+
+    try:
+        if can_append:
+            shutil.copyfile(old_path, tmp_path)
+            new_entries = entries[len(old_entries):]
+            mode = 'a'
+        else:
+            new_entries = entries
+            mode = 'w'
+        with zipfile.ZipFile(tmp_path, mode, compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for entry in new_entries:
+                add_photo(archive, category, entry)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    retired = [archive for archive in retired if archive['file'] != file_name]
+    if old_path is not None and old_path != path:
+        retired.append({'file': current_file, 'retired_at': now})
+    size = path.stat().st_size
+    write_json_atomic(manifest_path(category), {
+        'category': category,
+        'version': version,
+        'file': file_name,
+        'bytes': size,
+        'built_at': now,
+        'entries': entries,
+        'retired': retired,
+    })
+    return {'action': 'appended' if can_append else 'rebuilt', 'photos': len(entries),
+            'added': len(new_entries), 'file': file_name, 'bytes': size, 'pruned': pruned}
+
+
+def write_index():
+    """uploads/albums/index.json: the current archive of every category"""
+    albums = {}
+    for path in sorted(MANIFESTS_DIR.glob('*.json')):
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+        if not manifest['file']:
+            continue
+        albums[manifest['category']] = {
+            'url': ALBUMS_URL_PREFIX + manifest['file'],
+            'photos': len(manifest['entries']),
+            'bytes': manifest['bytes'],
+            'version': manifest['version'],
+            'built_at': manifest['built_at'],
+        }
+    write_json_atomic(INDEX_FILE, albums)
+
+
+def main():
+    """Main function"""
+    load_env()
+
+    parser = argparse.ArgumentParser(description='Build downloadable per-category album ZIPs')
+    parser.add_argument('--category', choices=ALBUM_CATEGORIES,
+                        help='Only build this category (default: every category with photos)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the album has not changed')
+    parser.add_argument('--keep-hours', type=float, default=KEEP_HOURS,
+                        help=f'Hours a replaced archive stays downloadable (default: {KEEP_HOURS})')
+    args = parser.parse_args()
+
+    print('\n' + '=' * 70)
+    print('📦 Album ZIP Builder')
+    print('=' * 70)
+    print(f'Albums folder: {ALBUMS_DIR}')
+    print('=' * 70 + '\n')
+
+    ALBUMS_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFESTS_DIR.mkdir(parents=True, exist_ok=True)
+    conn = get_connection()
+    results = {}
+    try:
+        if args.category:
+            categories = [args.category]
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT DISTINCT category FROM photographer_photo WHERE category IS NOT NULL ORDER BY category')
+            categories = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+            for category in sorted(categories - set(ALBUM_CATEGORIES)):
+                print(f'   ⚠️  {category}: not a valid category, skipped')
+            # Categories that lost all their photos still need their archive removed
+            categories |= {path.stem for path in MANIFESTS_DIR.glob('*.json')}
+            categories = [category for category in ALBUM_CATEGORIES if category in categories]
+
+        for category in categories:
+            started = time.perf_counter()
+            result = build_album(conn, category, args.force, args.keep_hours)
+            results[category] = result
+            elapsed = time.perf_counter() - started
+            if result['action'] == 'unchanged':
+                print(f'   ✓ {category}: unchanged ({result["photos"]} photos)')
+            elif result['action'] == 'empty':
+                print(f'   ⏭️  {category}: no photos')
+            else:
+                print(f'   ✓ {category}: {result["action"]} {result["file"]} - {result["photos"]} photos, '
+                      f'{result["bytes"] / 1024 / 1024:.1f} MB ({result["added"]} added) in {elapsed:.1f}s')
+    finally:
+        conn.close()
+
+    write_index()
+
+    built = [result for result in results.values() if result['action'] in ('appended', 'rebuilt')]
+    print('\n' + '=' * 70)
+    print('✅ Albums Complete!')
+    print('=' * 70)
+    print(f'Categories:           {len(results)}')
+    print(f'Built or updated:     {len(built)}')
+    print(f'Unchanged:            {sum(1 for result in results.values() if result["action"] == "unchanged")}')
+    print(f'Old archives removed: {sum(result["pruned"] for result in results.values())}')
+    print(f'Index:                {INDEX_FILE}')
+    print('=' * 70)
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
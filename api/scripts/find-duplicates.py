@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Finder
+Finds burst shots and re-exports (same picture at another size or quality)
+in photographer_photo, which exact-hash checks miss
+
+Usage:
+    python scripts/find-duplicates.py [--category CATEGORY] [--distance 6] [--only-new] [--report FILE]
+
+Each run first stores a 64-bit perceptual hash (pHash) in
+photographer_photo.phash for rows that do not have one yet, so after an
+import only the new photos are decoded. The hashes are then put in a
+multi-index hash table (media_tools/phash.py) and photos within --distance
+bits of each other are grouped, without comparing every pair.
+Rows that cannot be hashed are marked (phash_failed_at, phash_error) and
+skipped until --rehash. Requires database/migration_add_photo_phash.sql.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from media_tools import load_env, get_connection, PHOTOS_DIR
+from media_tools.storage import url_to_relpath
+
+# Rows hashed (and updated in one transaction) per batch
+BATCH_SIZE = 500
+
+# Bits (of 64) two photos may differ in to count as near-duplicates.
+# Re-exports and resized copies are usually 0-2 bits apart, burst shots
+# up to about 10; unrelated photos around 32
+DEFAULT_DISTANCE = 6
+
+# Groups listed in the console output (--report has all of them)
+SHOW_LIMIT = 20
+
+# Longest reason stored in photographer_photo.phash_error
+ERROR_LENGTH = 255
+
+
+def hash_photo(source_path: Path) -> tuple:
+    """(pHash, None) for a readable image, otherwise (None, why it failed)"""
+    from media_tools.phash import image_phash
+
+    try:
+        return image_phash(source_path), None
+    except FileNotFoundError:
+        return None, 'file not found'
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'[:ERROR_LENGTH]
+
+
+def hash_new_photos(conn, category=None, rehash=False, workers=None, batch_size=BATCH_SIZE) -> dict:
+    """
+    Store the pHash of every row without one (every row with rehash).
+
+    Walks rows in id order (keyset pagination); each batch is decoded by a
+    thread pool (Pillow releases the GIL while decoding) and written with
+    one executemany. Rows whose file is missing or unreadable, or whose
+    image_url is not under /uploads/photos/, get phash_failed_at and the
+    reason in phash_error, and are skipped from then on (retried with rehash).
+    """
+    stats = {'checked': 0, 'hashed': 0, 'failed': 0, 'errors': [], 'new_ids': set()}
+    read_cursor = conn.cursor()
+    write_cursor = conn.cursor()
+    conditions = ['id > %s']
+    if not rehash:
+        conditions.append('phash IS NULL AND phash_failed_at IS NULL')
+    if category:
+        conditions.append('category = %s')
+    query = f'SELECT id, image_url FROM photographer_photo WHERE {" AND ".join(conditions)} ORDER BY id ASC LIMIT %s'
+    last_id = 0
+    start_time = time.time()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                read_cursor.execute(query, (last_id, *([category] if category else []), batch_size))
+                rows = read_cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                stats['checked'] += len(rows)
+
+                to_hash, failures = [], []
+                for photo_id, image_url in rows:
+                    relpath = url_to_relpath(image_url)
+                    if relpath is None:
+                        failures.append(('invalid image_url', photo_id, image_url))
+                    else:
+                        to_hash.append((photo_id, image_url, PHOTOS_DIR / relpath))
+
+                updates = []
+                results = pool.map(hash_photo, [path for _, _, path in to_hash])
+                for (photo_id, image_url, _), (value, error) in zip(to_hash, results):
+                    if value is None:
+                        failures.append((error, photo_id, image_url))
+                        continue
+                    updates.append((value, photo_id))
+                    stats['new_ids'].add(photo_id)
+
+                if updates:
+                    write_cursor.executemany(
+                        'UPDATE photographer_photo SET phash = %s, phash_failed_at = NULL, phash_error = NULL '
+                        'WHERE id = %s', updates)
+                    stats['hashed'] += len(updates)
+                if failures:
+                    write_cursor.executemany(
+                        'UPDATE photographer_photo SET phash = NULL, phash_failed_at = NOW(), phash_error = %s '
+                        'WHERE id = %s', [(error, photo_id) for error, photo_id, _ in failures])
+                    stats['failed'] += len(failures)
+                    stats['errors'].extend(failures)
+                conn.commit()
+
+                elapsed = time.time() - start_time
+                print(f'   ✓ Hashed {stats["hashed"]} of {stats["checked"]} photos '
+                      f'({stats["hashed"] / elapsed if elapsed > 0 else 0:.1f} img/s)', end='\r')
+    finally:
+        read_cursor.close()
+        write_cursor.close()
+
+    if stats['checked']:
+        print()
+    return stats
+
+
+def load_hashes(conn, category=None, batch_size=5000) -> dict:
+    """{id: (category, image_url, phash)} for every hashed row, read in id order"""
+    photos = {}
+    cursor = conn.cursor()
+    query = 'SELECT id, category, image_url, phash FROM photographer_photo WHERE phash IS NOT NULL AND id > %s'
+    if category:
+        query += ' AND category = %s'
+    query += ' ORDER BY id ASC LIMIT %s'
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(query, (last_id, *([category] if category else []), batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for photo_id, photo_category, image_url, value in rows:
+                photos[photo_id] = (photo_category, image_url, int(value))
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
+    return photos
+
+
+def find_groups(photos: dict, distance: int, across_categories=False) -> list:
+    """Near-duplicate groups (lists of ids), compared within each category unless across_categories"""
+    from media_tools.phash import group_near_duplicates
+
+    by_category = {}
+    for photo_id, (photo_category, _, value) in photos.items():
+        key = None if across_categories else photo_category
+        by_category.setdefault(key, []).append((photo_id, value))
+
+    groups = []
+    for entries in by_category.values():
+        groups.extend(group_near_duplicates(entries, distance))
+    groups.sort(key=lambda group: (-len(group), group[0]))
+    return groups
+
+
+def main():
+    """Main function"""
+    load_env()
+
+    parser = argparse.ArgumentParser(description='Find near-duplicate photos with perceptual hashes')
+    parser.add_argument('--category', help='Only hash and compare this category')
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE,
+                        help=f'Max differing bits (of 64) for near-duplicates (default: {DEFAULT_DISTANCE})')
+    parser.add_argument('--across-categories', action='store_true',
+                        help='Also match photos in different categories')
+    parser.add_argument('--only-new', action='store_true',
+                        help='Only report groups that contain a photo hashed in this run')
+    parser.add_argument('--rehash', action='store_true',
+                        help='Recompute the hash of every photo, including ones that failed before')
+    parser.add_argument('--hash-only', action='store_true', help='Store missing hashes without grouping')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Threads decoding images (default: one per CPU core)')
+    parser.add_argument('--report', type=Path, help='Also write all groups to this JSON file')
+    args = parser.parse_args()
+
+    print('\n' + '=' * 70)
+    print('👯 Near-Duplicate Photo Finder')
+    print('=' * 70)
+    print(f'Distance: up to {args.distance} of 64 bits')
+    print(f'Scope: {args.category or "all categories"}'
+          f'{" (matched across categories)" if args.across_categories else ""}')
+    print('=' * 70 + '\n')
+
+    conn = get_connection()
+    try:
+        print('🔢 Hashing photos without a perceptual hash...')
+        hash_stats = hash_new_photos(conn, args.category, args.rehash, args.workers)
+        if args.hash_only:
+            groups, photos = [], {}
+        else:
+            started = time.perf_counter()
+            photos = load_hashes(conn, args.category)
+            groups = find_groups(photos, args.distance, args.across_categories)
+            print(f'🔎 Compared {len(photos)} photos in {time.perf_counter() - started:.1f}s')
+    finally:
+        conn.close()
+
+    if hash_stats['errors']:
+        print(f'\n⚠️  Could not hash ({len(hash_stats["errors"])}):')
+        for error, photo_id, image_url in hash_stats['errors'][:SHOW_LIMIT]:
+            print(f'   - #{photo_id} {image_url}: {error}')
+        if len(hash_stats['errors']) > SHOW_LIMIT:
+            print(f'   ... and {len(hash_stats["errors"]) - SHOW_LIMIT} more')
+
+    if args.only_new:
+        groups = [group for group in groups if hash_stats['new_ids'].intersection(group)]
+
+    if groups:
+        print(f'\n👯 Near-duplicate groups ({len(groups)}):')
+        for number, group in enumerate(groups[:SHOW_LIMIT], 1):
+            print(f'   {number}. {photos[group[0]][0]} ({len(group)} photos)')
+            for photo_id in group:
+                print(f'      #{photo_id}  {photos[photo_id][1]}')
+        if len(groups) > SHOW_LIMIT:
+            print(f'   ... and {len(groups) - SHOW_LIMIT} more groups')
+
+    if args.report:
+        args.report.write_text(json.dumps({
+            'distance': args.distance,
+            'groups': [
+                [{'id': photo_id, 'category': photos[photo_id][0], 'image_url': photos[photo_id][1],
+                  'phash': f'{photos[photo_id][2]:016x}'} for photo_id in group]
+                for group in groups
+            ],
+        }, indent=2), encoding='utf-8')
+
+    print('\n' + '=' * 70)
+    print('✅ Duplicate Check Complete!')
+    print('=' * 70)
+    print(f'Photos hashed:        {hash_stats["hashed"]}')
+    print(f'Unreadable/missing:   {hash_stats["failed"]} {"⚠️" if hash_stats["failed"] else ""}'
+          f'{" (skipped from now on; --rehash retries them)" if hash_stats["failed"] else ""}')
+    if not args.hash_only:
+        print(f'Photos compared:      {len(photos)}')
+        print(f'Duplicate groups:     {len(groups)} ({sum(len(group) - 1 for group in groups)} extra copies)')
+    if args.report:
+        print(f'Report:               {args.report}')
+    print('=' * 70)
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
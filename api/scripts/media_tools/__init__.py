@@ -0,0 +1,14 @@
+"""
+Shared helpers for the media scripts in api/scripts
+
+Scripts import this package directly (it sits next to them, so running
+`python scripts/<name>.py` puts it on sys.path):
+
+    from media_tools import load_env, get_connection
+
+- config: paths and the .env loader (parsed once per process)
+- db:     a per-process mysql.connector pool with health checks and retry
+"""
+
+from .config import API_DIR, ROOT_DIR, UPLOADS_DIR, PHOTOS_DIR, THUMBNAILS_DIR, load_env, db_config
+from .db import get_pool, get_connection, execute_with_retry, is_transient_error
@@ -0,0 +1,65 @@
+"""Paths and environment configuration shared by the media scripts"""
+
+import os
+import threading
+from pathlib import Path
+
+# Paths
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+API_DIR = SCRIPTS_DIR.parent
+ROOT_DIR = API_DIR.parent
+UPLOADS_DIR = ROOT_DIR / 'uploads'
+PHOTOS_DIR = UPLOADS_DIR / 'photos'
+THUMBNAILS_DIR = PHOTOS_DIR / 'thumbnails'
+
+# Connections opened per process; parallel modes ask for more (mysql.connector allows at most 32)
+DEFAULT_POOL_SIZE = 1
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env(env_file: Path = None):
+    """
+    Load variables from api/.env into os.environ.
+
+    The file is only parsed the first time; later calls (from other scripts
+    or worker threads in the same process) are no-ops.
+    """
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded:
+            return
+        env_file = env_file or API_DIR / '.env'
+        if env_file.exists():
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        os.environ[key.strip()] = value.strip()
+        _env_loaded = True
+
+
+def db_config() -> dict:
+    """MySQL connection settings, from the same DB_* variables as the API"""
+    load_env()
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '3306')),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'database': os.getenv('DB_NAME', 'wedding_rsvp'),
+        'charset': 'utf8mb4',
+        'collation': 'utf8mb4_unicode_ci'
+    }
+
+
+def pool_size() -> int:
+    """Pool size from DB_POOL_SIZE, clamped to what mysql.connector allows"""
+    load_env()
+    try:
+        size = int(os.getenv('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+    except ValueError:
+        size = DEFAULT_POOL_SIZE
+    return max(1, min(size, 32))
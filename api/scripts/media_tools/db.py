@@ -0,0 +1,137 @@
+"""Pooled MySQL connections for the media scripts"""
+
+import os
+import sys
+import time
+import threading
+
+from .config import db_config, pool_size
+
+# mysql.connector takes 20-30 ms to import, so it is only loaded once a
+# connection is actually needed (see get_pool)
+
+# Errors worth retrying: connection refused/lost, too many connections, lock timeouts
+TRANSIENT_ERRNOS = {
+    2002, 2003, 2006, 2013, 2055,  # CR_CONNECTION_ERROR .. CR_SERVER_LOST_EXTENDED
+    1040,                          # ER_CON_COUNT_ERROR
+    1205,                          # ER_LOCK_WAIT_TIMEOUT
+    1213,                          # ER_LOCK_DEADLOCK
+}
+
+# Connect attempts and the first backoff delay (doubled after each failure)
+CONNECT_ATTEMPTS = 4
+RETRY_DELAY_SECONDS = 0.5
+
+# How long get_connection() waits for a free pooled connection
+POOL_WAIT_SECONDS = 60
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_requested_size = 0
+
+
+def is_transient_error(error) -> bool:
+    """True for MySQL errors that usually succeed when retried"""
+    return getattr(error, 'errno', None) in TRANSIENT_ERRNOS
+
+
+def get_pool(size: int = None):
+    """
+    Return this process's connection pool, creating it on first use.
+
+    Each process (e.g. a forked worker) gets its own pool, since sockets
+    cannot be shared across fork. The largest size asked for so far is
+    remembered (even if connecting fails), and a smaller pool is replaced.
+    """
+    global _pool, _pool_pid, _requested_size
+    try:
+        from mysql.connector import pooling
+    except ImportError:
+        raise RuntimeError('mysql-connector-python is not installed: pip3 install mysql-connector-python')
+    with _pool_lock:
+        _requested_size = max(_requested_size, size or 0)
+        size = max(1, min(max(_requested_size, pool_size()), 32))
+        if _pool is None or _pool_pid != os.getpid() or _pool.pool_size < size:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=f'media_tools_{os.getpid()}',
+                pool_size=size,
+                pool_reset_session=True,
+                **db_config()
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def get_connection(exit_on_error=True, quiet=False):
+    """
+    Check a connection out of the pool; close() returns it to the pool.
+
+    The pool pings each connection on checkout and reconnects it if the
+    server dropped it, so idle daemon connections are safe to reuse. Transient connect errors are retried with
+    backoff; other errors exit the script, or are raised with
+    exit_on_error=False.
+    """
+    import mysql.connector
+    from mysql.connector import pooling
+    
+    delay = RETRY_DELAY_SECONDS
+    attempt = 1
+    deadline = time.time() + POOL_WAIT_SECONDS
+    while True:
+        try:
+            conn = get_pool().get_connection()
+            if not quiet:
+                print('✓ MySQL database connected successfully')
+            return conn
+        except pooling.PoolError as err:
+            # All pooled connections are checked out; wait for one to come back
+            if 'exhausted' in str(err) and time.time() < deadline:
+                time.sleep(0.1)
+                continue
+            error = err
+        except mysql.connector.Error as err:
+            if is_transient_error(err) and attempt < CONNECT_ATTEMPTS:
+                time.sleep(delay)
+                delay *= 2
+                attempt += 1
+                continue
+            error = err
+        if not quiet:
+            print(f'✗ MySQL database connection failed: {error}')
+        if not exit_on_error:
+            raise error
+        sys.exit(1)
+
+
+def execute_with_retry(conn, query, params=(), attempts=3) -> int:
+    """
+    Execute and commit one idempotent statement, retrying transient errors.
+
+    On a lost connection the statement is rolled back, the connection is
+    re-established with ping(reconnect=True) and the statement re-run.
+    Returns the affected row count.
+    """
+    import mysql.connector
+    
+    delay = RETRY_DELAY_SECONDS
+    for attempt in range(1, attempts + 1):
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                rowcount = cursor.rowcount
+            finally:
+                cursor.close()
+            conn.commit()
+            return rowcount
+        except mysql.connector.Error as err:
+            if not is_transient_error(err) or attempt == attempts:
+                raise
+            try:
+                conn.rollback()
+            except mysql.connector.Error:
+                pass
+            time.sleep(delay)
+            delay *= 2
+            conn.ping(reconnect=True, attempts=3, delay=1)
@@ -0,0 +1,173 @@
+"""
+Micro-benchmarks of the machine the media scripts run on (used by test-setup.py)
+
+Each function measures one resource with a short, bounded test and returns
+a dict of numbers; estimate_backlog() turns them into a time estimate for
+the photos still waiting for thumbnails.
+"""
+
+import os
+import time
+import random
+import statistics
+from pathlib import Path
+
+# Sequential write test: SEQ_WRITE_MB in 1 MB blocks, then fsync
+SEQ_WRITE_MB = 64
+
+# Random write test: RANDOM_WRITES 4 KB blocks at random offsets of a
+# RANDOM_FILE_MB file, fsync every RANDOM_SYNC_EVERY writes
+RANDOM_WRITES = 2000
+RANDOM_FILE_MB = 64
+RANDOM_SYNC_EVERY = 100
+
+# MySQL latency test
+ROUND_TRIPS = 50
+COMMITS = 20
+PROBE_TABLE = '_perf_doctor_probe'
+
+# Thumbnail test: sample photo size when the database has no dimensions yet
+DEFAULT_SAMPLE_SIZE = (4000, 3000)
+THUMBNAIL_RUNS = 5
+
+
+def measure_disk_writes(directory: Path) -> dict:
+    """Sequential MB/s (with fsync) and random 4 KB write IOPS in `directory`"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'.perf-doctor-{os.getpid()}.tmp'
+    block = os.urandom(1024 * 1024)
+    try:
+        started = time.perf_counter()
+        with open(path, 'wb', buffering=0) as f:
+            for _ in range(SEQ_WRITE_MB):
+                f.write(block)
+            os.fsync(f.fileno())
+        seq_seconds = time.perf_counter() - started
+
+        small = block[:4096]
+        blocks = RANDOM_FILE_MB * 256
+        rng = random.Random(0)
+        started = time.perf_counter()
+        with open(path, 'r+b', buffering=0) as f:
+            for i in range(1, RANDOM_WRITES + 1):
+                f.seek(rng.randrange(blocks) * 4096)
+                f.write(small)
+                if i % RANDOM_SYNC_EVERY == 0:
+                    os.fsync(f.fileno())
+        random_seconds = time.perf_counter() - started
+    finally:
+        path.unlink(missing_ok=True)
+
+    return {
+        'seq_mb_per_sec': SEQ_WRITE_MB / seq_seconds,
+        'random_iops': RANDOM_WRITES / random_seconds,
+        'random_mb_per_sec': RANDOM_WRITES * 4096 / random_seconds / 1024 / 1024,
+    }
+
+
+def measure_mysql_latency(conn) -> dict:
+    """
+    Median/p95 SELECT 1 round trip and INSERT+COMMIT latency in ms.
+
+    The commit test uses a small scratch table that is dropped afterwards;
+    a temporary table would not be redo-logged and so would not measure
+    the cost of a durable commit.
+    """
+    cursor = conn.cursor()
+    try:
+        round_trips = []
+        for _ in range(ROUND_TRIPS):
+            started = time.perf_counter()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            round_trips.append((time.perf_counter() - started) * 1000)
+
+        commits = []
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS `{PROBE_TABLE}` '
+                       '(id INT AUTO_INCREMENT PRIMARY KEY, note VARCHAR(32)) ENGINE=InnoDB')
+        try:
+            for _ in range(COMMITS):
+                started = time.perf_counter()
+                cursor.execute(f'INSERT INTO `{PROBE_TABLE}` (note) VALUES (%s)', ('probe',))
+                conn.commit()
+                commits.append((time.perf_counter() - started) * 1000)
+        finally:
+            cursor.execute(f'DROP TABLE IF EXISTS `{PROBE_TABLE}`')
+    finally:
+        cursor.close()
+
+    return {
+        'round_trip_ms': statistics.median(round_trips),
+        'round_trip_p95_ms': sorted(round_trips)[int(len(round_trips) * 0.95) - 1],
+        'commit_ms': statistics.median(commits),
+        'commit_p95_ms': sorted(commits)[int(len(commits) * 0.95) - 1],
+    }
+
+
+def make_sample_photo(path: Path, size=DEFAULT_SAMPLE_SIZE):
+    """Write a camera-sized JPEG whose content compresses roughly like a photo"""
+    from PIL import Image
+
+    width, height = size
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 24)
+    Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT))).save(
+        path, format='JPEG', quality=92
+    )
+
+
+def measure_thumbnail_rate(optimize_image, directory: Path, size=DEFAULT_SAMPLE_SIZE) -> dict:
+    """
+    Single-core img/s of optimize_image(source, thumbnail) on a generated
+    sample, i.e. the real decode + resize + encode path and its settings.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    source = directory / f'.perf-doctor-{os.getpid()}-source.jpg'
+    thumbnail = directory / f'.perf-doctor-{os.getpid()}-thumb.jpg'
+    try:
+        make_sample_photo(source, size)
+        optimize_image(source, thumbnail)  # warm-up (codec setup, caches)
+        started = time.perf_counter()
+        for _ in range(THUMBNAIL_RUNS):
+            result = optimize_image(source, thumbnail)
+            if not result['success']:
+                raise RuntimeError(result.get('error', 'thumbnail failed'))
+        seconds = (time.perf_counter() - started) / THUMBNAIL_RUNS
+        return {
+            'images_per_sec': 1 / seconds,
+            'source_mb': source.stat().st_size / 1024 / 1024,
+            'thumbnail_kb': thumbnail.stat().st_size / 1024,
+            'size': size,
+        }
+    finally:
+        source.unlink(missing_ok=True)
+        thumbnail.unlink(missing_ok=True)
+
+
+def estimate_backlog(pending: int, thumbnail: dict, mysql: dict = None, disk: dict = None,
+                     cores: int = None) -> dict:
+    """
+    Seconds to thumbnail `pending` photos, for one process and for all cores.
+
+    Per photo: the CPU time measured above, one UPDATE+COMMIT, and writing
+    the thumbnail at the measured random-write speed (thumbnails are small
+    scattered writes). Parallel runs spread that over the cores but cannot
+    go faster than the disk can take the thumbnails.
+    """
+    cores = cores or os.cpu_count() or 1
+    cpu = 1 / thumbnail['images_per_sec']
+    commit = (mysql['commit_ms'] / 1000) if mysql else 0
+    write = (thumbnail['thumbnail_kb'] / 1024 / disk['random_mb_per_sec']) if disk else 0
+    return {
+        'cores': cores,
+        'single_seconds': pending * (cpu + commit + write),
+        'parallel_seconds': pending * max((cpu + commit + write) / cores, write),
+    }
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 90:
+        return f'{seconds:.0f} s'
+    if seconds < 5400:
+        return f'{seconds / 60:.0f} min'
+    return f'{seconds / 3600:.1f} h'
@@ -0,0 +1,137 @@
+"""
+Sampling-based cost estimates for dry runs
+
+A dry run times the real work on a sample of the items and extrapolates:
+
+    sample = stratified_sample(items, size_of, sample_size(len(items)))
+    ... time each sampled item ...
+    total, margin = ratio_estimate(seconds, sample_bytes, all_bytes, len(items))
+
+The sample is spread evenly over the size range (one random item per size
+stratum), and totals are scaled by size (ratio estimator), since decode and
+write costs grow with file size. Margins are 95% confidence half-widths
+with the finite population correction, so they shrink to 0 when every item
+was sampled.
+"""
+
+import os
+import math
+import random
+
+# Sample size: enough for +/-10% at 95% confidence when per-item cost varies
+# by about 50% of its mean (typical for mixed photo sizes), within bounds
+TARGET_RELATIVE_ERROR = 0.10
+ASSUMED_CV = 0.5
+MIN_SAMPLE = 10
+MAX_SAMPLE = 60
+
+# Two-sided 95% Student t quantiles by degrees of freedom (1.96 beyond 30)
+T_95 = (12.71, 4.30, 3.18, 2.78, 2.57, 2.45, 2.36, 2.31, 2.26, 2.23,
+        2.20, 2.18, 2.16, 2.14, 2.13, 2.12, 2.11, 2.10, 2.09, 2.09,
+        2.08, 2.07, 2.07, 2.06, 2.06, 2.06, 2.05, 2.05, 2.05, 2.04)
+
+
+def t_quantile(degrees_of_freedom: int) -> float:
+    if degrees_of_freedom < 1:
+        return float('inf')
+    return T_95[degrees_of_freedom - 1] if degrees_of_freedom <= len(T_95) else 1.96
+
+
+def sample_size(population: int, cv: float = ASSUMED_CV, relative_error: float = TARGET_RELATIVE_ERROR) -> int:
+    """Items to time for the target margin, with the finite population correction"""
+    if population <= 0:
+        return 0
+    n0 = (1.96 * cv / relative_error) ** 2
+    n = math.ceil(n0 / (1 + (n0 - 1) / population))
+    return min(population, max(MIN_SAMPLE, min(MAX_SAMPLE, n)))
+
+
+def stratified_sample(items: list, size_of, n: int, seed=None) -> list:
+    """n items, one picked at random from each of n equal strata of the size-sorted items"""
+    if n >= len(items):
+        return list(items)
+    rng = random.Random(seed)
+    ordered = sorted(items, key=size_of)
+    bounds = [round(i * len(ordered) / n) for i in range(n + 1)]
+    return [ordered[rng.randrange(start, end)] for start, end in zip(bounds, bounds[1:])]
+
+
+def ratio_estimate(values: list, sizes: list, total_size: float, population: int) -> tuple:
+    """
+    (estimated total, 95% margin) of a per-item value over the population,
+    from sampled values and sizes and the known size of all items.
+    """
+    n = len(values)
+    if n == 0 or population == 0:
+        return 0.0, 0.0
+    size_sum = sum(sizes)
+    if size_sum <= 0:
+        # No usable sizes: fall back to the mean per item
+        ratio_sizes, total_size = [1] * n, population
+        size_sum = n
+    else:
+        ratio_sizes = sizes
+    ratio = sum(values) / size_sum
+    estimate = ratio * total_size
+    if n >= population:
+        return estimate, 0.0
+    if n < 2:
+        return estimate, estimate  # one item says nothing about the spread
+    residual_variance = sum((v - ratio * s) ** 2 for v, s in zip(values, ratio_sizes)) / (n - 1)
+    standard_error = population * math.sqrt((1 - n / population) * residual_variance / n)
+    return estimate, t_quantile(n - 1) * standard_error
+
+
+def proportion_interval(hits: int, n: int, population: int) -> tuple:
+    """(estimated count, 95% margin) of items with some property, from hits of n sampled"""
+    if n == 0:
+        return 0.0, 0.0
+    p = hits / n
+    if n >= population:
+        return p * population, 0.0
+    margin = 1.96 * math.sqrt(p * (1 - p) / n * (1 - n / population)) * population
+    # Zero hits still leaves room for a few (rule of three)
+    if hits == 0:
+        margin = min(population, 3 / n * population)
+    return p * population, margin
+
+
+def worker_counts(limit: int = None) -> list:
+    """1, 2, 4 ... up to the CPU count (or limit): the parallelism levels to report"""
+    cores = limit or os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    counts.append(cores)
+    return counts
+
+
+def parallel_seconds(seconds: float, workers: int) -> float:
+    """Wall time of `seconds` of independent work spread over workers (capped at the core count)"""
+    return seconds / max(1, min(workers, os.cpu_count() or 1))
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 10:
+        return f'{seconds:.1f}s'
+    if seconds < 90:
+        return f'{seconds:.0f}s'
+    if seconds < 5400:
+        return f'{seconds / 60:.1f} min'
+    return f'{seconds / 3600:.1f} h'
+
+
+def format_bytes(count: float) -> str:
+    if count < 1024 * 1024:
+        return f'{count / 1024:.0f} KB'
+    if count < 1024 ** 3:
+        return f'{count / 1024 / 1024:.1f} MB'
+    return f'{count / 1024 ** 3:.2f} GB'
+
+
+def format_interval(value: float, margin: float, formatter) -> str:
+    """'12.3 min ± 1.1 min' (just the value when exact)"""
+    if margin <= 0:
+        return formatter(value)
+    return f'{formatter(value)} ± {formatter(margin)}'
@@ -0,0 +1,150 @@
+"""
+Perceptual hashes and a multi-index table for finding near-duplicate photos
+
+A pHash is 64 bits describing the low frequencies of a 32x32 greyscale
+copy of the image, so it survives resizing, re-encoding and small edits;
+burst shots and re-exports differ in only a few bits. hamming() counts the
+differing bits, and MultiIndex finds every hash within a distance without
+comparing all pairs.
+"""
+
+from pathlib import Path
+
+HASH_SIZE = 8      # 8x8 low-frequency DCT coefficients -> 64 bits
+SAMPLE_SIZE = 32   # the image is reduced to 32x32 greyscale before the DCT
+
+_dct_matrix = None
+
+
+def _dct():
+    """Orthogonal DCT-II matrix for SAMPLE_SIZE points (built once)"""
+    global _dct_matrix
+    if _dct_matrix is None:
+        import numpy as np
+        n = np.arange(SAMPLE_SIZE)
+        matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * SAMPLE_SIZE))
+        matrix[0] /= np.sqrt(2)
+        _dct_matrix = matrix * np.sqrt(2 / SAMPLE_SIZE)
+    return _dct_matrix
+
+
+def image_phash(path: Path) -> int:
+    """
+    64-bit pHash of an image file.
+
+    JPEGs are decoded at reduced scale (draft mode), so a 24 MP photo costs
+    a fraction of a full decode. EXIF orientation is applied first, so a
+    rotated re-export hashes like the original.
+    """
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+        img.draft('L', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+        img = ImageOps.exif_transpose(img)
+        pixels = np.asarray(
+            img.convert('L').resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.LANCZOS),
+            dtype=np.float64
+        )
+
+    matrix = _dct()
+    low = (matrix @ pixels @ matrix.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # The DC term (overall brightness) would skew the median
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+if not hasattr(int, 'bit_count'):  # Python < 3.10
+    def hamming(a: int, b: int) -> int:
+        return bin(a ^ b).count('1')
+
+
+class MultiIndex:
+    """
+    Multi-index hash tables over 64-bit hashes (Norouzi et al.).
+
+    Each hash is split into CHUNKS 16-bit chunks with one table per chunk.
+    Two hashes within `radius` bits differ in at most radius // CHUNKS bits
+    in at least one chunk (pigeonhole), so a search only looks up the
+    buckets within that small distance of each chunk and compares the few
+    hashes found there, instead of every hash. Items can be added at any time.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = 16
+
+    def __init__(self):
+        self.tables = [{} for _ in range(self.CHUNKS)]
+        self.size = 0
+        self._flips = {}
+
+    def _chunks(self, value: int):
+        mask = (1 << self.CHUNK_BITS) - 1
+        return [(value >> (i * self.CHUNK_BITS)) & mask for i in range(self.CHUNKS)]
+
+    def _neighbours(self, chunk_radius: int) -> list:
+        """XOR masks of every chunk value within chunk_radius bits (cached)"""
+        masks = self._flips.get(chunk_radius)
+        if masks is None:
+            masks = {0}
+            for _ in range(chunk_radius):
+                masks |= {mask | (1 << bit) for mask in masks for bit in range(self.CHUNK_BITS)}
+            self._flips[chunk_radius] = masks = sorted(masks)
+        return masks
+
+    def add(self, value: int, item):
+        self.size += 1
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            table.setdefault(chunk, []).append((value, item))
+
+    def search(self, value: int, radius: int) -> list:
+        """(distance, item) for every item whose hash is within radius of value"""
+        masks = self._neighbours(radius // self.CHUNKS)
+        matches = {}
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            for mask in masks:
+                for other, item in table.get(chunk ^ mask, ()):
+                    if item not in matches:
+                        distance = hamming(value, other)
+                        if distance <= radius:
+                            matches[item] = distance
+        return [(distance, item) for item, distance in matches.items()]
+
+    def __len__(self):
+        return self.size
+
+
+def group_near_duplicates(entries, radius: int) -> list:
+    """
+    Groups (lists of ids, two or more) of entries whose hashes are within
+    radius of each other, directly or through a chain of matches.
+
+    entries: iterable of (id, hash). Each entry is looked up in the index
+    of the ones before it and then added, so every pair is found once.
+    """
+    parent = {}
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    index = MultiIndex()
+    for item, value in entries:
+        parent[item] = item
+        for _, other in index.search(value, radius):
+            root_a, root_b = find(item), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        index.add(value, item)
+
+    groups = {}
+    for item in parent:
+        groups.setdefault(find(item), []).append(item)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
@@ -0,0 +1,203 @@
+"""
+Shared --profile / --trace-malloc hooks for the media and export scripts
+
+    parser = argparse.ArgumentParser(...)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    session = start_profiling(args, 'optimize-images')
+    ...
+    session.stats.update(stats)   # included in stats.json
+
+Everything is written when the process exits (including sys.exit) to
+profiles/<script>-<timestamp>/:
+
+- profile.pstats / profile.txt   cProfile of the main thread (--profile)
+- tracemalloc.txt                top allocating lines and peak (--trace-malloc)
+- samples.folded / timeline.csv  stack samples of all threads and RSS/CPU
+                                 over time (--profile-interval MS)
+- stats.json                     wall/CPU time, peak RSS and the run's stats
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .config import ROOT_DIR
+
+PROFILE_DIR = ROOT_DIR / 'profiles'
+
+# Lines listed in profile.txt and tracemalloc.txt
+PROFILE_TOP = 40
+
+
+def add_profile_arguments(parser):
+    """
+    Add the shared profiling options to an argparse parser.
+    migration_database/export_supabase_to_mysql.py keeps an identical copy
+    (it runs without api/); change both together.
+    """
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help='Record a cProfile of the run (written to profiles/<script>-<timestamp>/)')
+    group.add_argument('--trace-malloc', action='store_true',
+                       help='Record the top allocating lines with tracemalloc (slows the run down)')
+    group.add_argument('--profile-interval', type=float, default=0, metavar='MS',
+                       help='Also sample all thread stacks and RSS/CPU every MS milliseconds')
+    group.add_argument('--profile-dir', type=Path, default=PROFILE_DIR,
+                       help=f'Where to create the timestamped profile folder (default: {PROFILE_DIR})')
+    return parser
+
+
+def current_rss_kb() -> int:
+    """Resident set size of this process in KB (0 where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_kb() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks of all other threads every `interval` seconds"""
+
+    def __init__(self, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.stacks = {}
+        self.timeline = []
+
+    def run(self):
+        started = time.perf_counter()
+        names = {}
+        while not self.stop_event.wait(self.interval):
+            names.update((t.ident, t.name) for t in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})')
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.timeline.append((time.perf_counter() - started, current_rss_kb(), time.process_time()))
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+class ProfileSession:
+    """One profiled run; finish() writes the report folder"""
+
+    def __init__(self, name: str, args):
+        self.name = name
+        self.stats = {}
+        self.output_dir = Path(args.profile_dir) / f'{name}-{datetime.now().strftime("%Y%m%d-%H%M%S")}'
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.profiler = None
+        self.sampler = None
+        self.trace_malloc = args.trace_malloc
+        self.finished = False
+
+        if self.trace_malloc:
+            import tracemalloc
+            tracemalloc.start()
+        if args.profile_interval > 0:
+            self.sampler = StackSampler(args.profile_interval / 1000)
+            self.sampler.start()
+        if args.profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        if self.profiler:
+            self.profiler.disable()
+        if self.sampler:
+            self.sampler.stop()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.profiler:
+            import pstats
+            self.profiler.dump_stats(str(self.output_dir / 'profile.pstats'))
+            text = io.StringIO()
+            report = pstats.Stats(self.profiler, stream=text).strip_dirs()
+            report.sort_stats('cumulative').print_stats(PROFILE_TOP)
+            report.sort_stats('tottime').print_stats(PROFILE_TOP)
+            (self.output_dir / 'profile.txt').write_text(text.getvalue(), encoding='utf-8')
+
+        if self.trace_malloc:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f'Traced memory: {current / 1024 / 1024:.1f} MB now, {peak / 1024 / 1024:.1f} MB peak', '']
+            for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                lines.append(str(stat))
+            (self.output_dir / 'tracemalloc.txt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+        if self.sampler:
+            with open(self.output_dir / 'samples.folded', 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.sampler.stacks.items(), key=lambda item: -item[1]):
+                    f.write(f'{stack} {count}\n')
+            with open(self.output_dir / 'timeline.csv', 'w', encoding='utf-8') as f:
+                f.write('seconds,rss_kb,cpu_seconds\n')
+                for seconds, rss_kb, cpu in self.sampler.timeline:
+                    f.write(f'{seconds:.3f},{rss_kb},{cpu:.3f}\n')
+
+        summary = {
+            'script': self.name,
+            'argv': sys.argv[1:],
+            'wall_seconds': round(time.perf_counter() - self.started, 3),
+            'cpu_seconds': round(time.process_time() - self.cpu_started, 3),
+            'peak_rss_kb': peak_rss_kb(),
+            'stats': self.stats,
+        }
+        (self.output_dir / 'stats.json').write_text(json.dumps(summary, indent=2, default=str), encoding='utf-8')
+        print(f'\n📊 Profile written to {self.output_dir}')
+
+
+class NullSession:
+    """Stand-in when profiling is off, so scripts can always update .stats"""
+
+    def __init__(self):
+        self.stats = {}
+
+    def finish(self):
+        pass
+
+
+def start_profiling(args, name: str):
+    """
+    Start whatever the profiling options ask for and register the report
+    to be written at exit. Returns a session whose .stats dict is saved
+    to stats.json.
+    """
+    if not (args.profile or args.trace_malloc or args.profile_interval > 0):
+        return NullSession()
+    session = ProfileSession(name, args)
+    atexit.register(session.finish)
+    return session
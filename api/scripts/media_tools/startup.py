@@ -0,0 +1,172 @@
+"""
+Startup-time budget for the scripts the API spawns
+
+The API runs optimize-images.py after every upload, so its interpreter and
+import time is paid per photo. This runs a script under `python -X importtime`
+and checks that heavy modules stay out of the startup path and that total
+import time stays within budget. Besides --help, it times the runs that have
+nothing to do (an empty ZIP folder, --new with no photos pending, and their
+dry runs). These run against an empty stand-in database and a throwaway
+uploads folder, so no MySQL server is needed and nothing real is touched:
+
+    python3 -m media_tools.startup          (from api/scripts; exit 1 on failure)
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .config import SCRIPTS_DIR
+
+# Total import time allowed per script, interpreter startup modules included.
+# About 20-30 ms with lazy imports; importing Pillow and mysql.connector
+# up front added another 35-50 ms
+STARTUP_BUDGET_MS = 40
+
+# Modules that must only be imported once a script actually needs them
+LAZY_MODULES = ('PIL', 'mysql', 'numpy')
+
+# Scripts and arguments checked by default. --help exits after argument
+# parsing; the others are the no-work runs ({empty_dir} is an empty folder)
+STARTUP_CHECKS = (
+    ('optimize-images.py', ('--help',)),
+    ('optimize-images.py', ('--new',)),
+    ('optimize-images.py', ('--new', '--dry-run')),
+    ('process-zip-folder.py', ('--help',)),
+    ('process-zip-folder.py', ('{empty_dir}', 'pre-wedding')),
+    ('process-zip-folder.py', ('{empty_dir}', 'pre-wedding', '--dry-run')),
+)
+
+# Child process for no-work runs: swap in the empty database and the
+# throwaway uploads folder, then run the script as __main__
+RUN_WITHOUT_DATABASE = (
+    'import sys; sys.path.insert(0, sys.argv[1]); '
+    'from media_tools import startup; startup.run_without_database(sys.argv[2], sys.argv[3], sys.argv[4:])'
+)
+
+
+class EmptyCursor:
+    """Cursor whose queries find nothing (SELECT CURRENT_TIMESTAMP returns the local time)"""
+
+    def __init__(self, dictionary=False):
+        self.dictionary = dictionary
+        self.query = ''
+
+    def execute(self, query, params=()):
+        self.query = query
+
+    def executemany(self, query, rows):
+        self.query = query
+
+    def fetchone(self):
+        if 'CURRENT_TIMESTAMP' not in self.query:
+            return None
+        return {'now': datetime.now()} if self.dictionary else (datetime.now(),)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class EmptyDatabase:
+    """Stand-in for a pooled connection to a database with no photos"""
+
+    def cursor(self, dictionary=False, **kwargs):
+        return EmptyCursor(dictionary)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def run_without_database(script: str, uploads_dir: str, args: list):
+    """Run a script as __main__ with get_connection() returning an EmptyDatabase and uploads in uploads_dir"""
+    import runpy
+    import media_tools
+    from . import config, db
+
+    uploads = Path(uploads_dir)
+    for module in (media_tools, config):
+        module.UPLOADS_DIR = uploads
+        module.PHOTOS_DIR = uploads / 'photos'
+        module.THUMBNAILS_DIR = uploads / 'photos' / 'thumbnails'
+    media_tools.get_connection = db.get_connection = lambda *args, **kwargs: EmptyDatabase()
+    sys.argv = [script, *args]
+    runpy.run_path(script, run_name='__main__')
+
+
+def import_profile(script: Path, args=('--help',)) -> dict:
+    """
+    Run a script under -X importtime and summarise its imports.
+
+    Returns total_ms (sum of the top-level cumulative times), the set of
+    top-level packages that were imported and the exit status.
+    """
+    import tempfile
+    import subprocess
+
+    with tempfile.TemporaryDirectory(prefix='startup-check-') as tmp:
+        if '--help' in args:
+            command = [str(script), *args]
+        else:
+            empty_dir = Path(tmp) / 'empty'
+            empty_dir.mkdir()
+            command = ['-c', RUN_WITHOUT_DATABASE, str(script.parent), str(script), str(Path(tmp) / 'uploads'),
+                       *(arg.format(empty_dir=empty_dir) for arg in args)]
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', *command],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=60
+        )
+    total_us = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line.split('|', 2)
+        packages.add(name.strip().split('.')[0])
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative)
+    return {'total_ms': total_us / 1000, 'packages': packages, 'returncode': result.returncode}
+
+
+def check_startup(script: Path, args=('--help',), budget_ms: float = STARTUP_BUDGET_MS, runs: int = 3) -> tuple:
+    """
+    Problems found for one script (empty list means within budget) and its
+    import time, taking the fastest of `runs` runs to smooth out noise.
+    """
+    profile = min((import_profile(script, args) for _ in range(runs)), key=lambda p: p['total_ms'])
+    problems = [f'imports {name} at startup' for name in LAZY_MODULES if name in profile['packages']]
+    if profile['returncode'] != 0:
+        problems.append(f'exited with status {profile["returncode"]}')
+    if profile['total_ms'] > budget_ms:
+        problems.append(f'import time {profile["total_ms"]:.0f} ms exceeds the {budget_ms} ms budget')
+    return problems, profile['total_ms']
+
+
+def describe(name: str, args) -> str:
+    """'process-zip-folder.py <empty folder> pre-wedding' for output"""
+    return ' '.join([name, *(arg.replace('{empty_dir}', '<empty folder>') for arg in args)])
+
+
+def main():
+    failed = False
+    for name, args in STARTUP_CHECKS:
+        problems, total_ms = check_startup(SCRIPTS_DIR / name, args)
+        if problems:
+            failed = True
+            print(f'❌ {describe(name, args)}: {"; ".join(problems)}')
+        else:
+            print(f'✅ {describe(name, args)}: {total_ms:.0f} ms of imports (budget {STARTUP_BUDGET_MS} ms)')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
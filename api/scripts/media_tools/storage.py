@@ -0,0 +1,190 @@
+"""
+Where photo and thumbnail files live under uploads/photos
+
+Two layouts, chosen with PHOTO_STORAGE_LAYOUT in api/.env:
+
+- flat (default): uploads/photos/<name>, thumbnails/thumb_<id>.jpg
+- sharded:        uploads/photos/ab/cd/<sha256>.<ext>, thumbnails/ab/cd/<sha256>.jpg
+
+In the sharded layout originals are content-addressed (named by the SHA-256
+of their bytes), so identical files are stored once, and no directory ever
+holds more than a few hundred entries. URLs keep the /uploads/photos/
+prefix, so the API serves and deletes both layouts the same way.
+migrate-storage-layout.py moves existing files between them.
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+from pathlib import Path, PurePosixPath
+
+from .config import PHOTOS_DIR, load_env
+
+LAYOUTS = ('flat', 'sharded')
+
+PHOTOS_URL_PREFIX = '/uploads/photos/'
+THUMBNAILS_SUBDIR = 'thumbnails'
+
+SHARDED_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/')
+
+# Names the API, the importers and the optimizer give the files they create:
+# photo-*, thumbnails/[ab/cd/]thumb_<id>.jpg and [thumbnails/]ab/cd/<sha256>[-<suffix>].<ext>
+# (the suffix is a category or photo id when a row needs its own copy).
+# Anything else in uploads/photos (e.g. the website's bride/LIFE9617.jpg or
+# placeholder.svg) was put there by hand and is not tracked in the database
+GENERATED_RE = re.compile(
+    r'^(?:photo-[^/]+'
+    r'|thumbnails/(?:[0-9a-f]{2}/[0-9a-f]{2}/)?thumb_\d+\.jpg'
+    r'|(?:thumbnails/)?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:-[A-Za-z0-9-]+)?\.[A-Za-z0-9]+)$'
+)
+
+
+def storage_layout() -> str:
+    """Configured layout for new files (PHOTO_STORAGE_LAYOUT, default flat)"""
+    load_env()
+    layout = os.getenv('PHOTO_STORAGE_LAYOUT', 'flat').strip().lower()
+    if layout not in LAYOUTS:
+        raise ValueError(f'PHOTO_STORAGE_LAYOUT must be one of {", ".join(LAYOUTS)}, not {layout!r}')
+    return layout
+
+
+def shard_path(digest: str, suffix: str) -> str:
+    """'ab/cd/abcd....<suffix>' for a hex digest"""
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{suffix}'
+
+
+def is_sharded(relpath: str) -> bool:
+    """True for paths (relative to uploads/photos or thumbnails) in the sharded layout"""
+    return bool(SHARDED_RE.match(relpath))
+
+
+def is_generated(relpath: str) -> bool:
+    """True for paths (relative to uploads/photos) named like files the tools create"""
+    return bool(GENERATED_RE.match(relpath))
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def photo_relpath(data: bytes, suffix: str, flat_name: str, layout: str = None) -> str:
+    """
+    Path of a new original relative to uploads/photos: flat_name in the flat
+    layout, the content-addressed shard path in the sharded layout.
+    """
+    if (layout or storage_layout()) == 'sharded':
+        return shard_path(hashlib.sha256(data).hexdigest(), suffix.lower())
+    return flat_name
+
+
+def category_relpath(relpath: str, category: str) -> str:
+    """
+    'ab/cd/<sha256>-brides-dinner.jpg' for 'ab/cd/<sha256>.jpg': the name used
+    when a photo is imported into another category than the row already
+    using its file, so each row keeps a file of its own
+    """
+    path = PurePosixPath(relpath)
+    return str(path.with_name(f'{path.stem}-{category}{path.suffix}'))
+
+
+def url_to_relpath(url: str):
+    """'ab/cd/x.jpg' for '/uploads/photos/ab/cd/x.jpg'; None for other URLs"""
+    if url and url.startswith(PHOTOS_URL_PREFIX):
+        return url[len(PHOTOS_URL_PREFIX):]
+    return None
+
+
+def relpath_to_url(relpath: str) -> str:
+    return PHOTOS_URL_PREFIX + relpath
+
+
+def thumbnail_relpath(photo_id: int, image_url: str, layout: str = None) -> str:
+    """
+    Thumbnail path relative to uploads/photos for a photo.
+
+    Sharded originals get the thumbnail at the same shard path; flat
+    originals in the sharded layout are sharded by their id.
+    """
+    if (layout or storage_layout()) == 'sharded':
+        relpath = url_to_relpath(image_url)
+        if relpath and is_sharded(relpath):
+            return f'{THUMBNAILS_SUBDIR}/{PurePosixPath(relpath).with_suffix(".jpg")}'
+        digest = hashlib.sha256(f'thumb:{photo_id}'.encode('utf-8')).hexdigest()
+        return f'{THUMBNAILS_SUBDIR}/{digest[:2]}/{digest[2:4]}/thumb_{photo_id}.jpg'
+    return f'{THUMBNAILS_SUBDIR}/thumb_{photo_id}.jpg'
+
+
+def temporary_path(path: Path) -> Path:
+    """
+    Hidden sibling of path to write to before renaming into place. Unique per
+    process and thread: --daemon workers are threads of one process and, in
+    the sharded layout, can write the same content-addressed file at once.
+    """
+    return path.with_name(f'.{path.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+
+
+def write_file_atomic(path: Path, data: bytes) -> bool:
+    """
+    Write data to path via a temporary file and rename, creating shard
+    directories as needed. An existing file of the same size is left alone
+    (same name means same content in both layouts). Returns True if written.
+    """
+    try:
+        if path.stat().st_size == len(data):
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temporary_path(path)
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return True
+
+
+def link_or_copy(source: Path, dest: Path):
+    """
+    Give source a second name at dest (hard link, or copy across filesystems).
+    The link or copy is made under a temporary name and renamed over dest, so
+    concurrent calls for the same dest all succeed.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if os.path.samefile(source, dest):
+            return
+    except FileNotFoundError:
+        pass
+    tmp_path = temporary_path(dest)
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, dest)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def remove_empty_shards(path: Path):
+    """Remove the ab/cd shard directories of a deleted file if they are now empty"""
+    for directory in (path.parent, path.parent.parent):
+        if len(directory.name) != 2 or directory in (PHOTOS_DIR, PHOTOS_DIR / THUMBNAILS_SUBDIR):
+            return
+        try:
+            directory.rmdir()
+        except OSError:
+            return
+
+
+def photos_path(relpath: str) -> Path:
+    """Absolute path of a file relative to uploads/photos"""
+    return PHOTOS_DIR / relpath
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Storage Layout Migration Script
+Moves existing photos and thumbnails between the flat and the hash-sharded
+layout of uploads/photos and rewrites image_url/thumbnail_url to match
+
+Usage:
+    python scripts/migrate-storage-layout.py [--to sharded|flat] [--batch-size 500] [--dry-run]
+
+Safe to run while the site is live: each file is first hard-linked (or
+copied) to its new path, the batch's URLs are updated in one transaction,
+and only then are the old paths removed, so every URL in the database
+points at an existing file at all times. Progress is saved after every
+batch; rerunning continues where the last run stopped, and rows already in
+the target layout are skipped. Set PHOTO_STORAGE_LAYOUT in api/.env to the
+same layout so new uploads use it too.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path, PurePosixPath
+from media_tools import load_env, get_connection, PHOTOS_DIR, UPLOADS_DIR
+from media_tools.storage import (
+    LAYOUTS, is_sharded, shard_path, file_digest, url_to_relpath, relpath_to_url, thumbnail_relpath,
+    remove_empty_shards, link_or_copy
+)
+
+# Rows per batch (one UPDATE transaction each)
+BATCH_SIZE = 500
+
+# Pause between batches so a live site keeps its I/O headroom
+BATCH_PAUSE_SECONDS = 0.2
+
+# Last processed id, so an interrupted run resumes instead of rescanning
+STATE_FILE = UPLOADS_DIR / '.storage-migration.json'
+
+
+def load_state(target: str) -> int:
+    """Last id handled by a previous run towards the same layout"""
+    try:
+        state = json.loads(STATE_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return 0
+    return state.get('last_id', 0) if state.get('target') == target else 0
+
+
+def save_state(target: str, last_id: int):
+    tmp_path = STATE_FILE.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'target': target, 'last_id': last_id}), encoding='utf-8')
+    os.replace(tmp_path, STATE_FILE)
+
+
+def in_layout(relpath: str, target: str) -> bool:
+    """True if a path relative to uploads/photos already follows the target layout"""
+    if target == 'sharded':
+        return is_sharded(relpath)
+    return '/' not in relpath
+
+
+def target_photo_relpath(source: Path, relpath: str, photo_id: int, target: str) -> str:
+    """
+    New path of an original. Sharded: named by content hash; flat: the bare
+    file name. If another row's file already sits there, the id is appended
+    so each row keeps its own file (deleting one photo never removes another's).
+    """
+    path = PurePosixPath(relpath)
+    if target == 'sharded':
+        digest = file_digest(source)
+        candidate = shard_path(digest, path.suffix.lower())
+        alternative = shard_path(digest, f'-{photo_id}{path.suffix.lower()}')
+    else:
+        candidate = path.name
+        alternative = f'{path.stem}-{photo_id}{path.suffix}'
+    dest = PHOTOS_DIR / candidate
+    if dest.exists() and not os.path.samefile(source, dest):
+        return alternative
+    return candidate
+
+
+def still_referenced(cursor, column: str, urls: list) -> set:
+    """URLs from `urls` that some row still uses in `column`"""
+    if not urls:
+        return set()
+    placeholders = ', '.join(['%s'] * len(urls))
+    cursor.execute(f'SELECT {column} FROM photographer_photo WHERE {column} IN ({placeholders})', urls)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def plan_row(photo_id: int, image_url: str, thumbnail_url: str, target: str, stats: dict):
+    """
+    Moves for one row: (new_image_url, new_thumbnail_url, [(old_path, new_path)]),
+    or None if nothing needs to change.
+    """
+    relpath = url_to_relpath(image_url)
+    if relpath is None:
+        stats['skipped'] += 1
+        return None
+    moves = []
+    new_image_url = image_url
+
+    if not in_layout(relpath, target):
+        source = PHOTOS_DIR / relpath
+        if not source.is_file():
+            stats['missing'] += 1
+            return None
+        new_relpath = target_photo_relpath(source, relpath, photo_id, target)
+        moves.append((source, PHOTOS_DIR / new_relpath))
+        new_image_url = relpath_to_url(new_relpath)
+
+    new_thumbnail_url = thumbnail_url
+    thumb_relpath = url_to_relpath(thumbnail_url)
+    if thumb_relpath:
+        wanted = thumbnail_relpath(photo_id, new_image_url, target)
+        thumb_source = PHOTOS_DIR / thumb_relpath
+        if thumb_relpath != wanted and thumb_source.is_file():
+            moves.append((thumb_source, PHOTOS_DIR / wanted))
+            new_thumbnail_url = relpath_to_url(wanted)
+
+    if not moves:
+        stats['already'] += 1
+        return None
+    return new_image_url, new_thumbnail_url, moves
+
+
+def migrate(conn, target: str, batch_size: int, dry_run: bool, pause: float) -> dict:
+    """Walk photographer_photo in id order and move each batch's files"""
+    stats = {'checked': 0, 'moved': 0, 'already': 0, 'missing': 0, 'skipped': 0, 'files_removed': 0}
+    last_id = 0 if dry_run else load_state(target)
+    if last_id:
+        print(f'↩️  Resuming after id {last_id} ({STATE_FILE.name})')
+    cursor = conn.cursor()
+    start_time = time.time()
+
+    try:
+        while True:
+            cursor.execute(
+                'SELECT id, image_url, thumbnail_url FROM photographer_photo '
+                'WHERE id > %s ORDER BY id ASC LIMIT %s',
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = []
+            old_paths = []
+            for photo_id, image_url, thumbnail_url in rows:
+                stats['checked'] += 1
+                planned = plan_row(photo_id, image_url, thumbnail_url, target, stats)
+                if planned is None:
+                    continue
+                new_image_url, new_thumbnail_url, moves = planned
+                if not dry_run:
+                    for source, dest in moves:
+                        link_or_copy(source, dest)
+                updates.append((new_image_url, new_thumbnail_url, photo_id, image_url))
+                old_paths.extend(source for source, _ in moves)
+
+            if updates and not dry_run:
+                # The image_url guard skips rows changed by someone else meanwhile
+                cursor.executemany(
+                    'UPDATE photographer_photo SET image_url = %s, thumbnail_url = %s '
+                    'WHERE id = %s AND image_url = %s',
+                    updates
+                )
+                conn.commit()
+
+                # Remove old names only once no row points at them any more
+                old_urls = [relpath_to_url(path.relative_to(PHOTOS_DIR).as_posix()) for path in old_paths]
+                in_use = (still_referenced(cursor, 'image_url', old_urls)
+                          | still_referenced(cursor, 'thumbnail_url', old_urls))
+                for path, url in zip(old_paths, old_urls):
+                    if url not in in_use:
+                        path.unlink(missing_ok=True)
+                        remove_empty_shards(path)
+                        stats['files_removed'] += 1
+            stats['moved'] += len(updates)
+
+            last_id = rows[-1][0]
+            if not dry_run:
+                save_state(target, last_id)
+            elapsed = time.time() - start_time
+            print(f'   ✓ Checked {stats["checked"]} rows, {"would move" if dry_run else "moved"} {stats["moved"]} '
+                  f'({stats["checked"] / elapsed if elapsed > 0 else 0:.0f} rows/s)', end='\r')
+            if pause and not dry_run:
+                time.sleep(pause)
+    finally:
+        cursor.close()
+
+    print()
+    return stats
+
+
+def main():
+    """Main function"""
+    load_env()
+
+    parser = argparse.ArgumentParser(description='Move uploads/photos between the flat and hash-sharded layouts')
+    parser.add_argument('--to', choices=LAYOUTS, default='sharded', help='Target layout (default: sharded)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f'Rows per batch (default: {BATCH_SIZE})')
+    parser.add_argument('--pause', type=float, default=BATCH_PAUSE_SECONDS,
+                        help=f'Seconds to wait between batches (default: {BATCH_PAUSE_SECONDS})')
+    parser.add_argument('--restart', action='store_true', help='Ignore saved progress and start from the first row')
+    parser.add_argument('--dry-run', action='store_true', help='Count what would move without changing anything')
+    args = parser.parse_args()
+
+    print('\n' + '=' * 70)
+    print('🗂️  Photo Storage Layout Migration')
+    print('=' * 70)
+    print(f'Target layout: {args.to}')
+    print(f'Photos folder: {PHOTOS_DIR}')
+    print(f'Mode: {"DRY RUN - No changes will be made" if args.dry_run else "LIVE - Files will be moved and URLs updated"}')
+    print('=' * 70 + '\n')
+
+    if args.restart and STATE_FILE.exists():
+        STATE_FILE.unlink()
+
+    conn = get_connection()
+    try:
+        stats = migrate(conn, args.to, max(1, args.batch_size), args.dry_run, args.pause)
+    finally:
+        conn.close()
+
+    print('\n' + '=' * 70)
+    print('✅ Migration Complete!' if not args.dry_run else '✅ Dry Run Complete!')
+    print('=' * 70)
+    print(f'Rows checked:         {stats["checked"]}')
+    print(f'Rows to move:         {stats["moved"]}' if args.dry_run else f'Rows moved:           {stats["moved"]}')
+    print(f'Already in layout:    {stats["already"]}')
+    print(f'Missing originals:    {stats["missing"]} {"⚠️" if stats["missing"] else ""}')
+    print(f'Non-upload URLs:      {stats["skipped"]}')
+    if not args.dry_run:
+        print(f'Old files removed:    {stats["files_removed"]}')
+    print('=' * 70)
+    if not args.dry_run and args.to != os.getenv('PHOTO_STORAGE_LAYOUT', 'flat'):
+        print(f'\n💡 Set PHOTO_STORAGE_LAYOUT={args.to} in api/.env so new imports use this layout too.')
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
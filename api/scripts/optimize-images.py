@@ -9,6 +9,7 @@ Features:
 - Processes existing images in database
 - Updates database with thumbnail paths
 - Can be run as batch job or on-demand
+- Works newest uploads and categories guests are viewing first
 
 Usage:
     python scripts/optimize-images.py [options]
@@ -22,11 +23,16 @@ Options:
 
 import os
 import sys
+import json
+import heapq
 import argparse
-import mysql.connector
+import statistics
+from datetime import datetime
 from pathlib import Path
-from PIL import Image
 import time
+from media_tools import load_env, get_connection, execute_with_retry, PHOTOS_DIR, THUMBNAILS_DIR
+from media_tools.profiling import add_profile_arguments, start_profiling
+from media_tools.storage import storage_layout, thumbnail_relpath, relpath_to_url
 
 # Configuration
 THUMBNAIL_WIDTH = 1200
@@ -35,43 +41,19 @@ QUALITY = 90
 SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.webp']
 
 # Paths
-SCRIPT_DIR = Path(__file__).parent
-API_DIR = SCRIPT_DIR.parent
-ROOT_DIR = API_DIR.parent
-UPLOADS_DIR = ROOT_DIR / 'uploads' / 'photos'
-THUMBNAILS_DIR = ROOT_DIR / 'uploads' / 'photos' / 'thumbnails'
-
-
-def load_env():
-    """Load environment variables from .env file"""
-    env_file = API_DIR / '.env'
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
-
-
-def get_db_connection():
-    """Create and return MySQL database connection"""
-    config = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASSWORD', ''),
-        'database': os.getenv('DB_NAME', 'wedding_rsvp'),
-        'charset': 'utf8mb4',
-        'collation': 'utf8mb4_unicode_ci'
-    }
-    
-    try:
-        conn = mysql.connector.connect(**config)
-        print('✓ MySQL database connected successfully')
-        return conn
-    except mysql.connector.Error as err:
-        print(f'✗ MySQL database connection failed: {err}')
-        sys.exit(1)
+UPLOADS_DIR = PHOTOS_DIR
+
+# Scheduling: the freshest uploads are thumbnailed first, single uploads ahead
+# of bulk imports, and categories guests opened recently ahead of the rest.
+# The API records category views in this file (see routes/photos.js)
+CATEGORY_VIEWS_FILE = PHOTOS_DIR.parent / '.category-views.json'
+VIEWED_WINDOW_SECONDS = 15 * 60
+# More rows than this created in the same minute means a ZIP import
+BULK_IMPORT_ROWS = 20
+# How often a long run picks up photos uploaded since it started and new view hints
+REFRESH_SECONDS = 30
+# Photos uploaded this recently count as new for the time-to-thumbnail metric
+NEW_PHOTO_SECONDS = 60 * 60
 
 
 def ensure_thumbnails_dir():
@@ -91,6 +73,9 @@ def optimize_image(source_path: Path, thumbnail_path: Path) -> dict:
     Returns:
         dict with status and details
     """
+    # Imported here so dry runs and runs with nothing to do never load Pillow
+    from PIL import Image
+    
     try:
         # Check if source exists
         if not source_path.exists():
@@ -119,14 +104,20 @@ def optimize_image(source_path: Path, thumbnail_path: Path) -> dict:
             # Calculate thumbnail size (maintain aspect ratio)
             img.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
             
-            # Save thumbnail with optimization
-            img.save(
-                thumbnail_path,
-                format='JPEG',
-                quality=QUALITY,
-                optimize=True,
-                progressive=True
-            )
+            # Save thumbnail with optimization, via a temporary file so a crash
+            # or full disk never leaves a truncated thumbnail behind
+            tmp_path = thumbnail_path.with_name(f'.{thumbnail_path.name}.tmp-{os.getpid()}')
+            try:
+                img.save(
+                    tmp_path,
+                    format='JPEG',
+                    quality=QUALITY,
+                    optimize=True,
+                    progressive=True
+                )
+                os.replace(tmp_path, thumbnail_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
         
         thumbnail_size = thumbnail_path.stat().st_size
         reduction = ((original_size - thumbnail_size) / original_size * 100) if original_size > 0 else 0
@@ -147,43 +138,185 @@ def optimize_image(source_path: Path, thumbnail_path: Path) -> dict:
         }
 
 
-def process_photographer_photos(conn, category=None, only_new=False, dry_run=False):
-    """Process photos from photographer_photo table"""
-    cursor = conn.cursor(dictionary=True)
-    
-    # Build query
-    query = 'SELECT id, image_url, thumbnail_url, category FROM photographer_photo'
-    params = []
-    
-    conditions = []
-    if category:
-        conditions.append('category = %s')
-        params.append(category)
+def load_viewed_categories() -> set:
+    """Categories guests opened in the gallery within VIEWED_WINDOW_SECONDS"""
+    try:
+        views = json.loads(CATEGORY_VIEWS_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return set()
+    cutoff = time.time() - VIEWED_WINDOW_SECONDS
+    return {category for category, viewed_at in views.items() if isinstance(viewed_at, (int, float)) and viewed_at >= cutoff}
+
+
+class ThumbnailScheduler:
+    """
+    Priority queue of photos waiting for a thumbnail.
+
+    Order: single uploads before bulk imports, then categories being viewed,
+    then newest first. refresh() adds photos uploaded since the last query
+    and re-reads the view hints, so a long backlog run still serves new
+    uploads within REFRESH_SECONDS.
+    """
+
+    def __init__(self, conn, category=None, only_new=False):
+        self.cursor = conn.cursor(dictionary=True)
+        self.category = category
+        self.only_new = only_new
+        self.pending = {}
+        self.rows_per_minute = {}
+        self.viewed = set()
+        self.heap = []
+        self.last_id = 0
+        self.total = 0
+        self.refreshed_at = 0
+
+        # created_at is in database time; remember the offset to the local clock
+        self.cursor.execute('SELECT CURRENT_TIMESTAMP AS now')
+        self.db_offset = self.cursor.fetchone()['now'] - datetime.now()
+
+    def db_now(self) -> datetime:
+        return datetime.now() + self.db_offset
+
+    def refresh(self) -> int:
+        """Queue photos added since the last refresh and re-rank everything; returns the number added"""
+        query = 'SELECT id, image_url, thumbnail_url, category, created_at FROM photographer_photo WHERE id > %s'
+        params = [self.last_id]
+        if self.category:
+            query += ' AND category = %s'
+            params.append(self.category)
+        if self.only_new:
+            query += " AND (thumbnail_url IS NULL OR thumbnail_url = '')"
+        self.cursor.execute(query + ' ORDER BY id ASC', params)
+        rows = self.cursor.fetchall()
+
+        for photo in rows:
+            self.pending[photo['id']] = photo
+            minute = photo['created_at'].replace(second=0, microsecond=0) if photo['created_at'] else None
+            self.rows_per_minute[minute] = self.rows_per_minute.get(minute, 0) + 1
+        if rows:
+            self.last_id = rows[-1]['id']
+            self.total += len(rows)
+        self.viewed = load_viewed_categories()
+        self.heap = [(self.priority(photo), photo_id) for photo_id, photo in self.pending.items()]
+        heapq.heapify(self.heap)
+        self.refreshed_at = time.time()
+        return len(rows)
+
+    def priority(self, photo) -> tuple:
+        created_at = photo['created_at']
+        minute = created_at.replace(second=0, microsecond=0) if created_at else None
+        bulk = minute is None or self.rows_per_minute.get(minute, 0) > BULK_IMPORT_ROWS
+        return (bulk, photo['category'] not in self.viewed,
+                -(created_at.timestamp() if created_at else 0), -photo['id'])
+
+    def pop(self):
+        """Next photo to process, or None when the queue is empty"""
+        if time.time() - self.refreshed_at >= REFRESH_SECONDS:
+            self.refresh()
+        while self.heap:
+            _, photo_id = heapq.heappop(self.heap)
+            photo = self.pending.pop(photo_id, None)
+            if photo is not None:
+                return photo
+        return None
+
+    def close(self):
+        self.cursor.close()
+
+
+def estimate_thumbnail_cost(planned: list, sample_n: int = None) -> dict:
+    """
+    Dry-run estimate: time optimize_image() on a size-stratified sample of
+    the planned photos (writing to a scratch folder on the uploads volume)
+    and extrapolate CPU and wall time, thumbnail bytes and database writes
+    for all of them, with 95% margins (see media_tools/estimate.py).
+
+    planned: (photo_id, source_path, thumbnail_url) for every photo a live run would process
+    """
+    import tempfile
+    from media_tools import estimate
     
-    if only_new:
-        conditions.append('thumbnail_url IS NULL OR thumbnail_url = ""')
+    sizes = {source_path: source_path.stat().st_size for _, source_path, _ in planned}
+    sample = estimate.stratified_sample(planned, lambda item: sizes[item[1]],
+                                        sample_n or estimate.sample_size(len(planned)))
+    print(f'\n📐 Timing thumbnails for a sample of {len(sample)} of {len(planned)} photos...')
     
-    if conditions:
-        query += ' WHERE ' + ' AND '.join(conditions)
+    cpu, wall, output, sample_sizes, failed = [], [], [], [], 0
+    scratch_parent = PHOTOS_DIR if PHOTOS_DIR.is_dir() else None
+    with tempfile.TemporaryDirectory(prefix='.dry-run-', dir=scratch_parent) as scratch:
+        for n, (_, source_path, _) in enumerate(sample):
+            target = Path(scratch) / f'{n}.jpg'
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            result = optimize_image(source_path, target)
+            if not result['success']:
+                failed += 1
+                continue
+            wall.append(time.perf_counter() - wall_started)
+            cpu.append(time.process_time() - cpu_started)
+            output.append(result['thumbnail_size'])
+            sample_sizes.append(sizes[source_path])
+            target.unlink()
     
-    query += ' ORDER BY id ASC'
+    population = len(planned)
+    total_bytes = sum(sizes[source_path] for _, source_path, _ in planned)
+    cpu_total = estimate.ratio_estimate(cpu, sample_sizes, total_bytes, population)
+    wall_total = estimate.ratio_estimate(wall, sample_sizes, total_bytes, population)
+    output_total = estimate.ratio_estimate(output, sample_sizes, total_bytes, population)
+    failures = estimate.proportion_interval(failed, len(sample), population)
+    # One UPDATE + COMMIT per photo
+    db_bytes = sum(len(f"UPDATE photographer_photo SET thumbnail_url = '{url}' WHERE id = {photo_id}")
+                   for photo_id, _, url in planned)
     
-    cursor.execute(query, params)
-    photos = cursor.fetchall()
+    print('\n' + '=' * 70)
+    print(f'📐 Cost Estimate (sample of {len(sample)}, 95% confidence)')
+    print('=' * 70)
+    print(f'Photos:               {population} ({estimate.format_bytes(total_bytes)} of originals)')
+    print(f'CPU time:             {estimate.format_interval(*cpu_total, estimate.format_seconds)}')
+    for workers in estimate.worker_counts():
+        wall_time = estimate.format_interval(estimate.parallel_seconds(wall_total[0], workers),
+                                             estimate.parallel_seconds(wall_total[1], workers),
+                                             estimate.format_seconds)
+        label = f'Wall time, {workers} worker{"s" if workers > 1 else ""}:'
+        print(f'{label:<22}{wall_time}')
+    print(f'Thumbnail output:     {estimate.format_interval(*output_total, estimate.format_bytes)}')
+    print(f'Database writes:      {population} UPDATE + COMMIT, ~{estimate.format_bytes(db_bytes)} of statements')
+    if failed:
+        print(f'Expected failures:    ~{failures[0]:.0f} ± {failures[1]:.0f} ({failed} of {len(sample)} sampled photos failed)')
+    print('=' * 70)
     
-    print(f'\n📸 Found {len(photos)} photos to process in photographer_photo table')
+    return {
+        'sampled': len(sample),
+        'population': population,
+        'cpu_seconds': cpu_total,
+        'wall_seconds': wall_total,
+        'output_bytes': output_total,
+        'db_statements': population,
+        'db_bytes': db_bytes,
+        'sample_failures': failed,
+    }
+
+
+def summarize_waits(waits: list) -> dict:
+    """Median/p95/max seconds from upload to thumbnail for the new photos of a run"""
+    if not waits:
+        return {'count': 0}
+    waits = sorted(waits)
+    return {
+        'count': len(waits),
+        'median_seconds': round(statistics.median(waits), 1),
+        'p95_seconds': round(waits[max(0, int(len(waits) * 0.95) - 1)], 1),
+        'max_seconds': round(waits[-1], 1),
+    }
+
+
+def process_photographer_photos(conn, category=None, only_new=False, dry_run=False, sample_n=None):
+    """Process photos from photographer_photo table, most urgent first (see ThumbnailScheduler)"""
+    scheduler = ThumbnailScheduler(conn, category, only_new)
+    scheduler.refresh()
     
-    if len(photos) == 0:
-        cursor.close()
-        return {
-            'processed': 0,
-            'successful': 0,
-            'failed': 0,
-            'skipped': 0,
-            'total_original_size': 0,
-            'total_thumbnail_size': 0,
-            'errors': []
-        }
+    print(f'\n📸 Found {scheduler.total} photos to process in photographer_photo table')
+    if scheduler.viewed:
+        print(f'   Being viewed now (first): {", ".join(sorted(scheduler.viewed))}')
     
     stats = {
         'processed': 0,
@@ -192,12 +325,25 @@ def process_photographer_photos(conn, category=None, only_new=False, dry_run=Fal
         'skipped': 0,
         'total_original_size': 0,
         'total_thumbnail_size': 0,
-        'errors': []
+        'errors': [],
+        'first_thumbnail_seconds': None,
+        'time_to_thumbnail': [],
     }
     
+    if scheduler.total == 0:
+        scheduler.close()
+        return stats
+    
     start_time = time.time()
+    layout = storage_layout()
+    planned = []
     
-    for i, photo in enumerate(photos, 1):
+    i = 0
+    while True:
+        photo = scheduler.pop()
+        if photo is None:
+            break
+        i += 1
         photo_id = photo['id']
         image_url = photo['image_url']
         existing_thumbnail = photo['thumbnail_url']
@@ -217,10 +363,11 @@ def process_photographer_photos(conn, category=None, only_new=False, dry_run=Fal
             stats['skipped'] += 1
             continue
         
-        # Generate unique thumbnail filename (use photo id to avoid collisions e.g. pre_wedding/17.jpg vs other/17.jpg)
-        thumbnail_filename = f'thumb_{photo_id}.jpg'
-        thumbnail_path = THUMBNAILS_DIR / thumbnail_filename
-        thumbnail_url = f'/uploads/photos/thumbnails/{thumbnail_filename}'
+        # Thumbnail path for the configured layout (flat: thumb_{id}.jpg, which avoids
+        # collisions e.g. pre_wedding/17.jpg vs other/17.jpg; sharded: next to the original's hash)
+        thumbnail_rel = thumbnail_relpath(photo_id, image_url, layout)
+        thumbnail_path = UPLOADS_DIR / thumbnail_rel
+        thumbnail_url = relpath_to_url(thumbnail_rel)
         
         # Check if source exists
         if not source_path.exists():
@@ -233,32 +380,38 @@ def process_photographer_photos(conn, category=None, only_new=False, dry_run=Fal
             continue
         
         if dry_run:
-            print(f'   [{i}/{len(photos)}] Would process: {source_path.name}')
+            print(f'   [{i}/{scheduler.total}] Would process: {source_path.name} ({photo["category"]})')
+            planned.append((photo_id, source_path, thumbnail_url))
             stats['processed'] += 1
             continue
         
         # Process image
+        thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
         result = optimize_image(source_path, thumbnail_path)
         
         if result['success']:
             # Update database
             try:
-                update_cursor = conn.cursor()
-                update_cursor.execute(
+                execute_with_retry(
+                    conn,
                     'UPDATE photographer_photo SET thumbnail_url = %s WHERE id = %s',
                     (thumbnail_url, photo_id)
                 )
-                conn.commit()
-                update_cursor.close()
                 
                 stats['successful'] += 1
                 stats['total_original_size'] += result['original_size']
                 stats['total_thumbnail_size'] += result['thumbnail_size']
+                if stats['first_thumbnail_seconds'] is None:
+                    stats['first_thumbnail_seconds'] = time.time() - start_time
+                if photo['created_at']:
+                    waited = (scheduler.db_now() - photo['created_at']).total_seconds()
+                    if waited <= NEW_PHOTO_SECONDS:
+                        stats['time_to_thumbnail'].append(waited)
                 
-                if (i % 10 == 0) or (i == len(photos)):
+                if (i % 10 == 0) or (i == scheduler.total):
                     elapsed = time.time() - start_time
                     rate = stats['successful'] / elapsed if elapsed > 0 else 0
-                    print(f'   ✓ [{i}/{len(photos)}] Processed {source_path.name} - '
+                    print(f'   ✓ [{i}/{scheduler.total}] Processed {source_path.name} - '
                           f'{result["original_size"] / 1024 / 1024:.2f}MB → '
                           f'{result["thumbnail_size"] / 1024 / 1024:.2f}MB '
                           f'({result["reduction_percent"]:.1f}% reduction) - '
@@ -281,7 +434,9 @@ def process_photographer_photos(conn, category=None, only_new=False, dry_run=Fal
         
         stats['processed'] += 1
     
-    cursor.close()
+    scheduler.close()
+    if planned:
+        stats['estimate'] = estimate_thumbnail_cost(planned, sample_n)
     return stats
 
 
@@ -295,8 +450,12 @@ def main():
     parser.add_argument('--category', choices=['pre-wedding', 'brides-dinner', 'morning-wedding', 'grooms-dinner'], 
                         help='Process specific category only')
     parser.add_argument('--dry-run', action='store_true', help='Preview without making changes')
+    parser.add_argument('--sample', type=int, default=None, metavar='N',
+                        help='Photos timed for the --dry-run cost estimate (default: chosen from the backlog size)')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    session = start_profiling(args, 'optimize-images')
     
     # Default to --new if no option specified
     only_new = args.new or not args.all
@@ -317,12 +476,17 @@ def main():
         ensure_thumbnails_dir()
     
     # Connect to database
-    conn = get_db_connection()
+    conn = get_connection()
     
     try:
         # Process photographer_photo table
         print('\n📸 Processing photographer_photo table...')
-        stats = process_photographer_photos(conn, category=args.category, only_new=only_new, dry_run=args.dry_run)
+        stats = process_photographer_photos(conn, category=args.category, only_new=only_new, dry_run=args.dry_run,
+                                            sample_n=args.sample)
+        waits = summarize_waits(stats['time_to_thumbnail'])
+        session.stats.update({key: value for key, value in stats.items() if key not in ('errors', 'time_to_thumbnail')})
+        session.stats['errors'] = len(stats['errors'])
+        session.stats['time_to_thumbnail'] = waits
         
         elapsed = time.time()
         
@@ -334,6 +498,11 @@ def main():
         print(f'Successful:           {stats["successful"]} ✅')
         print(f'Failed:               {stats["failed"]} {"❌" if stats["failed"] > 0 else ""}')
         print(f'Skipped:              {stats["skipped"]}')
+        if stats['first_thumbnail_seconds'] is not None:
+            print(f'First thumbnail:      {stats["first_thumbnail_seconds"]:.1f}s after start')
+        if waits['count']:
+            print(f'Time to thumbnail:    median {waits["median_seconds"]:.0f}s, p95 {waits["p95_seconds"]:.0f}s '
+                  f'after upload ({waits["count"]} photos from the last hour)')
         
         if not args.dry_run and stats['successful'] > 0:
             total_saved = stats['total_original_size'] - stats['total_thumbnail_size']
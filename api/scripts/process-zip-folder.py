@@ -8,16 +8,41 @@ Usage:
 
 Or run interactively:
     python scripts/process-zip-folder.py
+
+Or estimate time, output and database writes without importing:
+    python scripts/process-zip-folder.py [folder_path] [category] --dry-run
+
+Or run as a spool daemon (non-interactive):
+    python scripts/process-zip-folder.py --daemon [spool_dir] [default_category] --workers 2
 """
 
+import io
 import os
+import re
 import sys
+import json
 import zipfile
+import hashlib
 import argparse
-import mysql.connector
 from pathlib import Path
-from typing import List, Dict, Tuple
+from datetime import datetime
+from typing import List, Dict, Tuple, Set, Optional
 import time
+import shutil
+import select
+import signal
+import ctypes
+import ctypes.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from media_tools import load_env, get_pool, get_connection, ROOT_DIR, PHOTOS_DIR
+from media_tools.storage import (
+    storage_layout, photo_relpath, relpath_to_url, write_file_atomic, category_relpath, link_or_copy
+)
+from media_tools.profiling import add_profile_arguments, start_profiling
+
+# Pillow and mysql.connector are imported inside the functions that use them,
+# so --help, "no ZIP files found" and other early exits start quickly
 
 # Valid categories
 VALID_CATEGORIES = {
@@ -44,40 +69,57 @@ DEFAULT_PHOTOGRAPHER_EMAIL = 'angjinsheng@gmail.com'
 # Image extensions
 IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
 
+# Pillow format expected for each extension
+EXTENSION_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.gif': 'GIF',
+    '.webp': 'WEBP'
+}
+
+# ISO-BMFF brands (bytes 8-12) of formats browsers and Pillow cannot show
+HEIF_BRANDS = (b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1', b'avif')
+
+# In JPEG entropy-coded data 0xFF is followed by 0x00 (stuffing), a restart
+# marker (D0-D7) or more 0xFF fill bytes; anything else is the next marker
+JPEG_MARKER_RE = re.compile(rb'\xff(?![\x00\xd0-\xd7\xff])')
+
+# JPEG markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+# EXIF tags (IFD0: Make/Model, Exif IFD: capture times)
+EXIF_IFD_POINTER = 0x8769
+EXIF_MAKE = 0x010F
+EXIF_MODEL = 0x0110
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME_DIGITIZED = 0x9004
+
 # Batch size for processing
 BATCH_SIZE = 100
 
+# Spool directory watched by --daemon
+SPOOL_DIR = ROOT_DIR / 'uploads' / 'zip'
+SPOOL_PROCESSING = 'processing'
+SPOOL_DONE = 'done'
+SPOOL_FAILED = 'failed'
 
-def load_env():
-    """Load environment variables from .env file if it exists"""
-    env_file = Path(__file__).parent.parent / '.env'
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
-
-
-def get_db_connection():
-    """Create and return MySQL database connection"""
-    config = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASSWORD', ''),
-        'database': os.getenv('DB_NAME', 'wedding_rsvp'),
-        'charset': 'utf8mb4',
-        'collation': 'utf8mb4_unicode_ci'
-    }
-    
-    try:
-        conn = mysql.connector.connect(**config)
-        print('✓ MySQL database connected successfully')
-        return conn
-    except mysql.connector.Error as err:
-        print(f'✗ MySQL database connection failed: {err}')
-        sys.exit(1)
+# Seconds an archive must be unmodified before the daemon claims it
+SPOOL_SETTLE_SECONDS = 10
+
+# Fallback rescan interval when inotify is unavailable
+SPOOL_POLL_SECONDS = 15
+
+# Per-archive ingest journals (one JSON line per committed entry)
+JOURNAL_DIR = ROOT_DIR / 'uploads' / '.ingest-journal'
+
+# Last observed ingest throughput, used to estimate durations
+THROUGHPUT_FILE = JOURNAL_DIR / 'throughput.json'
+DEFAULT_BYTES_PER_SECOND = 40 * 1024 * 1024
+
+# Free space to keep on the uploads volume, and how long to wait for it
+MIN_FREE_BYTES = 1024 * 1024 * 1024
+DISK_WAIT_SECONDS = 300
 
 
 def display_categories():
@@ -127,8 +169,440 @@ def is_image_file(filename: str) -> bool:
     return ext in IMAGE_EXTENSIONS
 
 
+def sniff_format(data: bytes) -> str:
+    """Identify an image format from its magic bytes"""
+    if data[:3] == b'\xff\xd8\xff':
+        return 'JPEG'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'PNG'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WEBP'
+    if data[4:8] == b'ftyp' and data[8:12] in HEIF_BRANDS:
+        return 'HEIC/HEIF'
+    return 'unknown'
+
+
+def jpeg_image_end(data: bytes) -> Optional[int]:
+    """
+    Offset just past the end-of-image marker of the primary JPEG image, or
+    None if the data ends before it (truncated).
+
+    Walks the marker segments and skips over each scan's entropy-coded data,
+    so whatever follows the image is ignored: motion-photo videos, Samsung
+    SEFH trailers and the extra images of MPF files all sit after the EOI.
+    """
+    pos = 2  # after SOI
+    size = len(data)
+    while pos + 1 < size:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xD9:
+            return pos + 2
+        if marker in JPEG_STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if pos + 3 >= size:
+            return None
+        pos += 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+        if marker == 0xDA:  # SOS: the scan data runs up to the next real marker
+            match = JPEG_MARKER_RE.search(data, pos)
+            if match is None:
+                return None
+            pos = match.start()
+    return None
+
+
+def png_image_end(data: bytes) -> Optional[int]:
+    """
+    Offset just past the IEND chunk, or None if the data ends before it.
+
+    Walks the chunks by their length fields, so bytes appended after the
+    image (or an 'IEND' inside compressed data) do not matter.
+    """
+    pos = 8  # after the signature
+    size = len(data)
+    while pos + 8 <= size:
+        length = int.from_bytes(data[pos:pos + 4], 'big')
+        chunk_type = data[pos + 4:pos + 8]
+        pos += 12 + length  # length, type, data, CRC
+        if pos > size:
+            return None
+        if chunk_type == b'IEND':
+            return pos
+    return None
+
+
+def gif_image_end(data: bytes) -> Optional[int]:
+    """
+    Offset just past the GIF trailer (0x3B), or None if the data ends before it.
+
+    Walks the blocks and skips their sub-blocks, so a 0x3B byte inside image
+    data is not mistaken for the trailer and appended bytes are ignored.
+    """
+    size = len(data)
+    if size < 13:
+        return None
+    pos = 13  # header and logical screen descriptor
+    if data[10] & 0x80:  # global colour table
+        pos += 3 << ((data[10] & 0x07) + 1)
+    while pos < size:
+        block = data[pos]
+        if block == 0x3B:
+            return pos + 1
+        if block == 0x21:  # extension: label, then sub-blocks
+            pos += 2
+        elif block == 0x2C:  # image descriptor, local colour table, LZW code size
+            if pos + 10 > size:
+                return None
+            flags = data[pos + 9]
+            pos += 10
+            if flags & 0x80:
+                pos += 3 << ((flags & 0x07) + 1)
+            pos += 1
+        else:
+            return None
+        while pos < size and data[pos] != 0:
+            pos += 1 + data[pos]
+        pos += 1  # block terminator
+    return None
+
+
+def parse_exif_datetime(value) -> Optional[datetime]:
+    """Parse an EXIF 'YYYY:MM:DD HH:MM:SS' timestamp (None if absent or zeroed)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value).strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None
+
+
+def read_exif_fields(img) -> Dict:
+    """
+    Read capture time and camera body from an opened (not decoded) image.
+
+    getexif() only parses the EXIF block that Pillow already read with the
+    header, so no pixel data is touched.
+    """
+    try:
+        exif = img.getexif()
+    except Exception:
+        return {'taken_at': None, 'camera': None}
+    
+    exif_ifd = exif.get_ifd(EXIF_IFD_POINTER) if EXIF_IFD_POINTER in exif else {}
+    taken_at = (parse_exif_datetime(exif_ifd.get(EXIF_DATETIME_ORIGINAL))
+                or parse_exif_datetime(exif_ifd.get(EXIF_DATETIME_DIGITIZED)))
+    
+    make = str(exif.get(EXIF_MAKE) or '').strip('\x00 ')
+    model = str(exif.get(EXIF_MODEL) or '').strip('\x00 ')
+    if make and model.lower().startswith(make.lower()):
+        make = ''
+    camera = ' '.join(part for part in (make, model) if part)[:128] or None
+    
+    return {'taken_at': taken_at, 'camera': camera}
+
+
+def validate_image_header(entry_name: str, data: bytes) -> Dict:
+    """
+    Check that an entry really is the image its extension claims, using only
+    the magic bytes, the header (Pillow opens lazily, no pixel decode) and the
+    end-of-image marker for truncation.
+
+    Returns width, height and the EXIF capture time/camera; raises ValueError
+    for anything unusable.
+    """
+    expected = EXTENSION_FORMATS.get(Path(entry_name).suffix.lower())
+    sniffed = sniff_format(data)
+    if sniffed != expected:
+        raise ValueError(f'Content is {sniffed}, not {expected} as the extension says')
+    
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format != expected:
+                raise ValueError(f'Header parsed as {img.format}, expected {expected}')
+            width, height = img.size
+            exif_fields = read_exif_fields(img)
+    except ValueError:
+        raise
+    except Exception as err:
+        raise ValueError(f'Unreadable {expected} header: {err}')
+    
+    if width <= 0 or height <= 0:
+        raise ValueError(f'Invalid dimensions {width}x{height}')
+    
+    # Truncated files still have a valid header; look for the end of the
+    # image instead (anything appended after it is allowed)
+    if expected == 'JPEG' and jpeg_image_end(data) is None:
+        raise ValueError('Truncated JPEG (missing end-of-image marker)')
+    if expected == 'PNG' and png_image_end(data) is None:
+        raise ValueError('Truncated PNG (missing IEND chunk)')
+    if expected == 'GIF' and gif_image_end(data) is None:
+        raise ValueError('Truncated GIF (missing trailer)')
+    if expected == 'WEBP' and int.from_bytes(data[4:8], 'little') + 8 > len(data):
+        raise ValueError('Truncated WebP (RIFF size larger than file)')
+    
+    return {'width': width, 'height': height, **exif_fields}
+
+
+def archive_fingerprint(zip_path: Path, zip_ref: zipfile.ZipFile) -> str:
+    """
+    Identify an archive by its central directory (names, CRCs, sizes, offsets).
+
+    Only the directory already parsed by ZipFile is hashed, so fingerprinting a
+    multi-GB archive costs nothing beyond opening it.
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{zip_path.stat().st_size}\n'.encode('utf-8'))
+    for info in zip_ref.infolist():
+        digest.update(f'{info.filename}\0{info.CRC}\0{info.file_size}\0{info.header_offset}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def entry_key(info: zipfile.ZipInfo) -> str:
+    """Journal key for a ZIP entry: its name plus the CRC from the ZIP directory"""
+    return f'{info.filename}:{info.CRC:08x}'
+
+
+def entry_filename(fingerprint: str, info: zipfile.ZipInfo) -> str:
+    """Deterministic destination filename, stable across runs and processes"""
+    entry_hash = hashlib.sha1(entry_key(info).encode('utf-8')).hexdigest()[:16]
+    return f'photo-{fingerprint[:12]}-{entry_hash}{Path(info.filename).suffix}'
+
+
+def journal_path(fingerprint: str) -> Path:
+    """Path of the ingest journal for an archive"""
+    return JOURNAL_DIR / f'{fingerprint}.jsonl'
+
+
+def load_journal(path: Path) -> Set[str]:
+    """Return the keys of entries already committed for this archive"""
+    committed = set()
+    if not path.exists():
+        return committed
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                committed.add(json.loads(line)['key'])
+            except (ValueError, KeyError):
+                # A crash mid-append can leave a truncated last line
+                continue
+    return committed
+
+
+def append_journal(path: Path, records: List[Dict]):
+    """Append committed entries to the journal and flush them to disk"""
+    if not records:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def find_existing_urls(cursor, image_urls: List[str]) -> Dict[str, Set[str]]:
+    """Categories of the photographer_photo rows already using each of the given image URLs"""
+    if not image_urls:
+        return {}
+    placeholders = ', '.join(['%s'] * len(image_urls))
+    cursor.execute(
+        f'SELECT image_url, category FROM photographer_photo WHERE image_url IN ({placeholders})',
+        image_urls
+    )
+    existing = {}
+    for image_url, row_category in cursor.fetchall():
+        existing.setdefault(image_url, set()).add(row_category)
+    return existing
+
+
+def plan_extraction(entries: List[zipfile.ZipInfo]) -> Dict:
+    """
+    Plan an extraction from the central directory alone.
+
+    Entries are ordered by local header offset so the archive is read front to
+    back (sequential I/O), and the uncompressed output is totalled for the
+    disk-space preflight.
+    """
+    ordered = sorted(entries, key=lambda info: info.header_offset)
+    return {
+        'entries': ordered,
+        'bytes': sum(info.file_size for info in ordered),
+        'compressed_bytes': sum(info.compress_size for info in ordered),
+    }
+
+
+def load_throughput() -> float:
+    """Return the last observed ingest throughput in bytes per second"""
+    try:
+        return float(json.loads(THROUGHPUT_FILE.read_text(encoding='utf-8'))['bytes_per_second'])
+    except (OSError, ValueError, KeyError):
+        return DEFAULT_BYTES_PER_SECOND
+
+
+def save_throughput(bytes_written: int, elapsed: float):
+    """Remember the throughput of a run (only runs long enough to be meaningful)"""
+    if elapsed < 5 or bytes_written <= 0:
+        return
+    THROUGHPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    THROUGHPUT_FILE.write_text(json.dumps({'bytes_per_second': bytes_written / elapsed}), encoding='utf-8')
+
+
+def free_bytes(path: Path) -> int:
+    """Free space available on the volume holding path"""
+    return shutil.disk_usage(path).free
+
+
+def check_disk_space(needed_bytes: int):
+    """Refuse to start when the uploads volume cannot hold the planned output"""
+    available = free_bytes(PHOTOS_DIR) - MIN_FREE_BYTES
+    if needed_bytes > available:
+        raise ValueError(
+            f'Not enough disk space: need {needed_bytes / 1024 / 1024:.1f}MB, '
+            f'{max(available, 0) / 1024 / 1024:.1f}MB available after keeping '
+            f'{MIN_FREE_BYTES / 1024 / 1024:.0f}MB free'
+        )
+
+
+def wait_for_disk_space(needed_bytes: int):
+    """
+    Throttle between batches while the volume is short on space (e.g. another
+    import or the optimizer is writing too), giving up after DISK_WAIT_SECONDS.
+    """
+    deadline = time.time() + DISK_WAIT_SECONDS
+    while free_bytes(PHOTOS_DIR) - MIN_FREE_BYTES < needed_bytes:
+        if time.time() >= deadline:
+            check_disk_space(needed_bytes)
+        print(f'\n   ⏸️  Low disk space, waiting before next batch...')
+        time.sleep(10)
+
+
+def estimate_ingest_cost(zip_files: List[Path], category: str, photographer_email: str,
+                         workers: int, sample_n: int = None) -> Dict:
+    """
+    Dry-run estimate for importing zip_files, without touching the database
+    or the archives.
+
+    Output bytes come exactly from the ZIP directories (minus entries already
+    journaled). Read + validate + write time, the share of rejected images
+    and the INSERT volume are measured on a size-stratified sample of entries,
+    written to a scratch folder on the uploads volume, and extrapolated with
+    95% margins (see media_tools/estimate.py).
+    """
+    import tempfile
+    from media_tools import estimate
+    
+    pending = []
+    archives = {}
+    fingerprints = {}
+    for zip_path in zip_files:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            fingerprints[zip_path] = archive_fingerprint(zip_path, zip_ref)
+            committed = load_journal(journal_path(fingerprints[zip_path]))
+            entries = [e for e in zip_ref.infolist()
+                       if is_image_file(e.filename) and not e.is_dir() and entry_key(e) not in committed]
+            archives[zip_path] = plan_extraction(entries)
+            pending.extend((zip_path, info) for info in entries)
+    
+    population = len(pending)
+    total_bytes = sum(plan['bytes'] for plan in archives.values())
+    if population == 0:
+        print('\n✅ Nothing left to import (every image is already journaled)')
+        return {'population': 0}
+    
+    sample = estimate.stratified_sample(pending, lambda item: item[1].file_size,
+                                        sample_n or estimate.sample_size(population))
+    # Read each sampled archive once, front to back
+    sample.sort(key=lambda item: (str(item[0]), item[1].header_offset))
+    print(f'\n📐 Timing a sample of {len(sample)} of {population} images...')
+    
+    layout = storage_layout()
+    insert_sql = ('INSERT INTO photographer_photo (image_url, category, photographer_email, width, height, taken_at, camera) '
+                  'VALUES (%s, %s, %s, %s, %s, %s, %s)')
+    cpu, wall, sizes, insert_bytes, rejected = [], [], [], [], 0
+    scratch_parent = PHOTOS_DIR if PHOTOS_DIR.is_dir() else None
+    with tempfile.TemporaryDirectory(prefix='.dry-run-', dir=scratch_parent) as scratch:
+        zip_ref = None
+        for n, (zip_path, info) in enumerate(sample):
+            if zip_ref is None or zip_ref.filename != str(zip_path):
+                if zip_ref is not None:
+                    zip_ref.close()
+                zip_ref = zipfile.ZipFile(zip_path, 'r')
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            try:
+                if info.file_size > 100 * 1024 * 1024:
+                    raise ValueError('File too large')
+                file_data = zip_ref.read(info)
+                header = validate_image_header(info.filename, file_data)
+                write_file_atomic(Path(scratch) / f'{n}{Path(info.filename).suffix}', file_data)
+            except Exception:
+                rejected += 1
+                continue
+            finally:
+                wall.append(time.perf_counter() - wall_started)
+                cpu.append(time.process_time() - cpu_started)
+                sizes.append(info.file_size)
+            image_url = relpath_to_url(photo_relpath(file_data, Path(info.filename).suffix,
+                                                     entry_filename(fingerprints[zip_path], info), layout))
+            values = (image_url, category, photographer_email, header['width'], header['height'],
+                      header['taken_at'], header['camera'])
+            insert_bytes.append(len(insert_sql) + sum(len(str(value)) for value in values))
+        if zip_ref is not None:
+            zip_ref.close()
+    
+    cpu_total = estimate.ratio_estimate(cpu, sizes, total_bytes, population)
+    wall_total = estimate.ratio_estimate(wall, sizes, total_bytes, population)
+    failures = estimate.proportion_interval(rejected, len(sample), population)
+    rows = population - failures[0]
+    # Mean statement size per accepted image, times the expected accepted images
+    statement_mean = sum(insert_bytes) / len(insert_bytes) if insert_bytes else 0
+    batches = sum((len(plan['entries']) + BATCH_SIZE - 1) // BATCH_SIZE for plan in archives.values())
+    
+    print('\n' + '=' * 70)
+    print(f'📐 Cost Estimate (sample of {len(sample)}, 95% confidence)')
+    print('=' * 70)
+    print(f'Archives:             {len(zip_files)} ({population} images to import)')
+    print(f'Output:               {estimate.format_bytes(total_bytes)} '
+          f'(free: {estimate.format_bytes(free_bytes(PHOTOS_DIR))})')
+    print(f'CPU time:             {estimate.format_interval(*cpu_total, estimate.format_seconds)}')
+    for count in estimate.worker_counts(max(1, min(workers, len(zip_files)))):
+        wall_time = estimate.format_interval(estimate.parallel_seconds(wall_total[0], count),
+                                             estimate.parallel_seconds(wall_total[1], count),
+                                             estimate.format_seconds)
+        label = f'Wall time, {count} at once:'
+        print(f'{label:<22}{wall_time}')
+    print(f'Rejected images:      ~{failures[0]:.0f} ± {failures[1]:.0f} ({rejected} of {len(sample)} sampled)')
+    print(f'Database writes:      ~{rows:.0f} INSERTs in {batches} commits, '
+          f'~{estimate.format_bytes(statement_mean * rows)} of statements')
+    print('=' * 70)
+    
+    return {
+        'sampled': len(sample),
+        'population': population,
+        'output_bytes': total_bytes,
+        'cpu_seconds': cpu_total,
+        'wall_seconds': wall_total,
+        'rejected': failures,
+        'db_rows': round(rows),
+        'db_commits': batches,
+        'db_bytes': round(statement_mean * rows),
+    }
+
+
 def process_zip_file(zip_path: Path, category: str, photographer_email: str, conn) -> Dict:
-    """Process a single ZIP file and return results"""
+    """
+    Process a single ZIP file and return results
+
+    Committed entries are recorded in a per-archive journal, so a rerun after
+    a crash skips them without reading their data and resumes where it stopped.
+    """
     print('\n' + '=' * 70)
     print(f'📦 Processing: {zip_path.name}')
     print('=' * 70)
@@ -142,6 +616,8 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
         'total': 0,
         'successful': 0,
         'failed': 0,
+        'skipped': 0,
+        'cross_category': 0,
         'errors': []
     }
     
@@ -153,11 +629,11 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             # Get all entries
-            all_entries = zip_ref.namelist()
+            all_entries = zip_ref.infolist()
             print(f'   ✓ Found {len(all_entries)} entries in ZIP\n')
             
             # Filter for image files
-            image_entries = [e for e in all_entries if is_image_file(e) and not e.endswith('/')]
+            image_entries = [e for e in all_entries if is_image_file(e.filename) and not e.is_dir()]
             results['total'] = len(image_entries)
             
             print(f'📸 Found {len(image_entries)} image files\n')
@@ -165,9 +641,35 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
             if len(image_entries) == 0:
                 raise ValueError('No image files found in ZIP archive. Supported formats: JPG, PNG, GIF, WebP')
             
+            # Skip entries committed by a previous (interrupted) run
+            fingerprint = archive_fingerprint(zip_path, zip_ref)
+            journal_file = journal_path(fingerprint)
+            committed = load_journal(journal_file)
+            if committed:
+                pending_entries = [e for e in image_entries if entry_key(e) not in committed]
+                results['skipped'] = len(image_entries) - len(pending_entries)
+                image_entries = pending_entries
+                print(f'↩️  Resuming: {results["skipped"]} images already committed (journal {journal_file.name})\n')
+            
+            if len(image_entries) == 0:
+                print('✅ Nothing left to process in this archive')
+                return results
+            
             # Setup photos directory
-            photos_dir = Path(__file__).parent.parent.parent / 'uploads' / 'photos'
-            photos_dir.mkdir(parents=True, exist_ok=True)
+            PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+            layout = storage_layout()
+            
+            # Plan: read in archive order and make sure the output fits
+            plan = plan_extraction(image_entries)
+            image_entries = plan['entries']
+            bytes_per_second = load_throughput()
+            print('🗺️  Extraction plan:')
+            print(f'   Planned output:   {plan["bytes"] / 1024 / 1024:.1f} MB ({plan["compressed_bytes"] / 1024 / 1024:.1f} MB compressed)')
+            print(f'   Free space:       {free_bytes(PHOTOS_DIR) / 1024 / 1024:.1f} MB')
+            print(f'   Expected time:    ~{plan["bytes"] / bytes_per_second:.0f}s at {bytes_per_second / 1024 / 1024:.1f} MB/s')
+            print(f'   Storage layout:   {layout}\n')
+            check_disk_space(plan['bytes'])
+            bytes_written = 0
             
             # Process in batches
             total_batches = (len(image_entries) + BATCH_SIZE - 1) // BATCH_SIZE
@@ -184,53 +686,103 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
                     
                     print(f'📦 Batch {batch_index + 1}/{total_batches} (images {batch_start + 1}-{batch_end} of {len(image_entries)})')
                     
-                    for i, entry_name in enumerate(batch):
-                        global_index = batch_start + i
+                    batch_bytes = sum(info.file_size for info in batch)
+                    wait_for_disk_space(batch_bytes)
+                    
+                    journal_records = []
+                    batch_rows = []
+                    batch_urls = set()
+                    
+                    for info in batch:
+                        entry_name = info.filename
                         
                         try:
-                            # Extract file from ZIP
-                            file_data = zip_ref.read(entry_name)
-                            
                             # Check file size (100MB max per image)
-                            if len(file_data) > 100 * 1024 * 1024:
-                                raise ValueError(f'File too large: {len(file_data) / 1024 / 1024:.2f}MB (max 100MB per image)')
+                            if info.file_size > 100 * 1024 * 1024:
+                                raise ValueError(f'File too large: {info.file_size / 1024 / 1024:.2f}MB (max 100MB per image)')
                             
-                            # Generate unique filename
-                            original_ext = Path(entry_name).suffix
-                            unique_suffix = f"{int(time.time() * 1000)}-{global_index}-{hash(entry_name) % 1000000000}"
-                            new_filename = f'photo-{unique_suffix}{original_ext}'
-                            dest_path = photos_dir / new_filename
+                            # Extract file from ZIP (ZipFile verifies the CRC)
+                            file_data = zip_ref.read(info)
                             
-                            # Write to photos directory
-                            dest_path.write_bytes(file_data)
+                            # Reject corrupt or mislabeled images before any write
+                            header = validate_image_header(entry_name, file_data)
                             
-                            # Generate image URL
-                            image_url = f'/uploads/photos/{new_filename}'
+                            # Deterministic name (flat) or content hash (sharded)
+                            relpath = photo_relpath(file_data, Path(entry_name).suffix,
+                                                    entry_filename(fingerprint, info), layout)
+                            image_url = relpath_to_url(relpath)
+                            if image_url in batch_urls:
+                                # Same content twice in this archive (sharded layout)
+                                results['skipped'] += 1
+                                journal_records.append({'key': entry_key(info), 'file': relpath})
+                                continue
+                            batch_urls.add(image_url)
                             
+                            # Write to photos directory (atomically; kept if already there)
+                            if write_file_atomic(PHOTOS_DIR / relpath, file_data):
+                                bytes_written += len(file_data)
+                            batch_rows.append((info, relpath, image_url, header))
+                        
+                        except Exception as err:
+                            results['failed'] += 1
+                            results['errors'].append({
+                                'filename': entry_name,
+                                'error': str(err)
+                            })
+                            print(f'\n   ❌ Error processing {entry_name}: {str(err)}')
+                    
+                    # Rows inserted before a crash but after the last journal write (or,
+                    # in the sharded layout, identical photos imported earlier) already
+                    # exist under the same URL and are only journaled
+                    already_inserted = find_existing_urls(cursor, [url for _, _, url, _ in batch_rows])
+                    
+                    # The same photo imported into another category (same content in the
+                    # sharded layout, same archive in the flat one) gets a file name of its
+                    # own (a hard link, no extra space) and a row in this category
+                    cross_category = []
+                    for n, (info, relpath, image_url, header) in enumerate(batch_rows):
+                        if image_url in already_inserted and category not in already_inserted[image_url]:
+                            own_relpath = category_relpath(relpath, category)
+                            link_or_copy(PHOTOS_DIR / relpath, PHOTOS_DIR / own_relpath)
+                            batch_rows[n] = (info, own_relpath, relpath_to_url(own_relpath), header)
+                            cross_category.append(relpath_to_url(own_relpath))
+                    if cross_category:
+                        already_inserted.update(find_existing_urls(cursor, cross_category))
+                    
+                    for info, relpath, image_url, header in batch_rows:
+                        if category in already_inserted.get(image_url, ()):
+                            results['skipped'] += 1
+                            journal_records.append({'key': entry_key(info), 'file': relpath})
+                            continue
+                        
+                        try:
                             # Insert into database
                             cursor.execute(
-                                'INSERT INTO photographer_photo (image_url, category, photographer_email) VALUES (%s, %s, %s)',
-                                (image_url, category, photographer_email)
+                                'INSERT INTO photographer_photo (image_url, category, photographer_email, width, height, taken_at, camera) '
+                                'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                                (image_url, category, photographer_email, header['width'], header['height'],
+                                 header['taken_at'], header['camera'])
                             )
-                            
                             results['successful'] += 1
-                            
-                            # Progress indicator
-                            if (global_index + 1) % 10 == 0 or i == len(batch) - 1:
-                                elapsed = time.time() - start_time
-                                rate = results['successful'] / elapsed if elapsed > 0 else 0
-                                print(f'   ✓ Processed {global_index + 1}/{len(image_entries)} ({results["successful"]} successful, {results["failed"]} failed) - {rate:.1f} img/s', end='\r')
-                        
+                            if image_url in cross_category:
+                                results['cross_category'] += 1
+                            journal_records.append({'key': entry_key(info), 'file': relpath})
                         except Exception as err:
                             results['failed'] += 1
                             results['errors'].append({
-                                'filename': entry_name,
+                                'filename': info.filename,
                                 'error': str(err)
                             })
-                            print(f'\n   ❌ Error processing {entry_name}: {str(err)}')
+                            print(f'\n   ❌ Error processing {info.filename}: {str(err)}')
+                    
+                    # Progress indicator
+                    elapsed = time.time() - start_time
+                    rate = results['successful'] / elapsed if elapsed > 0 else 0
+                    print(f'   ✓ Processed {batch_end}/{len(image_entries)} ({results["successful"]} successful, {results["failed"]} failed) - {rate:.1f} img/s', end='\r')
                     
-                    # Commit batch to database
+                    # Commit batch to database, then record it in the journal
                     conn.commit()
+                    append_journal(journal_file, journal_records)
                     print()  # New line after batch
                     
                     # Small delay between batches
@@ -238,6 +790,7 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
                         time.sleep(0.1)
                 
                 elapsed = time.time() - start_time
+                save_throughput(bytes_written, elapsed)
                 
                 # Print results
                 print('\n' + '=' * 60)
@@ -246,6 +799,10 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
                 print(f'Total Images:     {results["total"]}')
                 print(f'Successful:       {results["successful"]} ✅')
                 print(f'Failed:           {results["failed"]} {"❌" if results["failed"] > 0 else ""}')
+                print(f'Skipped:          {results["skipped"]} (already imported)')
+                if results['cross_category']:
+                    print(f'Other categories: {results["cross_category"]} (also in another category; '
+                          f'added here with a file of their own)')
                 print(f'Time Elapsed:     {elapsed:.1f}s')
                 print(f'Average Rate:     {results["successful"] / elapsed:.1f} images/second' if elapsed > 0 else 'Average Rate:     0.0 images/second')
                 print('=' * 60)
@@ -267,6 +824,322 @@ def process_zip_file(zip_path: Path, category: str, photographer_email: str, con
         raise
 
 
+def backfill_exif(conn, batch_size: int = 500) -> Dict:
+    """
+    Fill taken_at/camera for existing rows from the headers of their files.
+
+    Walks rows with taken_at IS NULL in id order (keyset pagination), so each
+    row is looked at once per run even if its image has no EXIF data.
+    """
+    from PIL import Image
+    
+    stats = {'checked': 0, 'updated': 0, 'missing': 0, 'no_exif': 0}
+    read_cursor = conn.cursor()
+    write_cursor = conn.cursor()
+    last_id = 0
+    
+    try:
+        while True:
+            read_cursor.execute(
+                'SELECT id, image_url FROM photographer_photo '
+                'WHERE taken_at IS NULL AND id > %s ORDER BY id ASC LIMIT %s',
+                (last_id, batch_size)
+            )
+            rows = read_cursor.fetchall()
+            if not rows:
+                break
+            
+            updates = []
+            for photo_id, image_url in rows:
+                last_id = photo_id
+                stats['checked'] += 1
+                source_path = ROOT_DIR / image_url.lstrip('/')
+                if not image_url.startswith('/uploads/photos/') or not source_path.is_file():
+                    stats['missing'] += 1
+                    continue
+                try:
+                    with Image.open(source_path) as img:
+                        fields = read_exif_fields(img)
+                except Exception:
+                    fields = {'taken_at': None}
+                if fields['taken_at'] is None:
+                    stats['no_exif'] += 1
+                    continue
+                updates.append((fields['taken_at'], fields['camera'], photo_id))
+            
+            if updates:
+                write_cursor.executemany(
+                    'UPDATE photographer_photo SET taken_at = %s, camera = %s WHERE id = %s',
+                    updates
+                )
+                conn.commit()
+                stats['updated'] += len(updates)
+            
+            print(f'   ✓ Checked {stats["checked"]} rows ({stats["updated"]} updated, '
+                  f'{stats["no_exif"]} without EXIF, {stats["missing"]} missing files)', end='\r')
+    finally:
+        read_cursor.close()
+        write_cursor.close()
+    
+    print()
+    return stats
+
+
+def is_successful_result(result: Dict) -> bool:
+    """An archive counts as processed unless more than 10% of its images failed"""
+    return result['failed'] == 0 or (result['successful'] > 0 and result['failed'] < result['total'] * 0.1)
+
+
+class DirectoryWatcher:
+    """
+    Wakes the daemon when files are closed or moved into watched directories.
+
+    Uses Linux inotify through libc; on other platforms wait() simply sleeps
+    for the poll interval, so the daemon degrades to periodic rescans.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+
+    def __init__(self, poll_seconds: float = SPOOL_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.fd = -1
+        self.watched = set()
+        libc_name = ctypes.util.find_library('c') if sys.platform.startswith('linux') else None
+        if libc_name:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            if hasattr(libc, 'inotify_init1'):
+                self._libc = libc
+                self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self.fd >= 0
+
+    def watch(self, directory: Path):
+        """Start watching a directory (no-op if already watched or polling)"""
+        if not self.uses_inotify or directory in self.watched:
+            return
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) >= 0:
+            self.watched.add(directory)
+
+    def wait(self, timeout: float):
+        """Block until a filesystem event arrives or the timeout expires"""
+        if not self.uses_inotify:
+            time.sleep(min(timeout, self.poll_seconds))
+            return
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 64 * 1024):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self.uses_inotify:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def read_category_for(zip_path: Path, spool_dir: Path, default_category: str = None) -> str:
+    """
+    Resolve the category of a spooled archive.
+
+    Order: sidecar file (`<name>.category` containing the category name),
+    then the path convention (`<spool>/<category>/<name>.zip`), then the
+    daemon's default category. Returns None when no category is known yet.
+    """
+    sidecar = zip_path.with_suffix('.category')
+    try:
+        value = sidecar.read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        value = None
+    if value is not None:
+        if value in VALID_CATEGORIES:
+            return VALID_CATEGORIES[value]
+        print(f'⚠️  Ignoring invalid category "{value}" in {sidecar.name}')
+    if zip_path.parent != spool_dir and zip_path.parent.name in CATEGORY_NAMES:
+        return zip_path.parent.name
+    return default_category
+
+
+def find_spooled_zips(spool_dir: Path) -> List[Path]:
+    """Find archives waiting in the spool root and its category subdirectories"""
+    zip_files = find_zip_files(spool_dir)
+    for category in CATEGORY_NAMES:
+        category_dir = spool_dir / category
+        if category_dir.is_dir():
+            zip_files.extend(find_zip_files(category_dir))
+    return zip_files
+
+
+def unique_destination(directory: Path, name: str) -> Path:
+    """Return a path in directory for name that does not overwrite an existing file"""
+    directory.mkdir(parents=True, exist_ok=True)
+    dest = directory / name
+    if dest.exists():
+        stem, suffix = os.path.splitext(name)
+        dest = directory / f'{stem}-{int(time.time())}{suffix}'
+    return dest
+
+
+def claim_archive(zip_path: Path, spool_dir: Path, category: str) -> Path:
+    """
+    Claim an archive by atomically renaming it into processing/<category>/.
+
+    Returns the claimed path, or None if another worker or daemon won the race.
+    """
+    claimed = unique_destination(spool_dir / SPOOL_PROCESSING / category, zip_path.name)
+    try:
+        os.rename(zip_path, claimed)
+    except FileNotFoundError:
+        return None
+    zip_path.with_suffix('.category').unlink(missing_ok=True)
+    return claimed
+
+
+def process_spooled_archive(claimed: Path, spool_dir: Path, category: str, photographer_email: str) -> bool:
+    """Process one claimed archive and move it to done/ or failed/"""
+    import mysql.connector
+    
+    try:
+        conn = get_connection(exit_on_error=False)
+    except mysql.connector.Error:
+        # Release the claim so the archive is retried once the database is back
+        time.sleep(SPOOL_POLL_SECONDS)
+        os.rename(claimed, unique_destination(spool_dir / category, claimed.name))
+        return False
+    
+    try:
+        result = process_zip_file(claimed, category, photographer_email, conn)
+        ok = is_successful_result(result)
+        report = {
+            'archive': claimed.name,
+            'category': category,
+            'total': result['total'],
+            'successful': result['successful'],
+            'failed': result['failed'],
+            'skipped': result['skipped'],
+            'errors': result['errors'],
+        }
+    except Exception as error:
+        ok = False
+        report = {'archive': claimed.name, 'category': category, 'error': str(error)}
+    finally:
+        conn.close()
+    
+    dest = unique_destination(spool_dir / (SPOOL_DONE if ok else SPOOL_FAILED) / category, claimed.name)
+    shutil.move(str(claimed), str(dest))
+    dest.with_suffix('.report.json').write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'{"✅" if ok else "❌"} {claimed.name} → {dest.parent.relative_to(spool_dir)}/')
+    return ok
+
+
+def report_worker_crash(future):
+    """Log exceptions that escaped a daemon worker (the archive stays in processing/)"""
+    error = future.exception()
+    if error is not None:
+        print(f'❌ Daemon worker crashed: {error}')
+
+
+def run_daemon(spool_dir: Path, workers: int, default_category: str, photographer_email: str):
+    """
+    Watch the spool directory and ingest archives as they arrive.
+
+    Archives are claimed by atomic rename, processed by up to `workers` threads
+    (each checking a connection out of a shared pool of `workers` connections) and moved to done/ or failed/ with a JSON
+    report. Archives left in processing/ by a previous daemon are resumed
+    first, using the ingest journal. SIGTERM/SIGINT stop claiming new archives
+    and wait for the running ones to finish.
+    """
+    sys.stdout.reconfigure(line_buffering=True)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    for sub in (SPOOL_PROCESSING, SPOOL_DONE, SPOOL_FAILED):
+        (spool_dir / sub).mkdir(exist_ok=True)
+    
+    stopping = threading.Event()
+    
+    def request_stop(signum, frame):
+        print(f'\n🛑 Received signal {signum}, finishing running archives...')
+        stopping.set()
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    
+    import mysql.connector
+    
+    # One pooled connection per worker, opened once instead of per archive
+    try:
+        get_pool(size=workers)
+    except mysql.connector.Error as err:
+        print(f'⚠️  Database not reachable yet ({err}); workers will retry')
+    
+    watcher = DirectoryWatcher()
+    print(f'👀 Watching {spool_dir} ({"inotify" if watcher.uses_inotify else "polling"}, {workers} worker(s))')
+    
+    # Resume archives claimed by a previous daemon that did not finish them
+    queue = []
+    for category in CATEGORY_NAMES:
+        leftover_dir = spool_dir / SPOOL_PROCESSING / category
+        if leftover_dir.is_dir():
+            queue.extend((zip_path, category) for zip_path in find_zip_files(leftover_dir))
+    
+    in_flight = set()
+    warned = set()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            while not stopping.is_set():
+                in_flight = {f for f in in_flight if not f.done()}
+                
+                watcher.watch(spool_dir)
+                for category in CATEGORY_NAMES:
+                    if (spool_dir / category).is_dir():
+                        watcher.watch(spool_dir / category)
+                
+                next_wake = SPOOL_POLL_SECONDS
+                now = time.time()
+                for zip_path in find_spooled_zips(spool_dir):
+                    if len(queue) + len(in_flight) >= workers:
+                        break
+                    try:
+                        age = now - zip_path.stat().st_mtime
+                    except FileNotFoundError:
+                        # Claimed by another daemon or removed by the uploader since the scan
+                        continue
+                    if age < SPOOL_SETTLE_SECONDS:
+                        # Still being uploaded; look again once it has settled
+                        next_wake = min(next_wake, SPOOL_SETTLE_SECONDS - age + 0.5)
+                        continue
+                    category = read_category_for(zip_path, spool_dir, default_category)
+                    if category is None:
+                        if zip_path not in warned:
+                            print(f'⚠️  No category for {zip_path.name}; add {zip_path.with_suffix(".category").name} or move it into a category folder')
+                            warned.add(zip_path)
+                        continue
+                    claimed = claim_archive(zip_path, spool_dir, category)
+                    if claimed:
+                        print(f'📥 Claimed {zip_path.name} ({category})')
+                        queue.append((claimed, category))
+                
+                while queue and len(in_flight) < workers:
+                    claimed, category = queue.pop(0)
+                    future = executor.submit(
+                        process_spooled_archive, claimed, spool_dir, category, photographer_email
+                    )
+                    future.add_done_callback(report_worker_crash)
+                    in_flight.add(future)
+                
+                watcher.wait(next_wake if not in_flight else min(next_wake, 1.0))
+        finally:
+            watcher.close()
+    
+    print('👋 Daemon stopped')
+
+
 def main():
     """Main function"""
     # Load environment variables
@@ -281,8 +1154,46 @@ def main():
     parser = argparse.ArgumentParser(description='Process ZIP files containing photos')
     parser.add_argument('folder_path', nargs='?', help='Path to folder containing ZIP files')
     parser.add_argument('category', nargs='?', help='Photo category (pre-wedding, brides-dinner, morning-wedding, grooms-dinner)')
+    parser.add_argument('--yes', '-y', action='store_true', help='Do not ask for confirmation before processing')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Watch the spool folder (default: uploads/zip) and process archives as they arrive')
+    parser.add_argument('--workers', type=int, default=2, help='Archives processed concurrently in --daemon mode (default: 2)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Estimate time, output and database writes from a timed sample, without importing')
+    parser.add_argument('--sample', type=int, default=None, metavar='N',
+                        help='Images timed for the --dry-run estimate (default: chosen from the image count)')
+    
+    parser.add_argument('--backfill-exif', action='store_true',
+                        help='Fill taken_at/camera for existing photos from their EXIF headers, then exit')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    session = start_profiling(args, 'process-zip-folder')
+    
+    if args.backfill_exif:
+        conn = get_connection()
+        try:
+            print('\n📷 Backfilling EXIF capture times...')
+            stats = backfill_exif(conn)
+            session.stats.update(stats)
+            print(f'✅ Updated {stats["updated"]} of {stats["checked"]} photos')
+        finally:
+            conn.close()
+        sys.exit(0)
+    
+    if args.category and args.category not in VALID_CATEGORIES.values():
+        print(f'❌ Invalid category: {args.category}')
+        print(f'Valid categories: {", ".join(VALID_CATEGORIES.values())}')
+        sys.exit(1)
+    
+    if args.daemon and args.dry_run:
+        print('❌ --dry-run previews a folder of ZIP files and cannot be combined with --daemon')
+        sys.exit(1)
+    
+    if args.daemon:
+        spool_dir = Path(args.folder_path) if args.folder_path else SPOOL_DIR
+        run_daemon(spool_dir, max(1, args.workers), args.category, DEFAULT_PHOTOGRAPHER_EMAIL)
+        sys.exit(0)
     
     # Get folder path
     if args.folder_path:
@@ -295,10 +1206,6 @@ def main():
     
     # Get category
     if args.category:
-        if args.category not in VALID_CATEGORIES.values():
-            print(f'❌ Invalid category: {args.category}')
-            print(f'Valid categories: {", ".join(VALID_CATEGORIES.values())}')
-            sys.exit(1)
         category = args.category
     else:
         category = get_category_interactive()
@@ -319,16 +1226,23 @@ def main():
         file_size_mb = zip_file.stat().st_size / (1024 * 1024)
         print(f'   {i}. {zip_file.name} ({file_size_mb:.1f} MB)')
     
+    if args.dry_run:
+        session.stats['estimate'] = estimate_ingest_cost(zip_files, category, DEFAULT_PHOTOGRAPHER_EMAIL,
+                                                         args.workers, args.sample)
+        print('\n💡 This was a dry run. Nothing was imported and no ZIP files were deleted.')
+        sys.exit(0)
+    
     # Confirm before processing
     print(f'\n⚠️  About to process {len(zip_files)} ZIP file(s)...')
     print('⚠️  ZIP files will be DELETED after successful processing!')
-    confirm = input('\nContinue? (yes/no): ').strip().lower()
-    if confirm not in ['yes', 'y']:
-        print('❌ Cancelled by user.')
-        sys.exit(0)
+    if not args.yes:
+        confirm = input('\nContinue? (yes/no): ').strip().lower()
+        if confirm not in ['yes', 'y']:
+            print('❌ Cancelled by user.')
+            sys.exit(0)
     
     # Connect to database
-    conn = get_db_connection()
+    conn = get_connection()
     
     try:
         # Process each ZIP file
@@ -351,7 +1265,7 @@ def main():
                 result = process_zip_file(zip_file, category, DEFAULT_PHOTOGRAPHER_EMAIL, conn)
                 
                 # Only delete if processing was successful
-                if result['failed'] == 0 or (result['successful'] > 0 and result['failed'] < result['total'] * 0.1):
+                if is_successful_result(result):
                     zip_file.unlink()
                     print(f'\n🗑️  Deleted: {zip_file.name}')
                     summary['successful'] += 1
@@ -375,6 +1289,8 @@ def main():
                 })
         
         elapsed = (time.time() - start_time) / 60  # in minutes
+        session.stats.update({key: value for key, value in summary.items() if key != 'errors'})
+        session.stats['errors'] = summary['errors']
         
         # Print final summary
         print('\n\n' + '=' * 70)
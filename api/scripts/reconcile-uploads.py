@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Upload Reconciliation Script
+Compares the files in uploads/photos with the URLs in the database and
+reports (or fixes) the differences:
+
+- orphans:            generated files no row points at (failed imports, deleted rows)
+- missing originals:  rows whose image_url file does not exist
+- missing thumbnails: photographer_photo rows whose thumbnail_url file does not exist
+
+Usage:
+    python scripts/reconcile-uploads.py [--clean-orphans] [--requeue-thumbnails] [--report FILE]
+
+Without options nothing is changed. The folder is listed once with
+os.scandir (no per-file stat) and the tables are read in id-ordered pages,
+so memory grows with the number of files on disk, not with the number of
+rows, and 100k files take a few seconds. Only files named like the ones
+uploads, imports and the optimizer create (photo-*, thumbnails/thumb_*,
+ab/cd/<sha256>.*) can be orphans; the website's own images in the same
+folder are never moved.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from media_tools import load_env, get_connection, PHOTOS_DIR, UPLOADS_DIR
+from media_tools.storage import url_to_relpath, relpath_to_url, remove_empty_shards, is_generated
+
+# Rows fetched per query
+PAGE_SIZE = 5000
+
+# Files younger than this are never treated as orphans: an import writes
+# the file before it inserts the row
+MIN_AGE_MINUTES = 60
+
+# Orphans are moved here (one folder per run) instead of being deleted
+QUARANTINE_DIR = UPLOADS_DIR / '.orphans'
+
+# Tables whose URLs point into uploads/photos: (table, image column, thumbnail column)
+TABLES = (
+    ('photographer_photo', 'image_url', 'thumbnail_url'),
+    ('photos', 'image_url', None),
+)
+
+# Entries listed per problem in the console output (--report has all of them)
+SHOW_LIMIT = 20
+
+
+def scan_files(root: Path) -> dict:
+    """
+    Every file below root as {relative posix path: False}; the value is set
+    to True once a row is found that uses the file. Hidden entries
+    (temporary files, journals) are skipped.
+    """
+    files = {}
+    pending = ['']
+    while pending:
+        prefix = pending.pop()
+        try:
+            with os.scandir(root / prefix if prefix else root) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    relpath = f'{prefix}{entry.name}'
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(relpath + '/')
+                    elif entry.is_file():
+                        files[relpath] = False
+        except FileNotFoundError:
+            continue
+    return files
+
+
+def iter_rows(conn, table: str, columns: list, page_size: int):
+    """Yield (id, *columns) rows of a table, one keyset page at a time"""
+    cursor = conn.cursor()
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(
+                f'SELECT id, {", ".join(columns)} FROM {table} WHERE id > %s ORDER BY id ASC LIMIT %s',
+                (last_id, page_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
+
+
+def is_missing_table(error) -> bool:
+    """True for MySQL's 'table doesn't exist' (the guest photos table is optional)"""
+    return getattr(error, 'errno', None) == 1146
+
+
+def reconcile(conn, files: dict, page_size: int) -> dict:
+    """Mark the files every row uses and collect rows whose files are missing"""
+    result = {'rows': 0, 'missing_originals': [], 'missing_thumbnails': []}
+    for table, image_column, thumbnail_column in TABLES:
+        columns = [image_column] + ([thumbnail_column] if thumbnail_column else [])
+        try:
+            for row in iter_rows(conn, table, columns, page_size):
+                result['rows'] += 1
+                photo_id, image_url = row[0], row[1]
+                relpath = url_to_relpath(image_url)
+                if relpath is not None:
+                    if relpath in files:
+                        files[relpath] = True
+                    else:
+                        result['missing_originals'].append((table, photo_id, image_url))
+
+                thumbnail_url = row[2] if thumbnail_column else None
+                thumb_relpath = url_to_relpath(thumbnail_url)
+                if thumb_relpath is not None:
+                    if thumb_relpath in files:
+                        files[thumb_relpath] = True
+                    else:
+                        result['missing_thumbnails'].append((table, photo_id, thumbnail_url))
+        except Exception as e:
+            if not is_missing_table(e):
+                raise
+            print(f'   ⏭️  Table {table} does not exist, skipped')
+
+    # Files written after the folder was listed are not missing
+    for key in ('missing_originals', 'missing_thumbnails'):
+        result[key] = [item for item in result[key] if not (PHOTOS_DIR / url_to_relpath(item[2])).exists()]
+    return result
+
+
+def find_orphans(files: dict, min_age_minutes: float) -> tuple:
+    """Unused generated files split into (orphans, too recent to judge), oldest first"""
+    cutoff = time.time() - min_age_minutes * 60
+    orphans, recent = [], []
+    for relpath, used in files.items():
+        if used or not is_generated(relpath):
+            continue
+        try:
+            stat = (PHOTOS_DIR / relpath).stat()
+        except FileNotFoundError:
+            continue  # deleted since the scan
+        (orphans if stat.st_mtime < cutoff else recent).append((stat.st_mtime, relpath, stat.st_size))
+    orphans.sort()
+    return [(relpath, size) for _, relpath, size in orphans], [relpath for _, relpath, _ in recent]
+
+
+def still_unreferenced(conn, relpaths: list) -> list:
+    """The paths from `relpaths` that still no row uses (rows may have been added since the scan)"""
+    urls = {relpath_to_url(relpath): relpath for relpath in relpaths}
+    cursor = conn.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(urls))
+        for table, image_column, thumbnail_column in TABLES:
+            for column in filter(None, (image_column, thumbnail_column)):
+                try:
+                    cursor.execute(f'SELECT {column} FROM {table} WHERE {column} IN ({placeholders})', list(urls))
+                except Exception as e:
+                    if not is_missing_table(e):
+                        raise
+                    continue
+                for (url,) in cursor.fetchall():
+                    urls.pop(url, None)
+                if not urls:
+                    return []
+                placeholders = ', '.join(['%s'] * len(urls))
+    finally:
+        cursor.close()
+    return list(urls.values())
+
+
+def quarantine_orphans(conn, orphans: list, page_size: int) -> tuple:
+    """Move orphans to uploads/.orphans/<timestamp>/; returns (folder, files moved)"""
+    folder = QUARANTINE_DIR / datetime.now().strftime('%Y%m%d-%H%M%S')
+    moved = 0
+    # Never move site assets, whatever the caller passes in
+    relpaths = [relpath for relpath, _ in orphans if is_generated(relpath)]
+    for start in range(0, len(relpaths), page_size):
+        for relpath in still_unreferenced(conn, relpaths[start:start + page_size]):
+            source = PHOTOS_DIR / relpath
+            dest = folder / relpath
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(source, dest)
+            except FileNotFoundError:
+                continue
+            remove_empty_shards(source)
+            moved += 1
+    return folder, moved
+
+
+def requeue_thumbnails(conn, missing: list, page_size: int) -> int:
+    """Clear thumbnail_url of rows whose thumbnail file is gone, so optimize-images.py --new redoes them"""
+    rows = [(photo_id, url) for table, photo_id, url in missing if table == 'photographer_photo']
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(rows), page_size):
+            # The thumbnail_url guard skips rows that got a new thumbnail meanwhile
+            cursor.executemany(
+                'UPDATE photographer_photo SET thumbnail_url = NULL WHERE id = %s AND thumbnail_url = %s',
+                rows[start:start + page_size]
+            )
+            conn.commit()
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def print_items(title: str, items: list):
+    print(f'\n{title}: {len(items)}')
+    for item in items[:SHOW_LIMIT]:
+        print(f'   - {item}')
+    if len(items) > SHOW_LIMIT:
+        print(f'   ... and {len(items) - SHOW_LIMIT} more')
+
+
+def main():
+    """Main function"""
+    load_env()
+
+    parser = argparse.ArgumentParser(description='Find orphan files and rows with missing files in uploads/photos')
+    parser.add_argument('--clean-orphans', action='store_true',
+                        help='Move orphan files to uploads/.orphans/<timestamp>/')
+    parser.add_argument('--requeue-thumbnails', action='store_true',
+                        help='Clear thumbnail_url of rows whose thumbnail is missing (then run optimize-images.py --new)')
+    parser.add_argument('--min-age-minutes', type=float, default=MIN_AGE_MINUTES,
+                        help=f'Only treat files older than this as orphans (default: {MIN_AGE_MINUTES})')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help=f'Rows per query (default: {PAGE_SIZE})')
+    parser.add_argument('--report', type=Path, help='Also write the full lists to this JSON file')
+    args = parser.parse_args()
+    page_size = max(1, args.page_size)
+
+    print('\n' + '=' * 70)
+    print('🔎 Upload Reconciliation')
+    print('=' * 70)
+    print(f'Photos folder: {PHOTOS_DIR}')
+    changes = [name for name, enabled in (('move orphans', args.clean_orphans),
+                                          ('requeue thumbnails', args.requeue_thumbnails)) if enabled]
+    print(f'Mode: {"LIVE - " + " and ".join(changes) if changes else "REPORT ONLY - No changes will be made"}')
+    print('=' * 70 + '\n')
+
+    started = time.perf_counter()
+    files = scan_files(PHOTOS_DIR)
+    scan_seconds = time.perf_counter() - started
+    print(f'📁 Listed {len(files)} files in {scan_seconds:.1f}s')
+
+    conn = get_connection()
+    try:
+        started = time.perf_counter()
+        result = reconcile(conn, files, page_size)
+        print(f'🗄️  Checked {result["rows"]} rows in {time.perf_counter() - started:.1f}s')
+        orphans, recent = find_orphans(files, args.min_age_minutes)
+        unmanaged = sum(1 for relpath, used in files.items() if not used and not is_generated(relpath))
+
+        folder, moved = None, 0
+        if args.clean_orphans and orphans:
+            folder, moved = quarantine_orphans(conn, orphans, page_size)
+        requeued = 0
+        if args.requeue_thumbnails and result['missing_thumbnails']:
+            requeued = requeue_thumbnails(conn, result['missing_thumbnails'], page_size)
+    finally:
+        conn.close()
+
+    orphan_bytes = sum(size for _, size in orphans)
+    print_items('🗑️  Orphan files', [relpath for relpath, _ in orphans])
+    print_items('❌ Rows with missing originals', [f'{table} #{photo_id}: {url}'
+                                                   for table, photo_id, url in result['missing_originals']])
+    print_items('🖼️  Rows with missing thumbnails', [f'{table} #{photo_id}: {url}'
+                                                    for table, photo_id, url in result['missing_thumbnails']])
+
+    if args.report:
+        args.report.write_text(json.dumps({
+            'photos_dir': str(PHOTOS_DIR),
+            'files': len(files),
+            'rows': result['rows'],
+            'orphans': [{'path': relpath, 'bytes': size} for relpath, size in orphans],
+            'recent_unreferenced': recent,
+            'unmanaged_files': unmanaged,
+            'missing_originals': [{'table': t, 'id': i, 'url': u} for t, i, u in result['missing_originals']],
+            'missing_thumbnails': [{'table': t, 'id': i, 'url': u} for t, i, u in result['missing_thumbnails']],
+        }, indent=2), encoding='utf-8')
+
+    print('\n' + '=' * 70)
+    print('✅ Reconciliation Complete!')
+    print('=' * 70)
+    print(f'Files on disk:        {len(files)}')
+    print(f'Rows checked:         {result["rows"]}')
+    print(f'Orphan files:         {len(orphans)} ({orphan_bytes / 1024 / 1024:.1f} MB)')
+    if unmanaged:
+        print(f'Other files (kept):   {unmanaged} (site images and other files not named like uploads)')
+    if recent:
+        print(f'Too recent to judge:  {len(recent)} (younger than {args.min_age_minutes:g} min)')
+    print(f'Missing originals:    {len(result["missing_originals"])} {"⚠️" if result["missing_originals"] else ""}')
+    print(f'Missing thumbnails:   {len(result["missing_thumbnails"])}')
+    if folder:
+        print(f'Orphans moved:        {moved} -> {folder}')
+    if args.requeue_thumbnails:
+        print(f'Thumbnails requeued:  {requeued}')
+    if args.report:
+        print(f'Report:               {args.report}')
+    print('=' * 70)
+    if requeued:
+        print('\n💡 Run `python3 scripts/optimize-images.py --new` to recreate the requeued thumbnails.')
+    elif result['missing_thumbnails'] and not args.requeue_thumbnails:
+        print('\n💡 Rerun with --requeue-thumbnails to have optimize-images.py --new recreate them.')
+    if orphans and not args.clean_orphans:
+        print('💡 Rerun with --clean-orphans to move the orphan files out of uploads/photos.')
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,31 @@
 #!/usr/bin/env python3
 """
 Test Image Optimization Setup
-Quick verification that everything is configured correctly
+Quick verification that everything is configured correctly, followed by
+short benchmarks of the disk, database and Pillow and an estimate of how
+long the pending thumbnail backlog will take
+
+Usage:
+    python3 scripts/test-setup.py [--no-bench]
 """
 
-import sys
 import os
+import sys
+import argparse
+import importlib.util
 from pathlib import Path
 
+parser = argparse.ArgumentParser(description='Check the image optimization setup and measure performance')
+parser.add_argument('--no-bench', action='store_true', help='Only run the setup checks, skip the benchmarks')
+args = parser.parse_args()
+
 print("\n" + "=" * 60)
 print("  Image Optimization Setup Test")
 print("=" * 60 + "\n")
 
 all_checks_passed = True
+pending_photos = None
+mean_photo_size = None
 
 # Check 1: Pillow installed
 print("1. Checking Pillow (PIL) installation...")
@@ -61,26 +74,12 @@ else:
 # Check 5: Database connection
 print("\n5. Checking database connection...")
 try:
-    # Try to load .env
-    env_file = Path(__file__).parent.parent / '.env'
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
-    
+    # Same .env loading and connection pool as the other scripts
     import mysql.connector
-    config = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASSWORD', ''),
-        'database': os.getenv('DB_NAME', 'wedding_rsvp')
-    }
+    from media_tools import get_connection
     
-    conn = mysql.connector.connect(**config)
-    print("   ✅ Database connection successful")
+    conn = get_connection(exit_on_error=False, quiet=True)
+    print("   ✅ Database connection successful (pooled)")
     
     # Check if thumbnail_url column exists
     cursor = conn.cursor()
@@ -94,6 +93,24 @@ try:
         print("      Run: mysql -u root -p wedding_rsvp < database/migration_add_thumbnails.sql")
         all_checks_passed = False
     
+    # Check if width/height columns exist (written by process-zip-folder.py)
+    cursor.execute("SHOW COLUMNS FROM photographer_photo LIKE 'width'")
+    if cursor.fetchone():
+        print("   ✅ width/height columns exist in database")
+    else:
+        print("   ❌ width/height columns NOT found in database")
+        print("      Run: mysql -u root -p wedding_rsvp < database/migration_add_photo_dimensions.sql")
+        all_checks_passed = False
+    
+    # Check if taken_at/camera columns exist (EXIF capture time)
+    cursor.execute("SHOW COLUMNS FROM photographer_photo LIKE 'taken_at'")
+    if cursor.fetchone():
+        print("   ✅ taken_at/camera columns exist in database")
+    else:
+        print("   ❌ taken_at/camera columns NOT found in database")
+        print("      Run: mysql -u root -p wedding_rsvp < database/migration_add_photo_taken_at.sql")
+        all_checks_passed = False
+    
     # Check how many photos need optimization
     cursor.execute("""
         SELECT 
@@ -105,11 +122,21 @@ try:
     if result:
         total, optimized = result
         pending = total - optimized if optimized else total
+        pending_photos = pending
         print(f"\n   📊 Database Status:")
         print(f"      Total photos: {total}")
         print(f"      Optimized: {optimized}")
         print(f"      Pending: {pending}")
     
+    # Typical upload size, for a realistic thumbnail benchmark
+    try:
+        cursor.execute("SELECT AVG(width), AVG(height) FROM photographer_photo WHERE width IS NOT NULL")
+        avg_width, avg_height = cursor.fetchone()
+        if avg_width and avg_height:
+            mean_photo_size = (int(avg_width), int(avg_height))
+    except mysql.connector.Error:
+        pass
+    
     cursor.close()
     conn.close()
     
@@ -130,6 +157,74 @@ else:
     print(f"   ❌ Optimization script NOT found: {script_path}")
     all_checks_passed = False
 
+# Check 7: Startup time of the scripts the API spawns after each upload
+print("\n7. Checking script startup time...")
+try:
+    from media_tools.startup import STARTUP_CHECKS, STARTUP_BUDGET_MS, check_startup, describe
+    for name, script_args in STARTUP_CHECKS:
+        problems, total_ms = check_startup(Path(__file__).parent / name, script_args)
+        if problems:
+            print(f"   ⚠️  {describe(name, script_args)}: {'; '.join(problems)}")
+            print("      Move heavy imports into the functions that need them")
+        else:
+            print(f"   ✅ {describe(name, script_args)} starts in {total_ms:.0f} ms of imports (budget {STARTUP_BUDGET_MS} ms)")
+except Exception as e:
+    print(f"   ⚠️  Could not measure startup time: {e}")
+
+if not args.no_bench:
+    from media_tools import PHOTOS_DIR, THUMBNAILS_DIR, get_connection
+    from media_tools import doctor
+    
+    disk = mysql_latency = thumbnails = None
+    
+    # Check 8: Uploads volume write speed
+    print("\n8. Measuring uploads volume write speed...")
+    try:
+        disk = doctor.measure_disk_writes(PHOTOS_DIR)
+        print(f"   Sequential write: {disk['seq_mb_per_sec']:.0f} MB/s ({doctor.SEQ_WRITE_MB} MB, fsync)")
+        print(f"   Random 4 KB write: {disk['random_iops']:.0f} IOPS ({disk['random_mb_per_sec']:.1f} MB/s)")
+        if disk['seq_mb_per_sec'] < 50:
+            print("   ⚠️  Slow volume: large ZIP imports will be limited by the disk")
+    except Exception as e:
+        print(f"   ⚠️  Could not measure disk speed: {e}")
+    
+    # Check 9: MySQL latency
+    print("\n9. Measuring MySQL latency...")
+    try:
+        conn = get_connection(exit_on_error=False, quiet=True)
+        try:
+            mysql_latency = doctor.measure_mysql_latency(conn)
+        finally:
+            conn.close()
+        print(f"   Round trip: {mysql_latency['round_trip_ms']:.2f} ms median, {mysql_latency['round_trip_p95_ms']:.2f} ms p95")
+        print(f"   Commit:     {mysql_latency['commit_ms']:.2f} ms median, {mysql_latency['commit_p95_ms']:.2f} ms p95")
+        if mysql_latency['commit_ms'] > 20:
+            print("   ⚠️  Slow commits: per-photo updates will dominate small images")
+    except Exception as e:
+        print(f"   ⚠️  Could not measure MySQL latency: {e}")
+    
+    # Check 10: Thumbnail throughput with optimize-images.py's own code and settings
+    print("\n10. Measuring thumbnail speed...")
+    try:
+        spec = importlib.util.spec_from_file_location('optimize_images', Path(__file__).parent / 'optimize-images.py')
+        optimizer = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(optimizer)
+        size = mean_photo_size or doctor.DEFAULT_SAMPLE_SIZE
+        thumbnails = doctor.measure_thumbnail_rate(optimizer.optimize_image, THUMBNAILS_DIR, size)
+        print(f"   {size[0]}x{size[1]} JPEG ({thumbnails['source_mb']:.1f} MB) → "
+              f"{optimizer.THUMBNAIL_WIDTH}x{optimizer.THUMBNAIL_HEIGHT} @ {optimizer.QUALITY}% "
+              f"({thumbnails['thumbnail_kb']:.0f} KB)")
+        print(f"   {thumbnails['images_per_sec']:.2f} img/s on one core")
+    except Exception as e:
+        print(f"   ⚠️  Could not measure thumbnail speed: {e}")
+    
+    # Capacity estimate for the pending backlog
+    if thumbnails and pending_photos is not None:
+        estimate = doctor.estimate_backlog(pending_photos, thumbnails, mysql_latency, disk)
+        print(f"\n   📊 Backlog estimate for {pending_photos} pending photos:")
+        print(f"      One process:          {doctor.format_duration(estimate['single_seconds'])}")
+        print(f"      Spread over {estimate['cores']} core(s): {doctor.format_duration(estimate['parallel_seconds'])}")
+
 # Summary
 print("\n" + "=" * 60)
 if all_checks_passed:
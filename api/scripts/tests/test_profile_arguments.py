@@ -0,0 +1,49 @@
+"""
+migration_database/export_supabase_to_mysql.py repeats the profiling options
+of media_tools/profiling.py so it can run on its own; they must not drift.
+
+Run from api/scripts:
+    python3 -m unittest discover -s tests
+"""
+
+import sys
+import argparse
+import unittest
+import importlib.util
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+EXPORT_SCRIPT = SCRIPTS_DIR.parent.parent / 'migration_database' / 'export_supabase_to_mysql.py'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from media_tools import profiling  # noqa: E402
+
+
+def load_export():
+    spec = importlib.util.spec_from_file_location('export_supabase_to_mysql', EXPORT_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def describe_options(add_arguments) -> list:
+    """What argparse knows about each option: flags, type, default, help"""
+    parser = argparse.ArgumentParser(add_help=False)
+    add_arguments(parser)
+    return [(action.option_strings, type(action).__name__, action.type, action.default,
+             action.metavar, action.help) for action in parser._actions]
+
+
+class ProfileArgumentsTest(unittest.TestCase):
+
+    def test_export_copy_matches_shared_options(self):
+        try:
+            export = load_export()
+        except ImportError as e:
+            self.skipTest(f'export dependencies not installed ({e})')
+        self.assertEqual(describe_options(export.add_profile_arguments),
+                         describe_options(profiling.add_profile_arguments))
+
+
+if __name__ == '__main__':
+    unittest.main()
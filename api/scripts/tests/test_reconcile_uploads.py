@@ -0,0 +1,112 @@
+"""
+reconcile-uploads.py must never move the website's own images out of
+uploads/photos, only files named like the ones the tools create.
+
+Run from api/scripts:
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+import importlib.util
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from media_tools import storage  # noqa: E402
+
+# Hard-coded in website/src/components/WeddingPhoto.jsx; no row points at them
+SITE_ASSETS = [
+    'bride/LIFE9617.jpg',
+    'groom/LIFE9911.jpg',
+    'couple/couple-main.jpg',
+    'placeholder.svg',
+]
+
+GENERATED = [
+    'photo-1700000000000-123456789.jpg',
+    'thumbnails/thumb_42.jpg',
+    'thumbnails/ab/cd/thumb_43.jpg',
+    'ab/cd/' + 'ab' + 'c' * 62 + '.jpg',
+    'thumbnails/ab/cd/' + 'ab' + 'c' * 62 + '.jpg',
+    'ab/cd/' + 'ab' + 'd' * 62 + '-brides-dinner.jpg',
+]
+
+
+def load_reconciler():
+    spec = importlib.util.spec_from_file_location('reconcile_uploads', SCRIPTS_DIR / 'reconcile-uploads.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class EmptyDatabase:
+    """Connection whose tables reference no files at all"""
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=()):
+        pass
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class CleanOrphansTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.photos = Path(self.tmp.name) / 'uploads' / 'photos'
+        old = time.time() - 24 * 3600
+        for relpath in SITE_ASSETS + GENERATED:
+            path = self.photos / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'x')
+            os.utime(path, (old, old))
+
+        self.reconciler = load_reconciler()
+        self.reconciler.PHOTOS_DIR = self.photos
+        self.reconciler.QUARANTINE_DIR = self.photos.parent / '.orphans'
+        self._storage_photos_dir = storage.PHOTOS_DIR
+        storage.PHOTOS_DIR = self.photos
+
+    def tearDown(self):
+        storage.PHOTOS_DIR = self._storage_photos_dir
+        self.tmp.cleanup()
+
+    def test_site_assets_are_not_orphans(self):
+        files = self.reconciler.scan_files(self.photos)
+        orphans, recent = self.reconciler.find_orphans(files, min_age_minutes=0)
+        self.assertEqual(sorted(relpath for relpath, _ in orphans), sorted(GENERATED))
+        self.assertEqual(recent, [])
+
+    def test_clean_orphans_keeps_site_assets(self):
+        files = self.reconciler.scan_files(self.photos)
+        orphans, _ = self.reconciler.find_orphans(files, min_age_minutes=0)
+        folder, moved = self.reconciler.quarantine_orphans(EmptyDatabase(), orphans, page_size=2)
+
+        self.assertEqual(moved, len(GENERATED))
+        for relpath in SITE_ASSETS:
+            self.assertTrue((self.photos / relpath).is_file(), relpath)
+        for relpath in GENERATED:
+            self.assertFalse((self.photos / relpath).exists(), relpath)
+            self.assertTrue((folder / relpath).is_file(), relpath)
+
+    def test_quarantine_refuses_site_assets_passed_directly(self):
+        _, moved = self.reconciler.quarantine_orphans(
+            EmptyDatabase(), [(relpath, 1) for relpath in SITE_ASSETS], page_size=100)
+        self.assertEqual(moved, 0)
+        for relpath in SITE_ASSETS:
+            self.assertTrue((self.photos / relpath).is_file(), relpath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Atomic writes in media_tools.storage must work when several --daemon
+workers (threads of one process) write the same content-addressed file.
+
+Run from api/scripts:
+    python3 -m unittest discover -s tests
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from media_tools import storage  # noqa: E402
+
+THREADS = 8
+DATA = b'x' * (1024 * 1024)
+
+
+def run_in_threads(target):
+    errors = []
+
+    def run():
+        try:
+            target()
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=run) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class ConcurrentWriteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.path = self.root / 'ab' / 'cd' / ('ab' + 'c' * 62 + '.jpg')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_temporary_path_differs_per_thread(self):
+        # Thread ids are reused once a thread exits, so keep them all alive
+        paths = []
+        barrier = threading.Barrier(THREADS)
+
+        def take_path():
+            paths.append(storage.temporary_path(self.path))
+            barrier.wait()
+
+        self.assertEqual(run_in_threads(take_path), [])
+        self.assertEqual(len(set(paths)), THREADS)
+
+    def test_same_file_written_by_many_threads(self):
+        # Different sizes, so no thread skips the write as already done
+        sizes = iter(range(THREADS))
+        lock = threading.Lock()
+
+        def write():
+            with lock:
+                size = len(DATA) + next(sizes)
+            storage.write_file_atomic(self.path, b'x' * size)
+
+        self.assertEqual(run_in_threads(write), [])
+        self.assertEqual(sorted(path.name for path in self.path.parent.iterdir()), [self.path.name])
+
+    def test_same_link_made_by_many_threads(self):
+        source = self.root / 'source.jpg'
+        source.write_bytes(DATA)
+        self.assertEqual(run_in_threads(lambda: storage.link_or_copy(source, self.path)), [])
+        self.assertEqual(self.path.read_bytes(), DATA)
+        self.assertEqual(sorted(path.name for path in self.path.parent.iterdir()), [self.path.name])
+
+
+if __name__ == '__main__':
+    unittest.main()
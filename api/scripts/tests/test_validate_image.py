@@ -0,0 +1,81 @@
+"""
+process-zip-folder.py must reject truncated images but accept complete ones
+with data appended after the end of the image (motion photos, tool trailers).
+
+Run from api/scripts:
+    python3 -m unittest discover -s tests
+"""
+
+import io
+import sys
+import unittest
+import importlib.util
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Longer than the 32 bytes the old trailer checks looked at
+TRAILING_DATA = b'trailing data after the image ' * 4
+
+
+def load_processor():
+    spec = importlib.util.spec_from_file_location('process_zip_folder', SCRIPTS_DIR / 'process-zip-folder.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def encode(image_format: str) -> bytes:
+    from PIL import Image
+
+    img = Image.new('RGB', (16, 8), (200, 30, 60))
+    if image_format == 'GIF':
+        img = img.convert('P')
+    buffer = io.BytesIO()
+    img.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class ValidateImageHeaderTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = load_processor()
+
+    def validate(self, name, data):
+        return self.processor.validate_image_header(name, data)
+
+    def test_complete_images_pass(self):
+        for name, image_format in (('a.jpg', 'JPEG'), ('a.png', 'PNG'), ('a.gif', 'GIF')):
+            with self.subTest(image_format):
+                info = self.validate(name, encode(image_format))
+                self.assertEqual((info['width'], info['height']), (16, 8))
+
+    def test_trailing_data_is_accepted(self):
+        for name, image_format in (('a.jpg', 'JPEG'), ('a.png', 'PNG'), ('a.gif', 'GIF')):
+            with self.subTest(image_format):
+                info = self.validate(name, encode(image_format) + TRAILING_DATA)
+                self.assertEqual((info['width'], info['height']), (16, 8))
+
+    def test_truncated_images_are_rejected(self):
+        for name, image_format in (('a.jpg', 'JPEG'), ('a.png', 'PNG'), ('a.gif', 'GIF')):
+            with self.subTest(image_format):
+                data = encode(image_format)
+                with self.assertRaisesRegex(ValueError, 'Truncated'):
+                    self.validate(name, data[:-2])
+
+    def test_truncated_image_with_marker_in_appended_data_is_rejected(self):
+        png = encode('PNG')
+        iend = png.rindex(b'IEND') - 4
+        with self.assertRaisesRegex(ValueError, 'Truncated'):
+            self.validate('a.png', png[:iend] + b'IEND')
+
+    def test_trailer_byte_inside_gif_data_is_not_the_end(self):
+        gif = encode('GIF')
+        self.assertEqual(self.processor.gif_image_end(gif + TRAILING_DATA), len(gif))
+        self.assertIsNone(self.processor.gif_image_end(gif[:-1] + b'\x00'))
+
+
+if __name__ == '__main__':
+    unittest.main()
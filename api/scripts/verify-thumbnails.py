@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Thumbnail Verification Script
+Finds thumbnails that are missing, empty or truncated (e.g. by a crash or a
+full disk during save) and regenerates them from the originals
+
+Usage:
+    python scripts/verify-thumbnails.py [--category CATEGORY] [--full] [--workers N] [--dry-run]
+
+A row keeps its thumbnail_url even when the file behind it is broken, so
+optimize-images.py --new never redoes it. This script checks every
+thumbnail_url: the file must exist, be non-empty, end with a JPEG EOI
+marker and decode completely. Thumbnails that passed are remembered with
+their size and mtime in uploads/.thumbnail-index.json, so later runs only
+decode files that changed. Broken thumbnails are rewritten via a temporary
+file and rename, and thumbnail_url is updated if the configured layout
+puts the new file elsewhere.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from media_tools import load_env, get_connection, PHOTOS_DIR, UPLOADS_DIR
+from media_tools.storage import storage_layout, url_to_relpath, relpath_to_url, thumbnail_relpath
+
+# Size and mtime of every thumbnail that passed, keyed by path relative to uploads/photos
+INDEX_FILE = UPLOADS_DIR / '.thumbnail-index.json'
+
+# Rows read per query
+BATCH_SIZE = 1000
+
+# Smallest plausible JPEG thumbnail
+MIN_THUMBNAIL_BYTES = 128
+
+
+def load_optimizer():
+    """optimize-images.py as a module, for its optimize_image() and settings"""
+    spec = importlib.util.spec_from_file_location('optimize_images', Path(__file__).parent / 'optimize-images.py')
+    optimizer = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(optimizer)
+    return optimizer
+
+
+def load_index() -> dict:
+    try:
+        return json.loads(INDEX_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_index(index: dict):
+    tmp_path = INDEX_FILE.with_name(f'.{INDEX_FILE.name}.tmp-{os.getpid()}')
+    tmp_path.write_text(json.dumps(index, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp_path, INDEX_FILE)
+
+
+def check_thumbnail(path: Path):
+    """None if the thumbnail is intact, otherwise the reason it is not"""
+    from PIL import Image
+
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return 'missing'
+    if size < MIN_THUMBNAIL_BYTES:
+        return 'empty' if size == 0 else 'too small'
+    try:
+        with open(path, 'rb') as f:
+            f.seek(-2, os.SEEK_END)
+            if f.read(2) != b'\xff\xd9':
+                return 'truncated'
+        with Image.open(path) as img:
+            # Reduced-scale decode still reads every scan, so truncation raises
+            img.draft('RGB', (max(1, img.width // 8), max(1, img.height // 8)))
+            img.load()
+    except Exception as e:
+        return f'unreadable ({e})'
+    return None
+
+
+def verify(conn, index: dict, category=None, full=False, workers=None, batch_size=BATCH_SIZE) -> dict:
+    """
+    Check every row's thumbnail, decoding only files whose size/mtime are
+    not in the index (all of them with full). Returns the stats and the
+    broken rows as (id, image_url, thumbnail_url, reason).
+    """
+    stats = {'checked': 0, 'unchanged': 0, 'decoded': 0, 'ok': 0, 'broken': []}
+    cursor = conn.cursor()
+    query = ("SELECT id, image_url, thumbnail_url FROM photographer_photo "
+             "WHERE id > %s AND thumbnail_url IS NOT NULL AND thumbnail_url <> ''")
+    if category:
+        query += ' AND category = %s'
+    query += ' ORDER BY id ASC LIMIT %s'
+    last_id = 0
+    start_time = time.time()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                cursor.execute(query, (last_id, *([category] if category else []), batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                to_decode = []
+                for photo_id, image_url, thumbnail_url in rows:
+                    stats['checked'] += 1
+                    relpath = url_to_relpath(thumbnail_url)
+                    if relpath is None:
+                        continue
+                    try:
+                        stat = (PHOTOS_DIR / relpath).stat()
+                    except FileNotFoundError:
+                        index.pop(relpath, None)
+                        stats['broken'].append((photo_id, image_url, thumbnail_url, 'missing'))
+                        continue
+                    signature = [stat.st_size, stat.st_mtime_ns]
+                    if not full and index.get(relpath) == signature:
+                        stats['unchanged'] += 1
+                        continue
+                    to_decode.append((photo_id, image_url, thumbnail_url, relpath, signature))
+
+                paths = [PHOTOS_DIR / item[3] for item in to_decode]
+                for (photo_id, image_url, thumbnail_url, relpath, signature), problem in zip(
+                        to_decode, pool.map(check_thumbnail, paths)):
+                    stats['decoded'] += 1
+                    if problem is None:
+                        index[relpath] = signature
+                        stats['ok'] += 1
+                    else:
+                        index.pop(relpath, None)
+                        stats['broken'].append((photo_id, image_url, thumbnail_url, problem))
+
+                elapsed = time.time() - start_time
+                print(f'   ✓ Checked {stats["checked"]} thumbnails ({stats["decoded"]} decoded, '
+                      f'{len(stats["broken"])} broken) - {stats["checked"] / elapsed if elapsed > 0 else 0:.0f}/s',
+                      end='\r')
+    finally:
+        cursor.close()
+        # Also on Ctrl+C, so an interrupted run does not decode everything again
+        save_index(index)
+
+    print()
+    return stats
+
+
+def repair(conn, broken: list, index: dict, workers=None) -> dict:
+    """
+    Regenerate broken thumbnails from their originals. Each file is written
+    to a temporary name and renamed into place; thumbnail_url is changed
+    only if the configured layout puts the thumbnail at another path.
+    """
+    optimizer = load_optimizer()
+    layout = storage_layout()
+    results = {'repaired': 0, 'repointed': 0, 'failed': []}
+
+    def regenerate(item):
+        photo_id, image_url, thumbnail_url, _ = item
+        source_relpath = url_to_relpath(image_url)
+        if source_relpath is None:
+            return item, None, {'success': False, 'error': 'Invalid image_url format'}
+        new_relpath = thumbnail_relpath(photo_id, image_url, layout)
+        thumbnail_path = PHOTOS_DIR / new_relpath
+        thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+        return item, new_relpath, optimizer.optimize_image(PHOTOS_DIR / source_relpath, thumbnail_path)
+
+    cursor = conn.cursor()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for item, new_relpath, result in pool.map(regenerate, broken):
+                photo_id, image_url, thumbnail_url, _ = item
+                if not result['success']:
+                    results['failed'].append((photo_id, result.get('error', 'Unknown error')))
+                    continue
+                new_url = relpath_to_url(new_relpath)
+                if new_url != thumbnail_url:
+                    # The guard leaves rows alone whose thumbnail was replaced meanwhile
+                    cursor.execute(
+                        'UPDATE photographer_photo SET thumbnail_url = %s WHERE id = %s AND thumbnail_url = %s',
+                        (new_url, photo_id, thumbnail_url)
+                    )
+                    conn.commit()
+                    results['repointed'] += 1
+                stat = (PHOTOS_DIR / new_relpath).stat()
+                index[new_relpath] = [stat.st_size, stat.st_mtime_ns]
+                results['repaired'] += 1
+    finally:
+        cursor.close()
+
+    save_index(index)
+    return results
+
+
+def main():
+    """Main function"""
+    load_env()
+
+    parser = argparse.ArgumentParser(description='Verify thumbnails and regenerate broken ones')
+    parser.add_argument('--category', help='Only check this category')
+    parser.add_argument('--full', action='store_true', help='Decode every thumbnail, ignoring the index')
+    parser.add_argument('--workers', type=int, default=None, help='Threads checking/regenerating (default: one per CPU core)')
+    parser.add_argument('--dry-run', action='store_true', help='Report broken thumbnails without regenerating them')
+    args = parser.parse_args()
+
+    print('\n' + '=' * 70)
+    print('🩺 Thumbnail Verification')
+    print('=' * 70)
+    print(f'Photos folder: {PHOTOS_DIR}')
+    print(f'Checks: {"every thumbnail (--full)" if args.full else "new or changed thumbnails (index: " + INDEX_FILE.name + ")"}')
+    print(f'Mode: {"DRY RUN - No changes will be made" if args.dry_run else "LIVE - Broken thumbnails will be regenerated"}')
+    print('=' * 70 + '\n')
+
+    index = {} if args.full else load_index()
+    conn = get_connection()
+    try:
+        stats = verify(conn, index, args.category, args.full, args.workers)
+        results = None
+        if stats['broken'] and not args.dry_run:
+            print(f'🔧 Regenerating {len(stats["broken"])} thumbnails...')
+            results = repair(conn, stats['broken'], index, args.workers)
+    finally:
+        conn.close()
+
+    if stats['broken']:
+        print(f'\n❌ Broken thumbnails ({len(stats["broken"])}):')
+        for photo_id, _, thumbnail_url, problem in stats['broken'][:20]:
+            print(f'   - #{photo_id} {thumbnail_url}: {problem}')
+        if len(stats['broken']) > 20:
+            print(f'   ... and {len(stats["broken"]) - 20} more')
+
+    print('\n' + '=' * 70)
+    print('✅ Verification Complete!')
+    print('=' * 70)
+    print(f'Thumbnails checked:   {stats["checked"]}')
+    print(f'Unchanged (indexed):  {stats["unchanged"]}')
+    print(f'Decoded:              {stats["decoded"]}')
+    print(f'Broken:               {len(stats["broken"])} {"⚠️" if stats["broken"] else ""}')
+    if results:
+        print(f'Regenerated:          {results["repaired"]} ({results["repointed"]} moved to a new path)')
+        print(f'Could not repair:     {len(results["failed"])} {"❌" if results["failed"] else ""}')
+        for photo_id, error in results['failed'][:10]:
+            print(f'   - #{photo_id}: {error}')
+    print('=' * 70)
+    if stats['broken'] and args.dry_run:
+        print('\n💡 This was a dry run. Run without --dry-run to regenerate the broken thumbnails.')
+
+    sys.exit(1 if results and results['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
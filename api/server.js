@@ -78,6 +78,19 @@ app.use(
     },
   })
 );
+// Per-category album ZIPs built by scripts/build-album-zips.py (names change with content, so cache them)
+app.use(
+  '/uploads/albums',
+  express.static(path.join(__dirname, '../uploads/albums'), {
+    fallthrough: false,
+    setHeaders(res, filePath) {
+      res.setHeader('X-Content-Type-Options', 'nosniff');
+      if (filePath.endsWith('.zip')) {
+        res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+      }
+    },
+  })
+);
 app.use(
   '/uploads/song',
   express.static(path.join(__dirname, '../uploads/song'), {
@@ -0,0 +1,41 @@
+-- Add width/height columns to photographer_photo table
+-- Filled in by process-zip-folder.py from the image header at ingest time
+-- Idempotent: safe to run multiple times (skips columns that already exist)
+
+USE wedding_rsvp;
+
+-- Add width column only if it doesn't exist (MySQL has no ADD COLUMN IF NOT EXISTS)
+SET @col_exists = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'width'
+);
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN width INT UNSIGNED NULL AFTER thumbnail_url',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Add height column only if it doesn't exist
+SET @col_exists2 = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'height'
+);
+
+SET @sql2 = IF(@col_exists2 = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN height INT UNSIGNED NULL AFTER width',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt2 FROM @sql2;
+EXECUTE stmt2;
+DEALLOCATE PREPARE stmt2;
+
+-- Show current status
+SELECT
+    COUNT(*) AS total_photos,
+    SUM(CASE WHEN width IS NOT NULL THEN 1 ELSE 0 END) AS photos_with_dimensions
+FROM photographer_photo;
@@ -0,0 +1,44 @@
+-- Add a perceptual hash column to photographer_photo table
+-- Filled in (only for rows that do not have one yet) by:
+--   python3 api/scripts/find-duplicates.py
+-- Idempotent: safe to run multiple times (skips if column already exists)
+
+USE wedding_rsvp;
+
+-- 64-bit pHash of the original (NULL until hashed)
+SET @col_exists = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'phash'
+);
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN phash BIGINT UNSIGNED NULL',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- When hashing last failed and why (missing file, undecodable image, bad URL);
+-- such rows are skipped until find-duplicates.py --rehash
+SET @col_exists = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'phash_failed_at'
+);
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN phash_failed_at DATETIME NULL, ADD COLUMN phash_error VARCHAR(255) NULL',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Show current status
+SELECT
+    COUNT(*) AS total_photos,
+    SUM(CASE WHEN phash IS NOT NULL THEN 1 ELSE 0 END) AS photos_with_phash,
+    SUM(CASE WHEN phash_failed_at IS NOT NULL THEN 1 ELSE 0 END) AS photos_hash_failed
+FROM photographer_photo;
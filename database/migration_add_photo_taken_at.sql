@@ -0,0 +1,72 @@
+-- Add EXIF capture time and camera columns to photographer_photo table
+-- Filled in by process-zip-folder.py at ingest time; existing rows are filled by:
+--   python3 api/scripts/process-zip-folder.py --backfill-exif
+-- Idempotent: safe to run multiple times (skips if column/index already exists)
+
+USE wedding_rsvp;
+
+-- Add taken_at column only if it doesn't exist (MySQL has no ADD COLUMN IF NOT EXISTS)
+SET @col_exists = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'taken_at'
+);
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN taken_at DATETIME NULL AFTER photographer_email',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Add camera column only if it doesn't exist
+SET @col_exists2 = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND COLUMN_NAME = 'camera'
+);
+
+SET @sql2 = IF(@col_exists2 = 0,
+  'ALTER TABLE photographer_photo ADD COLUMN camera VARCHAR(128) NULL AFTER taken_at',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt2 FROM @sql2;
+EXECUTE stmt2;
+DEALLOCATE PREPARE stmt2;
+
+-- Category + capture time index: "category X sorted by time taken" is one range scan
+SET @idx_exists = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND INDEX_NAME = 'idx_category_taken_at'
+);
+
+SET @sql3 = IF(@idx_exists = 0,
+  'CREATE INDEX idx_category_taken_at ON photographer_photo(category, taken_at)',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt3 FROM @sql3;
+EXECUTE stmt3;
+DEALLOCATE PREPARE stmt3;
+
+-- Capture time index for the all-categories timeline
+SET @idx_exists2 = (
+  SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'photographer_photo' AND INDEX_NAME = 'idx_taken_at'
+);
+
+SET @sql4 = IF(@idx_exists2 = 0,
+  'CREATE INDEX idx_taken_at ON photographer_photo(taken_at)',
+  'SELECT 1 AS noop'
+);
+
+PREPARE stmt4 FROM @sql4;
+EXECUTE stmt4;
+DEALLOCATE PREPARE stmt4;
+
+-- Show current status
+SELECT
+    COUNT(*) AS total_photos,
+    SUM(CASE WHEN taken_at IS NOT NULL THEN 1 ELSE 0 END) AS photos_with_taken_at
+FROM photographer_photo;
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Supabase -> MySQL export row formatting
+
+Generates a synthetic wide table (integers, numerics, booleans, timestamps,
+short and long text with quotes/backslashes/unicode, ~20% NULLs) and pushes
+it through the same InsertWriter the export uses, reporting rows/s and MB/s.
+
+Usage:
+    python benchmark_export.py [--rows 200000] [--repeat 3]
+    python benchmark_export.py --postgres [--rows 200000] [--keep]
+    python benchmark_export.py --min-rows-per-sec 150000     # fail on regression
+
+The default mode runs in memory (no database) and compares a frozen copy of
+the original per-value formatter with the compiled per-table formatter, after
+checking both produce identical output. --postgres creates a bench_wide table
+in the SUPABASE_DB_* database (use the local docker-compose PostgreSQL, not
+production), fills it server-side and times export_table end to end.
+"""
+
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import export_supabase_to_mysql as export
+
+# Synthetic wide table: (column name, PostgreSQL type)
+BENCH_TABLE = 'bench_wide'
+BENCH_COLUMNS = (
+    [('id', 'bigint')]
+    + [(f'int_{i}', 'integer') for i in range(4)]
+    + [(f'amount_{i}', 'numeric') for i in range(3)]
+    + [(f'flag_{i}', 'boolean') for i in range(3)]
+    + [(f'ts_{i}', 'timestamp with time zone') for i in range(3)]
+    + [(f'name_{i}', 'character varying') for i in range(4)]
+    + [(f'note_{i}', 'text') for i in range(2)]
+)
+
+SAMPLE_WORDS = ['Guest', "O'Brien", 'back\\slash', '王小明', 'table', 'rsvp', 'NULL', 'line\nbreak', 'plain']
+
+
+class CountingSink:
+    """File-like object that only counts what is written"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def synthetic_rows(count, seed=42):
+    """Deterministic rows matching BENCH_COLUMNS"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for row_id in range(1, count + 1):
+        row = [row_id]
+        row += [rng.randint(-10**6, 10**6) if rng.random() > 0.2 else None for _ in range(4)]
+        row += [Decimal(rng.randint(0, 10**7)) / 100 if rng.random() > 0.2 else None for _ in range(3)]
+        row += [rng.random() > 0.5 if rng.random() > 0.2 else None for _ in range(3)]
+        row += [base + timedelta(seconds=rng.randint(0, 10**8)) if rng.random() > 0.2 else None for _ in range(3)]
+        row += [' '.join(rng.choices(SAMPLE_WORDS, k=3)) if rng.random() > 0.2 else None for _ in range(4)]
+        row += [' '.join(rng.choices(SAMPLE_WORDS, k=40)) if rng.random() > 0.2 else None for _ in range(2)]
+        rows.append(tuple(row))
+    return rows
+
+
+# Frozen copies of the formatter as it was before the compiled formatters
+# (strftime timestamps, unconditional escaping). Kept here rather than calling
+# export.format_value_for_mysql, which now shares the faster helpers, so the
+# speedup is measured against the original code path. Do not optimize.
+
+def legacy_escape_sql_string(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def legacy_format_value(value, column_type):
+    if value is None:
+        return 'NULL'
+    if column_type in ('boolean', 'bool'):
+        return '1' if value else '0'
+    if column_type in ('integer', 'bigint', 'smallint', 'numeric', 'decimal', 'real', 'double precision'):
+        return str(value)
+    if column_type in ('timestamp', 'timestamp without time zone', 'timestamp with time zone', 'date', 'time'):
+        if isinstance(value, datetime):
+            return f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'"
+        return legacy_escape_sql_string(value)
+    return legacy_escape_sql_string(value)
+
+
+def legacy_row_formatter(column_types):
+    """The original per-value path: dispatch on the type string for every value"""
+    def format_row(row):
+        values = ', '.join(
+            legacy_format_value(value, col_type)
+            for value, col_type in zip(row, column_types)
+        )
+        return f"({values})"
+    return format_row
+
+
+def time_formatter(format_row, rows, repeat):
+    """Best-of-repeat time to write all rows through an InsertWriter"""
+    header = f"INSERT IGNORE INTO `{BENCH_TABLE}` ({', '.join(name for name, _ in BENCH_COLUMNS)}) VALUES\n"
+    best = None
+    for _ in range(repeat):
+        sink = CountingSink()
+        writer = export.InsertWriter(sink, header)
+        started = time.perf_counter()
+        for row in rows:
+            writer.write_row(format_row(row))
+        writer.close()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, sink.bytes)
+    return best
+
+
+def report(label, rows, elapsed, size):
+    rows_per_sec = rows / elapsed
+    print(f"  {label:<28} {rows_per_sec:>12,.0f} rows/s {size / elapsed / 1e6:>9.1f} MB/s  ({elapsed:.2f}s)")
+    return rows_per_sec
+
+
+def benchmark_in_memory(row_count, repeat):
+    column_types = [col_type for _, col_type in BENCH_COLUMNS]
+    print(f"Generating {row_count:,} synthetic rows x {len(BENCH_COLUMNS)} columns...")
+    rows = synthetic_rows(row_count)
+
+    legacy = legacy_row_formatter(column_types)
+    compiled = export.compile_row_formatter(column_types)
+    for row in rows[:5000]:
+        if legacy(row) != compiled(row):
+            print(f"[ERROR] Compiled formatter output differs for row {row[0]}:")
+            print(f"  legacy:   {legacy(row)[:200]}")
+            print(f"  compiled: {compiled(row)[:200]}")
+            sys.exit(1)
+    print("[OK] Compiled formatter output matches the per-value formatter\n")
+
+    legacy_rate = report('per-value formatter', row_count, *time_formatter(legacy, rows, repeat))
+    compiled_rate = report('compiled formatter', row_count, *time_formatter(compiled, rows, repeat))
+    print(f"\n  Speedup: {compiled_rate / legacy_rate:.2f}x")
+    return compiled_rate
+
+
+def benchmark_postgres(row_count, repeat, keep):
+    """Create and fill bench_wide server-side, then time export_table against it"""
+    conn = export.connect_to_supabase()
+    cursor = conn.cursor()
+    column_sql = {
+        'bigint': 'g',
+        'integer': "CASE WHEN random() > 0.2 THEN (random() * 2000000 - 1000000)::int END",
+        'numeric': "CASE WHEN random() > 0.2 THEN round((random() * 100000)::numeric, 2) END",
+        'boolean': "CASE WHEN random() > 0.2 THEN random() > 0.5 END",
+        'timestamp with time zone': "CASE WHEN random() > 0.2 THEN timestamptz '2024-01-01 UTC' + random() * interval '1000 days' END",
+        'character varying': "CASE WHEN random() > 0.2 THEN 'Guest ' || g || E' O\\'Brien back\\\\slash 王小明' END",
+        'text': "CASE WHEN random() > 0.2 THEN repeat(E'rsvp O\\'Brien \\\\ line\\nbreak ', 10) END",
+    }
+    try:
+        print(f"Creating {BENCH_TABLE} with {row_count:,} rows...")
+        cursor.execute(f'DROP TABLE IF EXISTS "{BENCH_TABLE}"')
+        cursor.execute(f'CREATE TABLE "{BENCH_TABLE}" ('
+                       + ', '.join(f'"{name}" {col_type}' for name, col_type in BENCH_COLUMNS)
+                       + ', PRIMARY KEY (id))')
+        cursor.execute(f'INSERT INTO "{BENCH_TABLE}" SELECT '
+                       + ', '.join(column_sql[col_type] for _, col_type in BENCH_COLUMNS)
+                       + ' FROM generate_series(1, %s) AS g', (row_count,))
+        conn.commit()
+        print()
+
+        best = None
+        for _ in range(repeat):
+            sink = CountingSink()
+            started = time.perf_counter()
+            export.export_table(conn, sink, BENCH_TABLE)
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best[0]:
+                best = (elapsed, sink.bytes)
+        print()
+        return report('export_table (PostgreSQL)', row_count, *best)
+    finally:
+        if not keep:
+            conn.rollback()
+            cursor.execute(f'DROP TABLE IF EXISTS "{BENCH_TABLE}"')
+            conn.commit()
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the export row formatting on a synthetic wide table')
+    parser.add_argument('--rows', type=int, default=200000, help='Rows in the synthetic table (default: 200000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best is reported (default: 3)')
+    parser.add_argument('--postgres', action='store_true',
+                        help='Benchmark export_table against a bench_wide table in the SUPABASE_DB_* database')
+    parser.add_argument('--keep', action='store_true', help=f'With --postgres, keep the {BENCH_TABLE} table afterwards')
+    parser.add_argument('--min-rows-per-sec', type=float,
+                        help='Exit with status 1 if the compiled/export rate is below this')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Export Benchmark")
+    print("=" * 60)
+    print()
+
+    if args.postgres:
+        rate = benchmark_postgres(args.rows, args.repeat, args.keep)
+    else:
+        rate = benchmark_in_memory(args.rows, args.repeat)
+
+    if args.min_rows_per_sec and rate < args.min_rows_per_sec:
+        print(f"\n[ERROR] {rate:,.0f} rows/s is below the required {args.min_rows_per_sec:,.0f} rows/s")
+        sys.exit(1)
+    print()
+
+
+if __name__ == '__main__':
+    main()
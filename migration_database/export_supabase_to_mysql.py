@@ -6,7 +6,35 @@ This script connects to Supabase PostgreSQL database and exports data
 to MySQL-compatible SQL INSERT statements.
 
 Usage:
-    python export_supabase_to_mysql.py
+    python export_supabase_to_mysql.py [--output FILE] [--compress gzip|zstd]
+                                       [--max-statement-bytes N] [--fast-import]
+
+    python export_supabase_to_mysql.py --format copy [--output-dir DIR]
+    python export_supabase_to_mysql.py --jobs 4 [--tables rsvps,photos] [--exclude seats]
+    python export_supabase_to_mysql.py --since-state export_state.json
+    python export_supabase_to_mysql.py --direct [--truncate]
+
+Rows are streamed through a server-side cursor and written straight to the
+output file, so memory use does not grow with table size. INSERT statements
+are split so none exceeds --max-statement-bytes (keep it below MySQL's
+max_allowed_packet).
+
+--format copy pulls each table with PostgreSQL COPY (type conversions done
+once per column in SQL) and writes one CSV file per table plus a
+load_data.sql script for MySQL's LOAD DATA LOCAL INFILE bulk loader.
+
+Tables are discovered from information_schema, ordered by foreign-key
+dependency and exported by --jobs worker processes, each on its own
+connection but all inside one pg_export_snapshot() snapshot, so the result
+is a consistent point-in-time copy.
+
+--since-state keeps per-table high-water marks (max id / updated_at) in a
+JSON file; later runs export only new or changed rows as
+INSERT ... ON DUPLICATE KEY UPDATE.
+
+--direct streams rows straight into MySQL (MYSQL_DB_* settings) with batched
+executemany, reading and writing on separate threads, then verifies each
+table's row count and content checksum on both sides.
 
 Requirements:
     pip install psycopg2-binary python-dotenv
@@ -14,11 +42,36 @@ Requirements:
 
 import os
 import sys
+import io
+import json
+import gzip
+import queue
+import shutil
+import hashlib
+import threading
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
+from datetime import datetime, date, timezone
+from decimal import Decimal
 from dotenv import load_dotenv
 
+try:
+    import zstandard
+except ImportError:  # optional, only needed for --compress zstd
+    zstandard = None
+
+try:
+    import mysql.connector
+except ImportError:  # optional, only needed for --direct
+    mysql = None
+
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
     import codecs
@@ -35,9 +88,105 @@ SUPABASE_DB = os.getenv('SUPABASE_DB_NAME', 'postgres')
 SUPABASE_USER = os.getenv('SUPABASE_DB_USER', 'postgres')
 SUPABASE_PASSWORD = os.getenv('SUPABASE_DB_PASSWORD', '')
 
+# MySQL connection settings (only used by --direct)
+MYSQL_HOST = os.getenv('MYSQL_DB_HOST', 'localhost')
+MYSQL_PORT = int(os.getenv('MYSQL_DB_PORT', '3306'))
+MYSQL_USER = os.getenv('MYSQL_DB_USER', 'root')
+MYSQL_PASSWORD = os.getenv('MYSQL_DB_PASSWORD', '')
+
 # Output file
 OUTPUT_FILE = 'supabase_export.sql'
-MYSQL_DB_NAME = 'wedding_rsvp'
+MYSQL_DB_NAME = os.getenv('MYSQL_DB_NAME', 'wedding_rsvp')
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 2000
+
+# Upper bound for one INSERT statement (MySQL 5.7 default max_allowed_packet is 4MB)
+MAX_STATEMENT_BYTES = 1024 * 1024
+
+# With --fast-import, COMMIT after this many INSERT statements
+COMMIT_EVERY = 50
+
+# Default output directory for --format copy
+COPY_OUTPUT_DIR = 'supabase_export'
+LOAD_SCRIPT_FILE = 'load_data.sql'
+
+# PostgreSQL types that MySQL expects as 'YYYY-MM-DD HH:MM:SS'
+TIMESTAMP_TYPES = ('timestamp', 'timestamp without time zone', 'timestamp with time zone')
+
+# Type groups used to pick each column's formatter (see compile_row_formatter)
+BOOLEAN_TYPES = ('boolean', 'bool')
+NUMERIC_TYPES = ('integer', 'bigint', 'smallint', 'numeric', 'decimal', 'real', 'double precision')
+TEXT_TYPES = ('text', 'character varying', 'character', 'uuid')
+
+# Parallel export connections (each exports whole tables)
+EXPORT_JOBS = 4
+
+# --direct: rows per executemany batch, and batches buffered between threads
+DIRECT_BATCH_SIZE = 1000
+DIRECT_QUEUE_BATCHES = 4
+
+# Delta exports re-send rows this close to the previous high-water mark, to
+# catch transactions that were still in flight when the last snapshot was taken
+# (ON DUPLICATE KEY UPDATE makes re-sent rows harmless)
+WATERMARK_ID_OVERLAP = 1000
+WATERMARK_TIME_OVERLAP = '5 minutes'
+
+# Supabase table -> MySQL table, for tables whose names differ
+TABLE_NAME_MAP = {}
+
+# Profiling reports go next to the media scripts' ones, in <repository>/profiles
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = REPO_ROOT / 'profiles'
+
+# File suffix per --compress choice
+COMPRESS_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def add_profile_arguments(parser):
+    """
+    Copy of add_profile_arguments in api/scripts/media_tools/profiling.py.
+    Parsing happens before we know whether profiling is wanted, and the
+    export must run without the api/ tree next to it, so the options are
+    repeated here instead of imported. Keep the two identical;
+    api/scripts/tests/test_profile_arguments.py checks that they are.
+    """
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help='Record a cProfile of the run (written to profiles/<script>-<timestamp>/)')
+    group.add_argument('--trace-malloc', action='store_true',
+                       help='Record the top allocating lines with tracemalloc (slows the run down)')
+    group.add_argument('--profile-interval', type=float, default=0, metavar='MS',
+                       help='Also sample all thread stacks and RSS/CPU every MS milliseconds')
+    group.add_argument('--profile-dir', type=Path, default=PROFILE_DIR,
+                       help=f'Where to create the timestamped profile folder (default: {PROFILE_DIR})')
+    return parser
+
+
+class NoProfiling:
+    """Stand-in session when no profiling option is given; .stats is simply dropped"""
+
+    def __init__(self):
+        self.stats = {}
+
+
+def start_profiling(args, name):
+    """
+    Start the shared profiling hooks from api/scripts/media_tools. They are
+    only imported when a profiling option is given, so the export does not
+    need the API tree next to it otherwise.
+    """
+    if not (args.profile or args.trace_malloc or args.profile_interval > 0):
+        return NoProfiling()
+    scripts_dir = str(REPO_ROOT / 'api' / 'scripts')
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    try:
+        from media_tools import profiling
+    except ImportError as e:
+        print(f"[ERROR] Profiling needs api/scripts/media_tools from the repository ({e})")
+        sys.exit(1)
+    return profiling.start_profiling(args, name)
 
 
 def escape_sql_string(value):
@@ -68,14 +217,63 @@ def format_value_for_mysql(value, column_type):
     
     # Handle timestamp types
     if column_type in ('timestamp', 'timestamp without time zone', 'timestamp with time zone', 'date', 'time'):
-        if isinstance(value, datetime):
-            return f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'"
-        return escape_sql_string(value)
+        return format_timestamp(value)
     
     # Handle string types (default)
     return escape_sql_string(value)
 
 
+def format_text(value):
+    """Quote a string value, escaping only when it contains a quote or backslash"""
+    value = str(value)
+    if '\\' in value or "'" in value:
+        value = value.replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{value}'"
+
+
+def format_bool(value):
+    return '1' if value else '0'
+
+
+def format_timestamp(value):
+    if isinstance(value, datetime):
+        # isoformat is several times faster than strftime; [:19] drops any UTC offset
+        return f"'{value.isoformat(' ', 'seconds')[:19]}'"
+    return escape_sql_string(value)
+
+
+def column_formatter(column_type):
+    """Formatter for non-NULL values of one column, chosen once from its type"""
+    if column_type in BOOLEAN_TYPES:
+        return format_bool
+    if column_type in NUMERIC_TYPES:
+        return str
+    if column_type in TIMESTAMP_TYPES or column_type in ('date', 'time'):
+        return format_timestamp
+    if column_type in TEXT_TYPES:
+        return format_text
+    return escape_sql_string
+
+
+def compile_row_formatter(column_types):
+    """
+    Build a function turning one row tuple into its "(v1, v2, ...)" VALUES text.
+
+    The per-column formatters are looked up once per table instead of
+    dispatching on the type string for every value; output is identical to
+    calling format_value_for_mysql on each value.
+    """
+    formatters = tuple(column_formatter(column_type) for column_type in column_types)
+    
+    def format_row(row):
+        return '(' + ', '.join([
+            'NULL' if value is None else formatter(value)
+            for formatter, value in zip(formatters, row)
+        ]) + ')'
+    
+    return format_row
+
+
 def get_table_columns(cursor, table_name):
     """Get column information for a table"""
     query = """
@@ -93,76 +291,504 @@ def get_table_columns(cursor, table_name):
     return cursor.fetchall()
 
 
-def export_table(cursor, table_name, mysql_table_name=None):
-    """Export a table's data to MySQL INSERT statements"""
+def open_output(path, compress=None):
+    """Open the export file for writing text, optionally as a gzip or zstd stream"""
+    if compress == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if compress == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd output needs the zstandard package: pip install zstandard')
+        raw = open(path, 'wb')
+        return io.TextIOWrapper(zstandard.ZstdCompressor(level=10).stream_writer(raw), encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def compress_text(text, compress=None):
+    """
+    text as one complete gzip member / zstd frame (or plain UTF-8). Members
+    and frames can simply be concatenated: gunzip and zstd -d read them as
+    one stream.
+    """
+    data = text.encode('utf-8')
+    if compress == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compress == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return data
+
+
+class InsertWriter:
+    """
+    Writes rows as a sequence of INSERT statements, starting a new statement
+    whenever the next row would push the current one past max_bytes, and
+    optionally emitting COMMIT every commit_every statements.
+    """
+
+    def __init__(self, out, header, max_bytes=MAX_STATEMENT_BYTES, commit_every=0, footer=''):
+        self.out = out
+        self.header = header
+        self.footer = footer
+        self.header_bytes = len(header.encode('utf-8')) + len(footer.encode('utf-8'))
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self.statement_bytes = 0
+        self.statements = 0
+        self.oversized = 0
+
+    def write_row(self, values_sql):
+        row_bytes = len(values_sql) if values_sql.isascii() else len(values_sql.encode('utf-8'))
+        # 2 bytes for the ",\n" separator, 1 for the closing ";"
+        if self.statement_bytes and self.statement_bytes + row_bytes + 3 > self.max_bytes:
+            self.end_statement()
+        if self.statement_bytes == 0:
+            if self.header_bytes + row_bytes + 1 > self.max_bytes:
+                self.oversized += 1
+            self.out.write(self.header)
+            self.out.write(values_sql)
+            self.statement_bytes = self.header_bytes + row_bytes
+        else:
+            self.out.write(',\n')
+            self.out.write(values_sql)
+            self.statement_bytes += row_bytes + 2
+
+    def end_statement(self):
+        if self.statement_bytes == 0:
+            return
+        self.out.write(self.footer)
+        self.out.write(';\n')
+        self.statement_bytes = 0
+        self.statements += 1
+        if self.commit_every and self.statements % self.commit_every == 0:
+            self.out.write('COMMIT;\n')
+
+    def close(self):
+        self.end_statement()
+
+
+def read_watermark(conn, table_name, column_names):
+    """Current high-water marks of a table: max id and max updated_at (if present)"""
+    marks = [f'max("{name}")' for name in ('id', 'updated_at') if name in column_names]
+    if not marks:
+        return {}
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f'SELECT {", ".join(marks)} FROM "{table_name}"')
+        values = cursor.fetchone()
+    finally:
+        cursor.close()
+    watermark = {}
+    for name, value in zip([n for n in ('id', 'updated_at') if n in column_names], values):
+        if value is not None:
+            watermark[name] = value.isoformat() if isinstance(value, datetime) else value
+    return watermark
+
+
+def delta_filter(column_names, since):
+    """
+    WHERE clause selecting rows newer than a previous watermark.
+
+    Returns (sql, params); (None, ()) means the whole table must be exported.
+    """
+    conditions = []
+    params = []
+    if 'id' in column_names and 'id' in since:
+        conditions.append('"id" > %s')
+        params.append(since['id'] - WATERMARK_ID_OVERLAP)
+    if 'updated_at' in column_names and 'updated_at' in since:
+        conditions.append(f'"updated_at" > %s::timestamptz - interval \'{WATERMARK_TIME_OVERLAP}\'')
+        params.append(since['updated_at'])
+    if not conditions:
+        return None, ()
+    return ' OR '.join(conditions), tuple(params)
+
+
+def export_table(conn, out, table_name, mysql_table_name=None,
+                 max_statement_bytes=MAX_STATEMENT_BYTES, commit_every=0, since=None):
+    """
+    Stream a table's data to `out` as MySQL INSERT statements.
+
+    Rows are read through a named (server-side) cursor with fetchmany and
+    written as they arrive, so only FETCH_SIZE rows are in memory at a time.
+    Statements are capped at max_statement_bytes. With `since` (a watermark
+    dict from a previous run, possibly empty) only newer rows are exported,
+    as INSERT ... ON DUPLICATE KEY UPDATE. Returns the number of rows exported.
+    """
     if mysql_table_name is None:
         mysql_table_name = table_name
     
     print(f"Exporting table: {table_name} -> {mysql_table_name}")
     
     # Get column information
-    columns = get_table_columns(cursor, table_name)
+    meta_cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        columns = get_table_columns(meta_cursor, table_name)
+    finally:
+        meta_cursor.close()
     if not columns:
         print(f"  Warning: Table {table_name} not found or has no columns")
-        return []
+        return 0
     
     column_names = [col['column_name'] for col in columns]
-    column_types = {col['column_name']: col['data_type'] for col in columns}
+    format_row = compile_row_formatter([col['data_type'] for col in columns])
+    
+    select_list = ', '.join(f'"{name}"' for name in column_names)
+    query = f'SELECT {select_list} FROM "{table_name}"'
+    params = ()
+    if since is not None:
+        where, params = delta_filter(column_names, since)
+        if where:
+            query += f' WHERE {where}'
+        elif since:
+            print(f"  [!] {table_name} has no id/updated_at column; exporting all rows")
+    if 'id' in column_names:
+        query += ' ORDER BY id'
     
-    # Fetch all data
-    query = f'SELECT * FROM "{table_name}" ORDER BY id'
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    if since is None:
+        # Use INSERT IGNORE to handle duplicates
+        writer = InsertWriter(
+            out,
+            f"INSERT IGNORE INTO `{mysql_table_name}` ({', '.join(column_names)}) VALUES\n",
+            max_bytes=max_statement_bytes,
+            commit_every=commit_every
+        )
+    else:
+        # Delta rows may already exist in MySQL: update them in place
+        updates = ', '.join(f'`{name}` = VALUES(`{name}`)' for name in column_names if name != 'id')
+        writer = InsertWriter(
+            out,
+            f"INSERT INTO `{mysql_table_name}` ({', '.join(column_names)}) VALUES\n",
+            max_bytes=max_statement_bytes,
+            commit_every=commit_every,
+            footer=f"\nON DUPLICATE KEY UPDATE {updates or '`id` = `id`'}"
+        )
     
-    if not rows:
+    row_count = 0
+    cursor = conn.cursor(name=f'export_{table_name}')
+    try:
+        cursor.itersize = FETCH_SIZE
+        cursor.execute(query, params)
+        
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            
+            if row_count == 0:
+                out.write(f"\n-- Export from {table_name}\n")
+                out.write(f"-- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            
+            for row in rows:
+                writer.write_row(format_row(row))
+            row_count += len(rows)
+    finally:
+        writer.close()
+        if row_count:
+            out.write(f"-- {row_count} rows from {table_name} in {writer.statements} statements\n")
+        cursor.close()
+    
+    if row_count == 0:
         print(f"  No data found in {table_name}")
-        return []
+    else:
+        print(f"  Exported {row_count} rows ({writer.statements} INSERT statements)")
+    if writer.oversized:
+        print(f"  [!] {writer.oversized} rows alone exceed {max_statement_bytes} bytes; "
+              f"raise max_allowed_packet on the MySQL server accordingly")
+    return row_count
+
+
+def column_select_expr(column_name, column_type):
+    """
+    SQL expression that converts a column to the text MySQL expects.
+
+    The conversion runs inside PostgreSQL once per column definition instead
+    of once per value in Python.
+    """
+    quoted = f'"{column_name}"'
+    if column_type in ('boolean', 'bool'):
+        return f'{quoted}::int'
+    if column_type in TIMESTAMP_TYPES:
+        return f"to_char({quoted}, 'YYYY-MM-DD HH24:MI:SS')"
+    return quoted
+
+
+def copy_table(conn, output_dir, table_name, mysql_table_name=None):
+    """
+    Export a table with COPY ... TO STDOUT (FORMAT csv) into <output_dir>/<table>.csv.
+
+    Non-NULL values are always quoted and NULL is written as a bare NULL,
+    which is exactly how LOAD DATA with OPTIONALLY ENCLOSED BY '"' and an
+    empty escape character reads them. Returns (filename, column_names,
+    row_count), or None if the table does not exist.
+    """
+    if mysql_table_name is None:
+        mysql_table_name = table_name
+    
+    print(f"Copying table: {table_name} -> {mysql_table_name}")
+    
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        columns = get_table_columns(cursor, table_name)
+        if not columns:
+            print(f"  Warning: Table {table_name} not found or has no columns")
+            return None
+        
+        column_names = [col['column_name'] for col in columns]
+        select_list = ', '.join(column_select_expr(col['column_name'], col['data_type']) for col in columns)
+        query = f'SELECT {select_list} FROM "{table_name}"'
+        if 'id' in column_names:
+            query += ' ORDER BY id'
+        
+        filename = f'{mysql_table_name}.csv'
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            cursor.copy_expert(
+                f"COPY ({query}) TO STDOUT WITH (FORMAT csv, NULL 'NULL', FORCE_QUOTE *, ENCODING 'UTF8')",
+                f
+            )
+        row_count = cursor.rowcount
+    finally:
+        cursor.close()
+    
+    print(f"  Copied {row_count} rows to {filename}")
+    return filename, column_names, row_count
+
+
+def write_load_script(output_dir, loaded_tables):
+    """Write the LOAD DATA LOCAL INFILE script for the copied CSV files"""
+    path = os.path.join(output_dir, LOAD_SCRIPT_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("-- MySQL bulk load of a Supabase COPY export\n")
+        f.write(f"-- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"-- Run from this directory: mysql --local-infile=1 -u username -p {MYSQL_DB_NAME} < {LOAD_SCRIPT_FILE}\n\n")
+        f.write(f"USE `{MYSQL_DB_NAME}`;\n\n")
+        f.write("SET FOREIGN_KEY_CHECKS = 0;\n")
+        f.write("SET unique_checks = 0;\n")
+        f.write("SET SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO';\n")
+        f.write("SET time_zone = '+00:00';\n\n")
+        for mysql_table, filename, column_names, row_count in loaded_tables:
+            f.write(f"-- {mysql_table}: {row_count} rows\n")
+            f.write(f"LOAD DATA LOCAL INFILE '{filename}'\n")
+            f.write(f"IGNORE INTO TABLE `{mysql_table}`\n")
+            f.write("CHARACTER SET utf8mb4\n")
+            f.write("FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY ''\n")
+            f.write("LINES TERMINATED BY '\\n'\n")
+            f.write(f"({', '.join(f'`{name}`' for name in column_names)});\n\n")
+        f.write("SET unique_checks = 1;\n")
+        f.write("SET FOREIGN_KEY_CHECKS = 1;\n")
+    return path
+
+
+def connect_to_mysql(quiet=False):
+    """Connect to the target MySQL database (for --direct)"""
+    conn = mysql.connector.connect(
+        host=MYSQL_HOST,
+        port=MYSQL_PORT,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DB_NAME,
+        charset='utf8mb4',
+        collation='utf8mb4_unicode_ci',
+        autocommit=False
+    )
+    cursor = conn.cursor()
+    cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0, UNIQUE_CHECKS = 0, "
+                   "time_zone = '+00:00', SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO'")
+    cursor.close()
+    if not quiet:
+        print(f"[OK] Connected to MySQL {MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB_NAME}\n")
+    return conn
+
+
+def to_mysql_param(value):
+    """Convert a psycopg2 value to a mysql.connector parameter"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return value
+
+
+def canonical_value(value):
+    """
+    Driver-independent text form of a value, for checksums.
+
+    Both sides reduce to what MySQL stores: booleans as 0/1, timestamps to
+    whole seconds, decimals without trailing zeros.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value.normalize(), 'f')
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+def row_digest(row):
+    """64-bit digest of one row; table checksums add these up (order independent)"""
+    canonical = '\x1f'.join(canonical_value(value) for value in row)
+    return int.from_bytes(hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def mysql_table_checksum(mysql_conn, mysql_table_name, column_names):
+    """Row count and checksum of the given columns of a MySQL table"""
+    cursor = mysql_conn.cursor(raw=False, buffered=False)
+    try:
+        cursor.execute(f"SELECT {', '.join(f'`{name}`' for name in column_names)} FROM `{mysql_table_name}`")
+        count = 0
+        checksum = 0
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                count += 1
+                checksum = (checksum + row_digest(row)) & 0xFFFFFFFFFFFFFFFF
+        return count, checksum
+    finally:
+        cursor.close()
+
+
+def load_table_direct(conn, table_name, mysql_table_name=None, truncate=False):
+    """
+    Stream one table from PostgreSQL into MySQL and verify it.
+
+    A reader thread fetches from a server-side cursor, converts rows and
+    computes the source checksum; the calling thread inserts batches with
+    executemany (which mysql.connector sends as multi-row INSERTs). Afterwards
+    the MySQL table is read back and its row count and checksum compared.
+    """
+    if mysql_table_name is None:
+        mysql_table_name = table_name
     
-    # Generate INSERT statements
-    insert_statements = []
-    insert_statements.append(f"\n-- Export from {table_name} ({len(rows)} rows)")
-    insert_statements.append(f"-- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    print(f"Loading table: {table_name} -> {mysql_table_name}")
     
-    # Use INSERT IGNORE to handle duplicates
-    columns_str = ', '.join(column_names)
-    insert_statements.append(f"INSERT IGNORE INTO `{mysql_table_name}` ({columns_str}) VALUES")
+    meta_cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        columns = get_table_columns(meta_cursor, table_name)
+    finally:
+        meta_cursor.close()
+    if not columns:
+        raise ValueError(f'Table {table_name} not found or has no columns')
+    column_names = [col['column_name'] for col in columns]
     
-    values_list = []
-    for row in rows:
-        values = []
-        for col_name in column_names:
-            value = row[col_name]
-            col_type = column_types.get(col_name, 'text')
-            formatted_value = format_value_for_mysql(value, col_type)
-            values.append(formatted_value)
-        values_list.append(f"({', '.join(values)})")
+    select_list = ', '.join(f'"{name}"' for name in column_names)
+    query = f'SELECT {select_list} FROM "{table_name}"'
+    if 'id' in column_names:
+        query += ' ORDER BY id'
     
-    # Combine all values
-    insert_statements.append(',\n'.join(values_list))
-    insert_statements.append(';\n')
+    batches = queue.Queue(maxsize=DIRECT_QUEUE_BATCHES)
+    stop = threading.Event()
+    source = {'rows': 0, 'checksum': 0, 'error': None}
     
-    print(f"  Exported {len(rows)} rows")
-    return insert_statements
+    def read_rows():
+        cursor = conn.cursor(name=f'direct_{table_name}')
+        try:
+            cursor.itersize = DIRECT_BATCH_SIZE
+            cursor.execute(query)
+            while not stop.is_set():
+                rows = cursor.fetchmany(DIRECT_BATCH_SIZE)
+                if not rows:
+                    break
+                checksum = source['checksum']
+                for row in rows:
+                    checksum = (checksum + row_digest(row)) & 0xFFFFFFFFFFFFFFFF
+                source['checksum'] = checksum
+                source['rows'] += len(rows)
+                batches.put([tuple(to_mysql_param(value) for value in row) for row in rows])
+        except Exception as e:
+            source['error'] = e
+        finally:
+            cursor.close()
+            batches.put(None)
+    
+    mysql_conn = connect_to_mysql(quiet=True)
+    try:
+        write_cursor = mysql_conn.cursor()
+        if truncate:
+            write_cursor.execute(f'TRUNCATE TABLE `{mysql_table_name}`')
+        insert_sql = (f"INSERT IGNORE INTO `{mysql_table_name}` ({', '.join(f'`{name}`' for name in column_names)}) "
+                      f"VALUES ({', '.join(['%s'] * len(column_names))})")
+        
+        reader = threading.Thread(target=read_rows, name=f'read-{table_name}', daemon=True)
+        reader.start()
+        written = 0
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                write_cursor.executemany(insert_sql, batch)
+                mysql_conn.commit()
+                written += len(batch)
+        finally:
+            # Stop the reader if the writer failed, draining so it never blocks on a full queue
+            stop.set()
+            while reader.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader.join()
+            write_cursor.close()
+        
+        if source['error'] is not None:
+            raise source['error']
+        
+        target_rows, target_checksum = mysql_table_checksum(mysql_conn, mysql_table_name, column_names)
+    finally:
+        mysql_conn.close()
+    
+    result = {
+        'rows': source['rows'],
+        'target_rows': target_rows,
+        'checksum': f"{source['checksum']:016x}",
+        'target_checksum': f'{target_checksum:016x}',
+    }
+    result['verified'] = (result['rows'] == target_rows and result['checksum'] == result['target_checksum'])
+    print(f"  Loaded {written} rows; postgres {result['rows']} rows/{result['checksum']}, "
+          f"mysql {target_rows} rows/{result['target_checksum']} "
+          f"{'[OK]' if result['verified'] else '[MISMATCH]'}")
+    return result
 
 
-def connect_to_supabase(password=None):
+def connect_to_supabase(password=None, quiet=False):
     """Connect to Supabase PostgreSQL database"""
     if password is None:
         password = SUPABASE_PASSWORD
     try:
-        print("Connecting to Supabase...")
-        print(f"  Host: {SUPABASE_HOST}")
-        print(f"  Database: {SUPABASE_DB}")
-        print(f"  User: {SUPABASE_USER}")
+        if not quiet:
+            print("Connecting to Supabase...")
+            print(f"  Host: {SUPABASE_HOST}")
+            print(f"  Database: {SUPABASE_DB}")
+            print(f"  User: {SUPABASE_USER}")
         
+        # Session in UTC so timestamps match the export's time_zone '+00:00'
         conn = psycopg2.connect(
             host=SUPABASE_HOST,
             port=SUPABASE_PORT,
             database=SUPABASE_DB,
             user=SUPABASE_USER,
-            password=password
+            password=password,
+            options='-c timezone=UTC'
         )
-        print("[OK] Connected successfully!\n")
+        if not quiet:
+            print("[OK] Connected successfully!\n")
         return conn
     except psycopg2.Error as e:
         print(f"[ERROR] Connection failed: {e}")
@@ -173,8 +799,307 @@ def connect_to_supabase(password=None):
         sys.exit(1)
 
 
+def begin_snapshot(conn):
+    """
+    Start a read-only REPEATABLE READ transaction and export its snapshot.
+
+    Worker connections import the returned snapshot id, so every table is
+    read as of the same instant. The transaction must stay open until all
+    workers have joined it.
+    """
+    conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT pg_export_snapshot()')
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def join_snapshot(conn, snapshot):
+    """Make a fresh connection read from an exported snapshot"""
+    conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SET TRANSACTION SNAPSHOT %s', (snapshot,))
+    finally:
+        cursor.close()
+
+
+def order_by_dependencies(tables, dependencies):
+    """
+    Topologically sort tables so referenced tables come before the tables
+    that reference them (ties broken by name). Tables in a cycle are
+    appended at the end; the import runs with FOREIGN_KEY_CHECKS = 0 anyway.
+    """
+    remaining = {table: {dep for dep in dependencies.get(table, ()) if dep in tables and dep != table}
+                 for table in tables}
+    ordered = []
+    while remaining:
+        ready = sorted(table for table, deps in remaining.items() if not deps)
+        if not ready:
+            cyclic = sorted(remaining)
+            print(f"  [!] Foreign key cycle between: {', '.join(cyclic)}")
+            ordered.extend(cyclic)
+            break
+        for table in ready:
+            ordered.append(table)
+            del remaining[table]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return ordered
+
+
+def discover_tables(conn, include=None, exclude=()):
+    """
+    List the public base tables, ordered by foreign-key dependency.
+
+    Returns [(supabase_table, mysql_table), ...].
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_schema = 'public'
+            AND table_type = 'BASE TABLE'
+        """)
+        tables = {row[0] for row in cursor.fetchall()}
+        
+        cursor.execute("""
+            SELECT DISTINCT tc.table_name, ccu.table_name
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.constraint_column_usage ccu
+                ON ccu.constraint_schema = tc.constraint_schema
+                AND ccu.constraint_name = tc.constraint_name
+            WHERE tc.table_schema = 'public'
+            AND tc.constraint_type = 'FOREIGN KEY'
+        """)
+        dependencies = {}
+        for table, referenced in cursor.fetchall():
+            dependencies.setdefault(table, set()).add(referenced)
+    finally:
+        cursor.close()
+    
+    if include:
+        missing = sorted(set(include) - tables)
+        if missing:
+            print(f"  [!] Tables not found in Supabase: {', '.join(missing)}")
+        tables &= set(include)
+    tables -= set(exclude)
+    
+    return [(table, TABLE_NAME_MAP.get(table, table)) for table in order_by_dependencies(tables, dependencies)]
+
+
+def run_job(conn, job):
+    """
+    Export one table according to a job description (see export_tables).
+
+    SQL jobs return {'rows': n, 'watermark': {...}}; the watermark is read in
+    the same snapshot as the rows, so the next delta run starts exactly here.
+    """
+    if job['format'] == 'copy':
+        return copy_table(conn, job['output_dir'], job['table'], job['mysql_table'])
+    if job['format'] == 'direct':
+        return load_table_direct(conn, job['table'], job['mysql_table'], truncate=job['truncate'])
+    
+    since = None
+    if job.get('state') is not None:
+        since = job['state'].get(job['table'], {})
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        column_names = [col['column_name'] for col in get_table_columns(cursor, job['table'])]
+    finally:
+        cursor.close()
+    watermark = read_watermark(conn, job['table'], column_names)
+    
+    # Parts are compressed like the final file, which is then just their concatenation
+    with open_output(job['part_path'], compress=job.get('compress')) as out:
+        rows = export_table(conn, out, job['table'], job['mysql_table'],
+                            max_statement_bytes=job['max_statement_bytes'],
+                            commit_every=job['commit_every'],
+                            since=since)
+    return {'rows': rows, 'watermark': watermark}
+
+
+def load_state(path):
+    """Load per-table watermarks saved by a previous --since-state run"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('tables', {})
+
+
+def save_state(path, tables_state, snapshot):
+    """Atomically write per-table watermarks for the next --since-state run"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'exported_at': datetime.now().isoformat(timespec='seconds'),
+            'snapshot': snapshot,
+            'tables': tables_state,
+        }, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def export_worker(job):
+    """Worker process entry point: own connection, shared snapshot"""
+    conn = connect_to_supabase(job['password'], quiet=True)
+    try:
+        join_snapshot(conn, job['snapshot'])
+        return run_job(conn, job)
+    finally:
+        conn.close()
+
+
+def export_tables(conn, password, snapshot, tables, job_options, jobs=EXPORT_JOBS):
+    """
+    Export every table, in parallel when jobs > 1.
+
+    With one job, tables are exported on the coordinator connection (each in a
+    savepoint, so a failing table does not abort the snapshot transaction).
+    Returns {supabase_table: result or Exception}.
+    """
+    job_list = []
+    for index, (supabase_table, mysql_table) in enumerate(tables):
+        job = dict(job_options, table=supabase_table, mysql_table=mysql_table,
+                   password=password, snapshot=snapshot)
+        if job['format'] == 'sql':
+            job['part_path'] = os.path.join(job['parts_dir'], f'{index:04d}_{mysql_table}.sql'
+                                            + COMPRESS_SUFFIXES.get(job.get('compress'), ''))
+        job_list.append(job)
+    
+    results = {}
+    if jobs <= 1:
+        cursor = conn.cursor()
+        try:
+            for job in job_list:
+                cursor.execute('SAVEPOINT export_table')
+                try:
+                    results[job['table']] = run_job(conn, job)
+                    cursor.execute('RELEASE SAVEPOINT export_table')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO SAVEPOINT export_table')
+                    results[job['table']] = e
+        finally:
+            cursor.close()
+        return results
+    
+    print(f"Exporting {len(job_list)} tables with {jobs} parallel connections (snapshot {snapshot})\n")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {job['table']: executor.submit(export_worker, job) for job in job_list}
+        for table, future in futures.items():
+            try:
+                results[table] = future.result()
+            except BaseException as e:
+                results[table] = e
+    return results
+
+
+def export_copy(conn, password, snapshot, tables, output_dir=None, jobs=EXPORT_JOBS):
+    """Run a --format copy export: one CSV per table plus the LOAD DATA script"""
+    output_dir = output_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), COPY_OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    results = export_tables(conn, password, snapshot, tables,
+                            {'format': 'copy', 'output_dir': output_dir}, jobs=jobs)
+    
+    loaded_tables = []
+    failed = False
+    for supabase_table, mysql_table in tables:
+        result = results[supabase_table]
+        if isinstance(result, BaseException):
+            print(f"  [ERROR] Error copying {supabase_table}: {result}")
+            failed = True
+        elif result:
+            filename, column_names, row_count = result
+            loaded_tables.append((mysql_table, filename, column_names, row_count))
+    
+    write_load_script(output_dir, loaded_tables)
+    
+    print()
+    print("=" * 60)
+    print(f"[{'WARNING' if failed else 'SUCCESS'}] COPY export finished{' with errors' if failed else ''}")
+    print(f"  Output directory: {output_dir}")
+    print(f"  Load script: {LOAD_SCRIPT_FILE}")
+    print("=" * 60)
+    print()
+    print("Next steps:")
+    print(f"  cd {output_dir}")
+    print(f"  mysql --local-infile=1 -u username -p {MYSQL_DB_NAME} < {LOAD_SCRIPT_FILE}")
+    return not failed
+
+
+def export_direct(conn, password, snapshot, tables, truncate=False, jobs=EXPORT_JOBS):
+    """Run a --direct load into MySQL and print the per-table verification"""
+    results = export_tables(conn, password, snapshot, tables,
+                            {'format': 'direct', 'truncate': truncate}, jobs=jobs)
+    
+    print()
+    print("=" * 60)
+    print(f"{'Table':<24}{'Postgres':>12}{'MySQL':>12}  Result")
+    ok = True
+    for supabase_table, mysql_table in tables:
+        result = results[supabase_table]
+        if isinstance(result, BaseException):
+            print(f"{supabase_table:<24}{'-':>12}{'-':>12}  ERROR: {result}")
+            ok = False
+            continue
+        status = 'OK' if result['verified'] else 'MISMATCH'
+        if not result['verified']:
+            ok = False
+            if result['rows'] == result['target_rows']:
+                status += ' (checksum)'
+        print(f"{supabase_table:<24}{result['rows']:>12}{result['target_rows']:>12}  {status}")
+    print("=" * 60)
+    if not ok:
+        print("[!] Verification failed. If the MySQL tables already held other rows, rerun with --truncate.")
+    return ok
+
+
 def main():
     """Main export function"""
+    parser = argparse.ArgumentParser(description='Export Supabase (PostgreSQL) data to a MySQL SQL file')
+    parser.add_argument('--format', choices=['sql', 'copy'], default='sql',
+                        help='sql: INSERT statements (default); copy: CSV files + LOAD DATA script')
+    parser.add_argument('--output', help=f'Output file (default: {OUTPUT_FILE} next to this script)')
+    parser.add_argument('--output-dir', help=f'Output directory for --format copy (default: {COPY_OUTPUT_DIR}/ next to this script)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], help='Compress the output (.sql.gz / .sql.zst)')
+    parser.add_argument('--gzip', action='store_const', const='gzip', dest='compress', help='Same as --compress gzip')
+    parser.add_argument('--max-statement-bytes', type=int, default=MAX_STATEMENT_BYTES,
+                        help=f'Maximum size of one INSERT statement (default: {MAX_STATEMENT_BYTES})')
+    parser.add_argument('--fast-import', action='store_true',
+                        help='Wrap the import in transactions with unique/foreign key checks disabled, '
+                             f'committing every --commit-every statements')
+    parser.add_argument('--commit-every', type=int, default=COMMIT_EVERY,
+                        help=f'Statements per transaction with --fast-import (default: {COMMIT_EVERY})')
+    parser.add_argument('--jobs', type=int, default=EXPORT_JOBS,
+                        help=f'Tables exported in parallel, one connection each (default: {EXPORT_JOBS})')
+    parser.add_argument('--tables', help='Comma-separated tables to export (default: all public tables)')
+    parser.add_argument('--exclude', default='', help='Comma-separated tables to skip')
+    parser.add_argument('--since-state', metavar='STATE_FILE',
+                        help='Incremental export: only rows newer than the watermarks in STATE_FILE '
+                             '(created on first run), written as INSERT ... ON DUPLICATE KEY UPDATE')
+    parser.add_argument('--direct', action='store_true',
+                        help='Load straight into MySQL (MYSQL_DB_* settings) and verify row counts and checksums')
+    parser.add_argument('--truncate', action='store_true', help='With --direct, empty each MySQL table before loading')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.since_state and args.format == 'copy':
+        print("[ERROR] --since-state works with --format sql only")
+        sys.exit(1)
+    if args.direct and (args.since_state or args.format == 'copy'):
+        print("[ERROR] --direct cannot be combined with --since-state or --format copy")
+        sys.exit(1)
+    if args.direct and mysql is None:
+        print("[ERROR] --direct needs mysql-connector-python: pip install mysql-connector-python")
+        sys.exit(1)
+    
+    if args.compress == 'zstd' and zstandard is None:
+        print("[ERROR] --compress zstd needs the zstandard package: pip install zstandard")
+        sys.exit(1)
+    
     print("=" * 60)
     print("Supabase to MySQL Export Script")
     print("=" * 60)
@@ -216,54 +1141,123 @@ def main():
     else:
         password = SUPABASE_PASSWORD
     
+    session = start_profiling(args, 'export_supabase_to_mysql')
+    if args.profile and args.jobs > 1:
+        print("[!] --profile only covers this process; use --jobs 1 to profile the table exports themselves\n")
+    
     # Connect to database
     conn = connect_to_supabase(password)
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
-        # Start building SQL file
-        sql_content = []
-        sql_content.append("-- MySQL Export from Supabase")
-        sql_content.append(f"-- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        sql_content.append(f"-- Database: {SUPABASE_DB} -> {MYSQL_DB_NAME}\n")
-        sql_content.append(f"USE `{MYSQL_DB_NAME}`;\n")
-        sql_content.append("SET FOREIGN_KEY_CHECKS = 0;\n")
-        sql_content.append("SET SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO';\n")
-        sql_content.append("SET time_zone = '+00:00';\n\n")
+        # One snapshot for the catalog and every table, shared with the workers
+        snapshot = begin_snapshot(conn)
+        include = [t.strip() for t in args.tables.split(',') if t.strip()] if args.tables else None
+        exclude = [t.strip() for t in args.exclude.split(',') if t.strip()]
+        tables_to_export = discover_tables(conn, include, exclude)
+        print(f"Tables (dependency order): {', '.join(t for t, _ in tables_to_export)}\n")
         
-        # Export tables
-        tables_to_export = [
-            ('admin_users', 'admin_users'),
-            ('rsvps', 'rsvps'),
-        ]
+        if args.direct:
+            connect_to_mysql().close()
+            ok = export_direct(conn, password, snapshot, tables_to_export, truncate=args.truncate, jobs=args.jobs)
+            session.stats.update({'mode': 'direct', 'tables': len(tables_to_export), 'verified': ok})
+            sys.exit(0 if ok else 1)
         
-        for supabase_table, mysql_table in tables_to_export:
-            try:
-                statements = export_table(cursor, supabase_table, mysql_table)
-                sql_content.extend(statements)
-                sql_content.append("\n")
-            except Exception as e:
-                print(f"  [ERROR] Error exporting {supabase_table}: {e}")
-                continue
+        if args.format == 'copy':
+            ok = export_copy(conn, password, snapshot, tables_to_export, args.output_dir, jobs=args.jobs)
+            session.stats.update({'mode': 'copy', 'tables': len(tables_to_export), 'ok': ok})
+            sys.exit(0 if ok else 1)
+        
+        output_path = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), OUTPUT_FILE)
+        suffix = COMPRESS_SUFFIXES.get(args.compress, '')
+        if suffix and not output_path.endswith(suffix):
+            output_path += suffix
+        commit_every = args.commit_every if args.fast_import else 0
         
-        sql_content.append("SET FOREIGN_KEY_CHECKS = 1;\n")
-        sql_content.append("-- Export completed!\n")
+        previous_state = load_state(args.since_state) if args.since_state else None
+        if previous_state:
+            print(f"Incremental export since {args.since_state}\n")
+        
+        # Each table is written to its own part file, compressed like the output, and the
+        # parts are then appended byte for byte in dependency order (no recompression)
+        parts_dir = tempfile.mkdtemp(prefix='export_parts_', dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            results = export_tables(conn, password, snapshot, tables_to_export, {
+                'format': 'sql',
+                'parts_dir': parts_dir,
+                'max_statement_bytes': args.max_statement_bytes,
+                'commit_every': commit_every,
+                'state': previous_state,
+                'compress': args.compress,
+            }, jobs=args.jobs)
+            
+            header = ("-- MySQL Export from Supabase\n"
+                      f"-- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                      f"-- Database: {SUPABASE_DB} -> {MYSQL_DB_NAME} (snapshot {snapshot})\n\n"
+                      f"USE `{MYSQL_DB_NAME}`;\n\n"
+                      "SET FOREIGN_KEY_CHECKS = 0;\n\n"
+                      "SET SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO';\n\n"
+                      "SET time_zone = '+00:00';\n\n")
+            if args.fast_import:
+                header += "SET autocommit = 0;\nSET unique_checks = 0;\n\n"
+            footer = "COMMIT;\nSET unique_checks = 1;\nSET autocommit = 1;\n" if args.fast_import else ""
+            footer += "SET FOREIGN_KEY_CHECKS = 1;\n-- Export completed!\n"
+            
+            with open(output_path, 'wb') as out:
+                out.write(compress_text(header, args.compress))
+                for index, (supabase_table, mysql_table) in enumerate(tables_to_export):
+                    result = results[supabase_table]
+                    if isinstance(result, BaseException):
+                        print(f"  [ERROR] Error exporting {supabase_table}: {result}")
+                        out.write(compress_text(f"-- [ERROR] Export of {supabase_table} failed: {result}\n\n",
+                                                args.compress))
+                        continue
+                    part_path = os.path.join(parts_dir, f'{index:04d}_{mysql_table}.sql'
+                                             + COMPRESS_SUFFIXES.get(args.compress, ''))
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, out, 1024 * 1024)
+                    # Free the space as we go: at most one copy of each table exists at a time
+                    os.remove(part_path)
+                    out.write(compress_text("\n", args.compress))
+                out.write(compress_text(footer, args.compress))
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
         
-        # Write to file
-        output_path = os.path.join(os.path.dirname(__file__), OUTPUT_FILE)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(sql_content))
+        failed = [t for t, _ in tables_to_export if isinstance(results[t], BaseException)]
+        session.stats.update({
+            'mode': 'sql',
+            'output_bytes': os.path.getsize(output_path),
+            'rows': {t: (str(r) if isinstance(r, BaseException) else r['rows']) for t, r in results.items()},
+        })
+        
+        if args.since_state:
+            # Failed tables keep their old watermark and are retried next run
+            new_state = dict(previous_state)
+            for table, result in results.items():
+                if not isinstance(result, BaseException):
+                    new_state[table] = result['watermark']
+            save_state(args.since_state, new_state, snapshot)
+            print(f"\n[OK] Watermarks saved to {args.since_state}")
         
         print()
         print("=" * 60)
-        print(f"[SUCCESS] Export completed successfully!")
+        if failed:
+            print(f"[WARNING] Export completed with errors in: {', '.join(failed)}")
+        else:
+            print(f"[SUCCESS] Export completed successfully!")
         print(f"  Output file: {output_path}")
         print("=" * 60)
         print()
         print("Next steps:")
-        print(f"  1. Review the SQL file: {OUTPUT_FILE}")
-        print(f"  2. Import into MySQL: mysql -u username -p {MYSQL_DB_NAME} < {OUTPUT_FILE}")
+        print(f"  1. Review the SQL file: {os.path.basename(output_path)}")
+        if args.compress == 'gzip':
+            print(f"  2. Import into MySQL: gunzip -c {os.path.basename(output_path)} | mysql -u username -p {MYSQL_DB_NAME}")
+        elif args.compress == 'zstd':
+            print(f"  2. Import into MySQL: zstd -dc {os.path.basename(output_path)} | mysql -u username -p {MYSQL_DB_NAME}")
+        else:
+            print(f"  2. Import into MySQL: mysql -u username -p {MYSQL_DB_NAME} < {os.path.basename(output_path)}")
         print("  3. Or import via phpMyAdmin/MySQL Workbench")
+        if failed:
+            sys.exit(1)
         
     except Exception as e:
         print(f"[ERROR] Export failed: {e}")
@@ -272,7 +1266,6 @@ def main():
         sys.exit(1)
     
     finally:
-        cursor.close()
         conn.close()
         print("\n[OK] Database connection closed")
 
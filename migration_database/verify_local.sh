@@ -0,0 +1,81 @@
+#!/bin/bash
+#
+# End-to-end check of export_supabase_to_mysql.py against local containers.
+# Seeds PostgreSQL with awkward sample data (quotes, backslashes, newlines,
+# NULLs, unicode), exports it with --format sql, --format copy and --direct, loads
+# each into MySQL and compares row counts and a content checksum per table.
+#
+# Usage:  ./verify_local.sh [rows]       (requires Docker with compose)
+
+set -e
+
+ROWS="${1:-20000}"
+cd "$(dirname "${BASH_SOURCE[0]}")"
+
+PSQL="docker compose exec -T postgres psql -U postgres -v ON_ERROR_STOP=1 -qtA"
+MYSQL="docker compose exec -T mysql mysql -uroot -proot --local-infile=1 -N"
+
+echo "🐳 Starting local PostgreSQL and MySQL..."
+mkdir -p local_export
+docker compose up -d --wait
+
+echo "🌱 Seeding PostgreSQL with $ROWS RSVPs..."
+$PSQL -c "DROP TABLE IF EXISTS rsvps, admin_users CASCADE;" >/dev/null
+$PSQL -c "DO \$\$ BEGIN CREATE ROLE anon; CREATE ROLE authenticated; EXCEPTION WHEN duplicate_object THEN NULL; END \$\$;" >/dev/null
+$PSQL < ../database/supabase_schema.sql >/dev/null
+$PSQL >/dev/null <<SQL
+INSERT INTO admin_users (email, password) VALUES ('admin@example.com', 'h''ash\\with"quotes');
+INSERT INTO rsvps (name, email, phone, organization, attending, number_of_guests, wedding_type, payment_amount)
+SELECT 'Guest ' || g || E' O\\'Brien "\\\\" \\n 王小明',
+       'guest' || g || '@example.com',
+       CASE WHEN g % 3 = 0 THEN NULL ELSE '+60' || g END,
+       CASE WHEN g % 5 = 0 THEN 'NULL' ELSE NULL END,
+       g % 2 = 0, 1 + g % 4,
+       CASE WHEN g % 2 = 0 THEN 'bride' ELSE 'groom' END,
+       (g % 1000) * 1.25
+FROM generate_series(1, $ROWS) AS g;
+SQL
+
+export SUPABASE_DB_HOST=127.0.0.1 SUPABASE_DB_PORT=54329 SUPABASE_DB_NAME=postgres
+export SUPABASE_DB_USER=postgres SUPABASE_DB_PASSWORD=postgres
+
+checksum_pg() {
+    $PSQL -c "SELECT count(*) || ':' || md5(coalesce(string_agg(id || '|' || name || '|' || coalesce(phone, '\\N') || '|' || coalesce(organization, '\\N') || '|' || attending::int || '|' || payment_amount, ',' ORDER BY id), '')) FROM rsvps;"
+}
+
+checksum_mysql() {
+    $MYSQL wedding_rsvp -e "SET SESSION group_concat_max_len = 1073741824; SELECT CONCAT(COUNT(*), ':', MD5(COALESCE(GROUP_CONCAT(CONCAT_WS('|', id, name, COALESCE(phone, '\\\\N'), COALESCE(organization, '\\\\N'), attending, payment_amount) ORDER BY id SEPARATOR ','), ''))) FROM rsvps;"
+}
+
+reset_mysql() {
+    $MYSQL -e "DROP DATABASE IF EXISTS wedding_rsvp;"
+    $MYSQL < ../database/schema.sql
+}
+
+EXPECTED="$(checksum_pg)"
+STATUS=0
+
+echo "📤 --format sql"
+reset_mysql
+python3 export_supabase_to_mysql.py --output local_export/export.sql --max-statement-bytes 200000 --fast-import >/dev/null
+$MYSQL < local_export/export.sql
+ACTUAL="$(checksum_mysql)"
+if [ "$ACTUAL" = "$EXPECTED" ]; then echo "   ✅ rsvps match ($EXPECTED)"; else echo "   ❌ rsvps differ: postgres=$EXPECTED mysql=$ACTUAL"; STATUS=1; fi
+
+echo "📤 --format copy"
+reset_mysql
+python3 export_supabase_to_mysql.py --format copy --output-dir local_export >/dev/null
+docker compose exec -T -w /export mysql mysql -uroot -proot --local-infile=1 < local_export/load_data.sql
+ACTUAL="$(checksum_mysql)"
+if [ "$ACTUAL" = "$EXPECTED" ]; then echo "   ✅ rsvps match ($EXPECTED)"; else echo "   ❌ rsvps differ: postgres=$EXPECTED mysql=$ACTUAL"; STATUS=1; fi
+
+echo "📤 --direct"
+reset_mysql
+MYSQL_DB_HOST=127.0.0.1 MYSQL_DB_PORT=33069 MYSQL_DB_USER=root MYSQL_DB_PASSWORD=root \
+    python3 export_supabase_to_mysql.py --direct --truncate >/dev/null || { echo "   ❌ direct load reported a mismatch"; STATUS=1; }
+ACTUAL="$(checksum_mysql)"
+if [ "$ACTUAL" = "$EXPECTED" ]; then echo "   ✅ rsvps match ($EXPECTED)"; else echo "   ❌ rsvps differ: postgres=$EXPECTED mysql=$ACTUAL"; STATUS=1; fi
+
+echo
+echo "Stop the containers with: docker compose down -v"
+exit $STATUS